@@ -0,0 +1,48 @@
+"""Benchmarks for JWT handling, password hashing and uuid generation.
+
+bcrypt cost is taken from BENCH_BCRYPT_ROUNDS (default 4 so the suite stays
+fast; production uses bcrypt's default of 12). Compare runs only against
+baselines saved with the same cost.
+"""
+import os
+import bcrypt
+import pytest
+from lib.jwt_token import generate_jwt_token, verify_jwt_token
+from utils import password
+from utils.generate_uuid import generate_uuid
+
+BCRYPT_ROUNDS = int(os.getenv("BENCH_BCRYPT_ROUNDS", 4))
+
+JWT_PAYLOAD = {
+    "user_id": "123e4567-e89b-12d3-a456-426614174000",
+    "username": "testuser",
+    "created_at": "2024-01-01 00:00:00",
+}
+
+@pytest.fixture
+def bcrypt_rounds(monkeypatch):
+    gensalt = bcrypt.gensalt
+    monkeypatch.setattr(password.bcrypt, "gensalt", lambda: gensalt(rounds=BCRYPT_ROUNDS))
+    return BCRYPT_ROUNDS
+
+
+def test_generate_jwt_token(benchmark):
+    token = benchmark(generate_jwt_token, JWT_PAYLOAD)
+    assert token.count(".") == 2
+
+def test_verify_jwt_token(benchmark):
+    token = generate_jwt_token(JWT_PAYLOAD)
+    assert benchmark(verify_jwt_token, token) == JWT_PAYLOAD
+
+def test_hash_password(benchmark, bcrypt_rounds):
+    benchmark.extra_info["bcrypt_rounds"] = bcrypt_rounds
+    hashed = benchmark(password.hash_password, "TestPassword123")
+    assert hashed.startswith(f"$2b${bcrypt_rounds:02d}$")
+
+def test_verify_password(benchmark, bcrypt_rounds):
+    benchmark.extra_info["bcrypt_rounds"] = bcrypt_rounds
+    hashed = password.hash_password("TestPassword123")
+    assert benchmark(password.verify_password, "TestPassword123", hashed) is True
+
+def test_generate_uuid(benchmark):
+    assert len(benchmark(generate_uuid)) == 36
@@ -0,0 +1,19 @@
+"""Benchmarks for lib/normalize_inputs.py and lib/validate_inputs.py."""
+from lib.normalize_inputs import normalize_username, normalize_email
+from lib.validate_inputs import validate_password, validate_hours, validate_entry_date
+
+
+def test_normalize_username(benchmark):
+    assert benchmark(normalize_username, "  TestUser123 ") == "testuser123"
+
+def test_normalize_email(benchmark):
+    assert benchmark(normalize_email, " Test.User+tag@Example.com ") == "test.user+tag@example.com"
+
+def test_validate_password(benchmark):
+    assert benchmark(validate_password, "TestPassword123") == "TestPassword123"
+
+def test_validate_hours(benchmark):
+    assert benchmark(validate_hours, 7.5) == 7.5
+
+def test_validate_entry_date(benchmark):
+    assert benchmark(validate_entry_date, "2024-01-15") == "2024-01-15"
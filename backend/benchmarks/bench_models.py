@@ -0,0 +1,30 @@
+"""Benchmarks for pydantic request parsing."""
+from models.time import TimeEntry, TimeEntryBatch
+from models.user import UserSignup
+
+TIME_ENTRY = {
+    "project_name": "API Integration",
+    "description": "Wire up the export endpoint",
+    "hours": 2.5,
+    "entry_date": "2024-01-15",
+}
+
+SIGNUP = {
+    "username": "testuser",
+    "email": "test@example.com",
+    "password": "TestPassword123",
+}
+
+
+def test_parse_time_entry(benchmark):
+    entry = benchmark(TimeEntry.model_validate, TIME_ENTRY)
+    assert entry.hours == 2.5
+
+def test_parse_time_entry_batch(benchmark):
+    payload = {"entries": [TIME_ENTRY] * 100}
+    batch = benchmark(TimeEntryBatch.model_validate, payload)
+    assert len(batch.entries) == 100
+
+def test_parse_user_signup(benchmark):
+    signup = benchmark(UserSignup.model_validate, SIGNUP)
+    assert signup.username == "testuser"
@@ -0,0 +1,18 @@
+"""Benchmarks for the row-to-JSON path used by services/checking.py."""
+import pytest
+from lib.serialization import rows_to_dicts, dumps_json
+from benchmarks.serialization_throughput import FakeCursor, make_rows
+
+
+@pytest.fixture(scope="module")
+def rows():
+    return make_rows(1000)
+
+
+def test_rows_to_dicts(benchmark, rows):
+    result = benchmark(rows_to_dicts, FakeCursor, rows)
+    assert len(result) == 1000
+
+def test_rows_to_json(benchmark, rows):
+    body = benchmark(lambda: dumps_json({"time_entries": rows_to_dicts(FakeCursor, rows)}))
+    assert body.startswith(b'{"time_entries":')
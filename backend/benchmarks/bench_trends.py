@@ -0,0 +1,27 @@
+"""Benchmarks for the trend aggregation behind GET /v1/time/trends."""
+import random
+import pytest
+from datetime import date
+from services.trends import build_trends
+
+START = date(2024, 1, 1)
+END = date(2024, 12, 29)
+PROJECTS = ["Website Redesign", "Mobile App Development", "API Integration", "Internal Tools"]
+
+
+@pytest.fixture(scope="module")
+def year_of_daily_totals():
+    # One row per day and project for 52 weeks, the densest a year can be
+    rng = random.Random(0)
+    rows = [(day, project, rng.choice([0.5, 1.0, 2.5, 4.0])) for day in range((END - START).days + 1) for project in PROJECTS]
+    day_offsets, projects, hours = zip(*rows)
+    return {"day_offsets": list(day_offsets), "projects": list(projects), "hours": list(hours)}
+
+
+def test_build_weekly_trends(benchmark, year_of_daily_totals):
+    trends = benchmark(build_trends, year_of_daily_totals, START, END, "week", 4)
+    assert len(trends["buckets"]) == 52
+
+def test_build_monthly_trends(benchmark, year_of_daily_totals):
+    trends = benchmark(build_trends, year_of_daily_totals, START, END, "month", 3)
+    assert len(trends["buckets"]) == 12
@@ -0,0 +1,11 @@
+import os
+import sys
+from pathlib import Path
+
+# Add the backend directory to Python path so modules can be imported
+backend_dir = Path(__file__).parent.parent
+if str(backend_dir) not in sys.path:
+    sys.path.insert(0, str(backend_dir))
+
+# lib/jwt_token.py reads the secret at import time; benchmarks must run without a .env
+os.environ.setdefault("TOKEN_SECRET", "benchmark-secret")
@@ -0,0 +1,116 @@
+"""Throughput benchmark for the streaming time entry export.
+
+Needs a reachable Postgres configured through the usual DB_* variables.
+Seeds a benchmark user with --rows entries (once), streams the export and
+reports rows/sec, MB/sec and peak RSS growth. With --compare-fetchall the
+same range is also loaded with a plain fetchall() for reference.
+
+    python -m benchmarks.export_throughput --rows 2000000 --format csv
+    python -m benchmarks.export_throughput --cleanup
+"""
+import argparse
+import resource
+import time
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.server import connect_to_db, close_pool
+from services.exporting import stream_time_entries_export, EXPORT_QUERY, EXPORT_FORMATS
+
+BENCH_USER_ID = "00000000-0000-4000-8000-00000000e4b0"
+BENCH_USERNAME = "benchexport"
+START_DATE = "2000-01-01"
+
+def seed(rows: int):
+    conn = connect_to_db()
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO users (user_id, username, email, password_hash)
+        VALUES (%s, %s, %s, 'x') ON CONFLICT DO NOTHING
+    """, (BENCH_USER_ID, BENCH_USERNAME, f"{BENCH_USERNAME}@example.com"))
+    cursor.execute("SELECT COUNT(*) FROM time_entries WHERE user_id = %s", (BENCH_USER_ID,))
+    existing = cursor.fetchone()[0]
+    if existing < rows:
+        print(f"Seeding {rows - existing} entries...")
+        cursor.execute("""
+            INSERT INTO time_entries (user_id, project_id, description, hours, entry_date)
+            SELECT %s, (SELECT MIN(id) FROM projects) + (g %% 4), 'benchmark entry ' || g,
+                   ((g %% 16) + 1) / 2.0, DATE %s + (g %% 3650)
+            FROM generate_series(%s, %s - 1) AS g
+        """, (BENCH_USER_ID, START_DATE, existing, rows))
+        cursor.execute("DELETE FROM time_entry_daily_totals WHERE user_id = %s", (BENCH_USER_ID,))
+        cursor.execute("""
+            INSERT INTO time_entry_daily_totals (user_id, project_id, day, total_hours, entry_count)
+            SELECT user_id, project_id, entry_date, SUM(hours), COUNT(*)
+            FROM time_entries WHERE user_id = %s
+            GROUP BY user_id, project_id, entry_date
+        """, (BENCH_USER_ID,))
+    conn.commit()
+    conn.close()
+
+def cleanup():
+    conn = connect_to_db()
+    cursor = conn.cursor()
+    # time_entries and the rollup cascade from users
+    cursor.execute("DELETE FROM users WHERE user_id = %s", (BENCH_USER_ID,))
+    conn.commit()
+    conn.close()
+    print("Benchmark data removed.")
+
+def max_rss_mb() -> float:
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def bench_stream(end_date: str, export_format: str, chunk_rows: int):
+    rss_before = max_rss_mb()
+    started = time.perf_counter()
+    total_bytes = 0
+    total_rows = 0
+    for chunk in stream_time_entries_export(START_DATE, end_date, export_format, chunk_rows):
+        total_bytes += len(chunk)
+        total_rows += chunk.count(b"\n")
+    elapsed = time.perf_counter() - started
+    if export_format == "csv":
+        total_rows -= 1  # header line
+    report("stream", total_rows, total_bytes, elapsed, max_rss_mb() - rss_before)
+
+def bench_fetchall(end_date: str, export_format: str):
+    _, encode = EXPORT_FORMATS[export_format]
+    rss_before = max_rss_mb()
+    started = time.perf_counter()
+    conn = connect_to_db()
+    cursor = conn.cursor()
+    cursor.execute(EXPORT_QUERY, (START_DATE, end_date))
+    rows = cursor.fetchall()
+    body = encode(rows, True)
+    conn.close()
+    elapsed = time.perf_counter() - started
+    report("fetchall", len(rows), len(body), elapsed, max_rss_mb() - rss_before)
+
+def report(label: str, rows: int, total_bytes: int, elapsed: float, rss_growth_mb: float):
+    print(
+        f"{label:>9}: {rows} rows in {elapsed:.2f}s | {rows / elapsed:,.0f} rows/s | "
+        f"{total_bytes / elapsed / 1e6:.1f} MB/s | peak RSS +{rss_growth_mb:.1f} MB"
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="csv")
+    parser.add_argument("--chunk-rows", type=int, default=5000)
+    parser.add_argument("--compare-fetchall", action="store_true")
+    parser.add_argument("--cleanup", action="store_true")
+    args = parser.parse_args()
+
+    if args.cleanup:
+        cleanup()
+        sys.exit(0)
+
+    seed(args.rows)
+    end_date = "2099-12-31"
+    bench_stream(end_date, args.format, args.chunk_rows)
+    if args.compare_fetchall:
+        bench_fetchall(end_date, args.format)
+    close_pool()
@@ -0,0 +1,329 @@
+"""End-to-end load test for one backend instance.
+
+Starts the FastAPI app from index.py under uvicorn, seeds --users users with
+--entries time entries each, then drives a weighted mix of login, add and
+week-summary requests from --concurrency async clients for --duration
+seconds. Reports throughput and p50/p95/p99 latency per route.
+
+The database is either the one configured through the usual DB_* variables
+or, with --initdb, a throwaway cluster created with initdb/pg_ctl in a
+temporary directory (Postgres binaries must be on PATH or in --pg-bin).
+Everything runs on localhost, no network access is needed.
+
+    python -m benchmarks.load_test --initdb --users 200 --entries 500 --concurrency 50
+    python -m benchmarks.load_test --mix login=1,add=3,week_summary=6 --json results.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import httpx
+import psycopg2
+from utils.password import hash_password
+
+LOAD_USER_PREFIX = "loaduser"
+LOAD_PASSWORD = "LoadTest123"
+DEFAULT_MIX = "login=1,add=3,week_summary=6"
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def parse_mix(mix: str) -> dict:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{name}', expected one of {', '.join(OPERATIONS)}")
+        weights[name] = float(weight or 1)
+    return weights
+
+def percentile(sorted_values: list, pct: float) -> float:
+    # nearest-rank percentile over an already sorted list
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+class ThrowawayCluster:
+    """A temporary Postgres cluster managed with initdb and pg_ctl."""
+
+    def __init__(self, pg_bin: str = None, fsync: bool = False):
+        self.pg_bin = pg_bin
+        self.fsync = fsync
+        self.port = free_port()
+        self.data_dir = tempfile.mkdtemp(prefix="loadtest-pg-")
+        self.user = "postgres"
+        self.database = "time_tracker_load"
+
+    def _bin(self, name: str) -> str:
+        path = os.path.join(self.pg_bin, name) if self.pg_bin else shutil.which(name)
+        if not path:
+            raise RuntimeError(f"{name} not found, put the Postgres binaries on PATH or pass --pg-bin")
+        return path
+
+    def start(self):
+        subprocess.run([self._bin("initdb"), "-D", self.data_dir, "-U", self.user, "-A", "trust", "--no-sync"],
+                       check=True, stdout=subprocess.DEVNULL)
+        options = f"-p {self.port} -k {self.data_dir} -c listen_addresses=127.0.0.1 -c fsync={'on' if self.fsync else 'off'}"
+        subprocess.run([self._bin("pg_ctl"), "-D", self.data_dir, "-o", options, "-w", "-l",
+                        os.path.join(self.data_dir, "server.log"), "start"],
+                       check=True, stdout=subprocess.DEVNULL)
+        conn = psycopg2.connect(host="127.0.0.1", port=self.port, user=self.user, dbname="postgres")
+        conn.autocommit = True
+        conn.cursor().execute(f"CREATE DATABASE {self.database}")
+        conn.close()
+
+    def env(self) -> dict:
+        return {
+            "DB_HOST": "127.0.0.1",
+            "DB_PORT": str(self.port),
+            "DB_NAME": self.database,
+            "DB_USER": self.user,
+            "DB_PASSWORD": "",
+        }
+
+    def stop(self):
+        subprocess.run([self._bin("pg_ctl"), "-D", self.data_dir, "-m", "immediate", "stop"],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+
+def seed(users: int, entries: int):
+    """Create the load users and their entries, reusing whatever already exists."""
+    from db.server import connect_to_db
+    from db.migrate import run_migrations
+    from db.rollups import rebuild_daily_totals
+
+    conn = connect_to_db()
+    run_migrations(conn)
+    cursor = conn.cursor()
+    # one bcrypt hash shared by all load users keeps seeding fast
+    password_hash = hash_password(LOAD_PASSWORD)
+    cursor.execute("""
+        INSERT INTO users (user_id, username, email, password_hash)
+        SELECT gen_random_uuid(), %s || g, %s || g || '@example.com', %s
+        FROM generate_series(1, %s) AS g
+        ON CONFLICT DO NOTHING
+    """, (LOAD_USER_PREFIX, LOAD_USER_PREFIX, password_hash, users))
+    cursor.execute("""
+        INSERT INTO time_entries (user_id, project_id, description, hours, entry_date)
+        SELECT u.user_id, (SELECT MIN(id) FROM projects) + (g %% 4), 'load entry ' || g,
+               ((g %% 16) + 1) / 2.0, CURRENT_DATE - (g %% 90)
+        FROM users u
+        CROSS JOIN generate_series(1, %s) AS g
+        WHERE u.username LIKE %s
+          AND NOT EXISTS (SELECT 1 FROM time_entries te WHERE te.user_id = u.user_id)
+    """, (entries, LOAD_USER_PREFIX + "%"))
+    conn.commit()
+    rebuild_daily_totals(conn)
+    conn.close()
+
+
+class AppServer:
+    """The backend running under uvicorn in a subprocess."""
+
+    def __init__(self, env: dict, workers: int, port: int = None):
+        self.port = port or free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self.env = {**os.environ, **env}
+        self.env.setdefault("TOKEN_SECRET", "load-test-secret")
+        # A few clients drive thousands of logins and adds, which the per-IP/per-user budgets would turn into 429s
+        self.env.setdefault("RATE_LIMIT_ENABLED", "false")
+        self.workers = workers
+        self.process = None
+
+    def start(self, timeout: float = 30.0):
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "index:app", "--host", "127.0.0.1", "--port", str(self.port),
+             "--workers", str(self.workers), "--log-level", "warning"],
+            cwd=BACKEND_DIR, env=self.env,
+        )
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {self.process.returncode}")
+            try:
+                if httpx.get(f"{self.base_url}/health", timeout=1).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.2)
+        raise RuntimeError("Timed out waiting for the app to become healthy")
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+class VirtualUser:
+    def __init__(self, index: int):
+        self.username = f"{LOAD_USER_PREFIX}{index}"
+        self.token = None
+
+    def headers(self) -> dict:
+        return {"Authorization": f"Bearer {self.token}"}
+
+
+async def op_login(client, user, projects):
+    response = await client.post("/v1/auth/login", json={"username": user.username, "password": LOAD_PASSWORD})
+    if response.status_code == 200:
+        user.token = response.json()["token"]
+    return response.status_code
+
+async def op_add(client, user, projects):
+    entry_date = date.today() - timedelta(days=random.randrange(7))
+    response = await client.post("/v1/time/add", headers=user.headers(), json={
+        "project_name": random.choice(projects),
+        "description": "load test entry",
+        "hours": random.choice([0.5, 1.0, 1.5, 2.0, 4.0]),
+        "entry_date": entry_date.isoformat(),
+    })
+    return response.status_code
+
+async def op_week_summary(client, user, projects):
+    response = await client.get("/v1/time/get_week_summary", headers=user.headers())
+    return response.status_code
+
+# operation name -> (route label used in the report, coroutine)
+OPERATIONS = {
+    "login": ("POST /v1/auth/login", op_login),
+    "add": ("POST /v1/time/add", op_add),
+    "week_summary": ("GET /v1/time/get_week_summary", op_week_summary),
+}
+
+
+async def drive(base_url: str, users: int, concurrency: int, duration: float, mix: dict) -> tuple:
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    samples = {}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        virtual_users = [VirtualUser(i) for i in range(1, users + 1)]
+        projects = [p["name"] for p in (await client.get("/v1/projects")).json()["projects"]]
+        # every virtual user starts logged in so the mix is not skewed towards login
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def warm_login(user):
+            async with semaphore:
+                await op_login(client, user, projects)
+        await asyncio.gather(*(warm_login(user) for user in virtual_users))
+
+        deadline = time.monotonic() + duration
+
+        async def worker():
+            while time.monotonic() < deadline:
+                user = random.choice(virtual_users)
+                route, operation = OPERATIONS[random.choices(names, weights)[0]]
+                started = time.perf_counter()
+                try:
+                    status = await operation(client, user, projects)
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                elapsed = time.perf_counter() - started
+                samples.setdefault(route, []).append((elapsed, status))
+
+        started = time.monotonic()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.monotonic() - started
+    return samples, elapsed
+
+
+def summarize(samples: dict, elapsed: float) -> dict:
+    routes = {}
+    for route, results in sorted(samples.items()):
+        latencies = sorted(latency for latency, _ in results)
+        statuses = {}
+        for _, status in results:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+        errors = sum(count for status, count in statuses.items() if not status.startswith(("2", "3")))
+        routes[route] = {
+            "requests": len(results),
+            "errors": errors,
+            "throughput_rps": round(len(results) / elapsed, 2),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+            "statuses": statuses,
+        }
+    total = sum(route["requests"] for route in routes.values())
+    return {
+        "duration_seconds": round(elapsed, 2),
+        "requests": total,
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "routes": routes,
+    }
+
+def print_report(report: dict):
+    print(f"\n{report['requests']} requests in {report['duration_seconds']}s "
+          f"({report['throughput_rps']} req/s)\n")
+    print(f"{'route':<36}{'reqs':>8}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for route, stats in report["routes"].items():
+        print(f"{route:<36}{stats['requests']:>8}{stats['errors']:>8}{stats['throughput_rps']:>10}"
+              f"{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--initdb", action="store_true", help="run against a throwaway cluster")
+    parser.add_argument("--pg-bin", help="directory holding initdb and pg_ctl")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--entries", type=int, default=200, help="time entries seeded per user")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of traffic")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="weighted operations, e.g. login=1,add=3,week_summary=6")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--seed", type=int, help="random seed for a repeatable request mix")
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    cluster = ThrowawayCluster(args.pg_bin) if args.initdb else None
+    server = None
+    try:
+        if cluster:
+            cluster.start()
+            os.environ.update(cluster.env())
+        print(f"Seeding {args.users} users x {args.entries} entries...")
+        seed(args.users, args.entries)
+        server = AppServer(cluster.env() if cluster else {}, workers=args.workers)
+        server.start()
+        print(f"Driving {args.concurrency} clients for {args.duration}s with mix {args.mix}...")
+        samples, elapsed = asyncio.run(drive(server.base_url, args.users, args.concurrency, args.duration, mix))
+    finally:
+        if server:
+            server.stop()
+        if cluster:
+            cluster.stop()
+
+    report = summarize(samples, elapsed)
+    report["config"] = vars(args)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
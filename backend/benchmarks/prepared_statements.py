@@ -0,0 +1,87 @@
+"""Planning overhead of the hot queries, plain SQL vs prepared statements.
+
+Needs a reachable Postgres configured through the usual DB_* variables.
+Seeds the export benchmark user with --rows entries (once), then runs each
+registered hot statement --iterations times as plain SQL and via EXECUTE
+on one connection, reporting mean latency per call and the planning time
+Postgres reports under EXPLAIN ANALYZE. Inserts run inside a transaction
+that is rolled back.
+
+    python -m benchmarks.prepared_statements --rows 2000000 --iterations 2000
+"""
+import argparse
+import statistics
+import time
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.server import connect_to_db
+from db.prepared import get_statement_sql, to_positional
+from benchmarks.export_throughput import seed, BENCH_USER_ID, BENCH_USERNAME, START_DATE
+import services.checking  # noqa: F401  registers the read statements
+import services.inputing  # noqa: F401  registers the insert statement
+
+def statement_params(cursor) -> dict:
+    cursor.execute("SELECT MIN(id) FROM projects")
+    project_id = cursor.fetchone()[0]
+    week_end = "2000-01-07"
+    return {
+        "get_user": (BENCH_USERNAME,),
+        "week_entries": (BENCH_USER_ID, START_DATE, week_end),
+        "week_entries_by_project": (BENCH_USER_ID, START_DATE, week_end, project_id),
+        "insert_time_entry": (BENCH_USER_ID, project_id, "prepared statement benchmark", 1.5, START_DATE),
+    }
+
+def time_calls(cursor, sql: str, params, iterations: int) -> list:
+    durations = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        cursor.execute(sql, params)
+        if cursor.description is not None:
+            cursor.fetchall()
+        durations.append(time.perf_counter() - started)
+    return durations
+
+def planning_time_ms(cursor, sql: str, params) -> float:
+    cursor.execute(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}", params)
+    return cursor.fetchone()[0][0]["Planning Time"]
+
+def run(iterations: int):
+    conn = connect_to_db()
+    cursor = conn.cursor()
+    params_by_name = statement_params(cursor)
+
+    print(f"{'statement':<26}{'plain us':>12}{'prepared us':>14}{'speedup':>10}{'plan ms':>10}{'plan ms (prep)':>16}")
+    for name, params in params_by_name.items():
+        sql = get_statement_sql(name)
+        cursor.execute(f"PREPARE bench_{name} AS {to_positional(sql)}")
+        execute_sql = f"EXECUTE bench_{name} ({', '.join(['%s'] * len(params))})"
+
+        # warm both paths so the prepared statement has settled on its plan
+        time_calls(cursor, sql, params, 10)
+        time_calls(cursor, execute_sql, params, 10)
+        plain = statistics.mean(time_calls(cursor, sql, params, iterations)) * 1e6
+        prepared = statistics.mean(time_calls(cursor, execute_sql, params, iterations)) * 1e6
+        plain_plan = planning_time_ms(cursor, sql, params)
+        prepared_plan = planning_time_ms(cursor, execute_sql, params)
+
+        print(f"{name:<26}{plain:>12.1f}{prepared:>14.1f}{plain / prepared:>9.2f}x{plain_plan:>10.3f}{prepared_plan:>16.3f}")
+        cursor.execute(f"DEALLOCATE bench_{name}")
+
+    # Discard the benchmark inserts
+    conn.rollback()
+    conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="entries seeded for the benchmark user")
+    parser.add_argument("--iterations", type=int, default=1000)
+    args = parser.parse_args()
+
+    seed(args.rows)
+    run(args.iterations)
+
+if __name__ == "__main__":
+    main()
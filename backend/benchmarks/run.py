@@ -0,0 +1,44 @@
+"""Run the bench_*.py micro-benchmarks with pytest-benchmark.
+
+    python -m benchmarks.run                    # run and print the table
+    python -m benchmarks.run save               # run and save a baseline
+    python -m benchmarks.run compare            # compare with the latest baseline
+    python -m benchmarks.run compare --threshold 15 -k jwt
+
+Baselines are stored per machine under benchmarks/baselines/. In compare
+mode the run fails when any benchmark's median is slower than the baseline
+by more than --threshold percent.
+"""
+import argparse
+import os
+import sys
+import pytest
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINES_DIR = os.path.join(BENCHMARKS_DIR, "baselines")
+
+def build_args(mode: str, name: str, threshold: float, extra: list) -> list:
+    args = [
+        BENCHMARKS_DIR,
+        "-o", "python_files=bench_*.py",
+        "-p", "no:cacheprovider",
+        f"--benchmark-storage=file://{BASELINES_DIR}",
+        "--benchmark-sort=name",
+        "--benchmark-columns=min,median,mean,stddev,ops,rounds",
+    ]
+    if mode == "save":
+        args.append(f"--benchmark-save={name}")
+    elif mode == "compare":
+        args += ["--benchmark-compare", f"--benchmark-compare-fail=median:{threshold:g}%"]
+    return args + extra
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("mode", nargs="?", choices=["run", "save", "compare"], default="run")
+    parser.add_argument("--name", default="baseline", help="label for a saved baseline")
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed median slowdown in percent")
+    args, extra = parser.parse_known_args()
+    sys.exit(pytest.main(build_args(args.mode, args.name, args.threshold, extra)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Micro-benchmark for turning time entry rows into a JSON response body.
+
+Compares the per-row dict + isinstance loop with stdlib json (the previous
+code path in services/checking.py) against lib/serialization.py. Runs offline
+on synthetic rows shaped like `SELECT te.*, p.name`.
+
+    python -m benchmarks.serialization_throughput --rows 100000
+"""
+import argparse
+import json
+import time
+import sys
+import os
+from decimal import Decimal
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib.serialization import rows_to_dicts, dumps_json, NUMERIC_OID, DATE_OID, TIMESTAMP_OID
+
+DESCRIPTION = [
+    ("id", 23), ("user_id", 2950), ("project_id", 23), ("description", 25), ("hours", NUMERIC_OID),
+    ("created_at", TIMESTAMP_OID), ("entry_date", DATE_OID), ("project_name", 1043),
+]
+
+class FakeCursor:
+    description = DESCRIPTION
+
+def make_rows(count: int) -> list:
+    base = datetime(2024, 1, 1, 9, 0)
+    return [
+        (i, "123e4567-e89b-12d3-a456-426614174000", i % 4 + 1, f"Task number {i}", Decimal("1.25"),
+         base + timedelta(minutes=i), (base + timedelta(days=i % 365)).date(), "API Integration")
+        for i in range(count)
+    ]
+
+def legacy_rows_to_dicts(cursor, rows) -> list:
+    column_names = [desc[0] for desc in cursor.description]
+    time_entries_list = []
+    for row in rows:
+        entry_dict = dict(zip(column_names, row))
+        for key, value in entry_dict.items():
+            if isinstance(value, Decimal):
+                entry_dict[key] = float(value)
+            elif isinstance(value, (datetime, date)):
+                entry_dict[key] = value.isoformat()
+        time_entries_list.append(entry_dict)
+    return time_entries_list
+
+def legacy_dumps(content) -> bytes:
+    # what starlette's JSONResponse does
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode('utf-8')
+
+def best_of(repeat: int, func, *args) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def run(rows_count: int, repeat: int):
+    rows = make_rows(rows_count)
+    cursor = FakeCursor()
+    assert legacy_rows_to_dicts(cursor, rows) == rows_to_dicts(cursor, rows)
+
+    results = {
+        "before": best_of(repeat, lambda: legacy_dumps({"time_entries": legacy_rows_to_dicts(cursor, rows)})),
+        "after": best_of(repeat, lambda: dumps_json({"time_entries": rows_to_dicts(cursor, rows)})),
+        "rows only (before)": best_of(repeat, legacy_rows_to_dicts, cursor, rows),
+        "rows only (after)": best_of(repeat, rows_to_dicts, cursor, rows),
+    }
+    for label, elapsed in results.items():
+        print(f"{label:>20}: {rows_count / elapsed:>12,.0f} rows/s ({elapsed * 1000:.1f} ms)")
+    print(f"{'speedup':>20}: {results['before'] / results['after']:.2f}x end to end")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.rows, args.repeat)
@@ -0,0 +1,154 @@
+"""Insert throughput of /v1/time/add's write path, per-entry commit vs group commit.
+
+For each --writers level (default 1, 10 and 100 concurrent writers), every
+writer stores single time entries in a loop for --duration seconds, first
+through the direct path (one transaction and commit per entry), then through
+TimeEntryWriteBatcher. Reports committed entries per second, p50/p99 latency
+of an acknowledged write and the mean batch size.
+
+Commit cost is dominated by fsync, so compare on a durable setup: the usual
+DB_* database, or with --initdb a throwaway cluster started with fsync on
+(Postgres binaries on PATH or in --pg-bin).
+
+    python -m benchmarks.write_batching --initdb --duration 10
+    python -m benchmarks.write_batching --writers 1,10,100 --batch-size 100 --max-wait-ms 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.load_test import ThrowawayCluster, percentile
+
+BENCH_USER_ID = "00000000-0000-4000-8000-00000000b47c"
+BENCH_USERNAME = "benchwritebatch"
+
+def seed() -> int:
+    """Create the benchmark user and return a project id to write against."""
+    from db.server import connect_to_db
+    from db.migrate import run_migrations
+
+    conn = connect_to_db()
+    run_migrations(conn)
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO users (user_id, username, email, password_hash)
+        VALUES (%s, %s, %s, 'x') ON CONFLICT DO NOTHING
+    """, (BENCH_USER_ID, BENCH_USERNAME, f"{BENCH_USERNAME}@example.com"))
+    cursor.execute("SELECT MIN(id) FROM projects")
+    project_id = cursor.fetchone()[0]
+    conn.commit()
+    conn.close()
+    return project_id
+
+def cleanup():
+    from db.server import connect_to_db
+
+    conn = connect_to_db()
+    # time_entries and the rollup cascade from users
+    conn.cursor().execute("DELETE FROM users WHERE user_id = %s", (BENCH_USER_ID,))
+    conn.commit()
+    conn.close()
+
+async def drive(store, writers: int, duration: float, project_id: int) -> tuple:
+    latencies = []
+    deadline = time.perf_counter() + duration
+
+    async def writer(index: int):
+        sequence = 0
+        while time.perf_counter() < deadline:
+            entry = {
+                "user_id": BENCH_USER_ID,
+                "project_id": project_id,
+                "description": f"write batching {index}-{sequence}",
+                "hours": 0.5,
+                "entry_date": "2024-01-01",
+            }
+            started = time.perf_counter()
+            await store(entry)
+            latencies.append(time.perf_counter() - started)
+            sequence += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(writer(index) for index in range(writers)))
+    return latencies, time.perf_counter() - started
+
+async def run_level(mode: str, writers: int, args, project_id: int) -> dict:
+    from db.executor import run_db
+    from services import inputing
+    from services.write_batcher import TimeEntryWriteBatcher, TIME_ENTRY_BATCH_SIZE
+
+    batcher = None
+    if mode == "batched":
+        batcher = TimeEntryWriteBatcher(max_batch=args.batch_size, max_wait_ms=args.max_wait_ms)
+        store = batcher.submit
+    else:
+        store = lambda entry: run_db(inputing.store_time_entry, entry)
+
+    counts_before, sum_before = TIME_ENTRY_BATCH_SIZE.labels().snapshot()
+    latencies, elapsed = await drive(store, writers, args.duration, project_id)
+    if batcher is not None:
+        await batcher.close()
+    counts_after, sum_after = TIME_ENTRY_BATCH_SIZE.labels().snapshot()
+
+    latencies.sort()
+    batch_count = sum(counts_after) - sum(counts_before)
+    return {
+        "mode": mode,
+        "writers": writers,
+        "entries": len(latencies),
+        "entries_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "mean_batch": round((sum_after - sum_before) / batch_count, 1) if batch_count else 1.0,
+    }
+
+def print_report(results: list):
+    print(f"{'mode':<10}{'writers':>8}{'entries':>10}{'entries/s':>12}{'p50 ms':>10}{'p99 ms':>10}{'batch':>8}")
+    for row in results:
+        print(f"{row['mode']:<10}{row['writers']:>8}{row['entries']:>10}{row['entries_per_second']:>12.1f}"
+              f"{row['p50_ms']:>10.2f}{row['p99_ms']:>10.2f}{row['mean_batch']:>8.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--initdb", action="store_true", help="run against a throwaway cluster with fsync on")
+    parser.add_argument("--pg-bin", help="directory holding initdb and pg_ctl")
+    parser.add_argument("--writers", default="1,10,100", help="comma-separated concurrent writer counts")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per mode and writer count")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    cluster = ThrowawayCluster(args.pg_bin, fsync=True) if args.initdb else None
+    results = []
+    try:
+        if cluster:
+            cluster.start()
+            os.environ.update(cluster.env())
+        project_id = seed()
+        for writers in (int(value) for value in args.writers.split(",")):
+            for mode in ("direct", "batched"):
+                print(f"{mode}: {writers} writers for {args.duration}s...")
+                results.append(asyncio.run(run_level(mode, writers, args, project_id)))
+        if not cluster:
+            cleanup()
+    finally:
+        from db.server import close_pool
+        from db.executor import shutdown_db_executor
+        shutdown_db_executor()
+        close_pool()
+        if cluster:
+            cluster.stop()
+
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
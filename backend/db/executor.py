@@ -0,0 +1,34 @@
+import asyncio
+import functools
+import threading
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Blocking psycopg2 calls run on this executor so they never stall the event loop.
+# It is sized to the connection pool, so every worker thread can hold a connection
+# and extra calls queue here instead of piling up on the pool's acquire timeout.
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_db_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=int(os.getenv("DB_EXECUTOR_WORKERS", os.getenv("DB_POOL_MAX_SIZE", 10))),
+                    thread_name_prefix="db",
+                )
+    return _executor
+
+async def run_db(func, *args, **kwargs):
+    """Run a blocking database function on the DB executor and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_db_executor(), functools.partial(func, *args, **kwargs))
+
+def shutdown_db_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
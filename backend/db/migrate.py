@@ -0,0 +1,79 @@
+import os
+import re
+from db.server import connect_to_db
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), 'migrations')
+
+# Arbitrary application-wide key for pg_advisory_lock so that only one worker
+# applies migrations while the others wait for it to finish.
+MIGRATION_LOCK_KEY = 7341902
+
+MIGRATION_FILE_PATTERN = re.compile(r'^(\d+)_([a-z0-9_]+)\.sql$')
+
+def discover_migrations(migrations_dir: str = MIGRATIONS_DIR) -> list:
+    """Return (version, name, path) for every migration script, ordered by version"""
+    migrations = []
+    seen_versions = set()
+    for file_name in os.listdir(migrations_dir):
+        match = MIGRATION_FILE_PATTERN.match(file_name)
+        if not match:
+            continue
+        version = int(match.group(1))
+        if version in seen_versions:
+            raise ValueError(f"Duplicate migration version {version}")
+        seen_versions.add(version)
+        migrations.append((version, match.group(2), os.path.join(migrations_dir, file_name)))
+    return sorted(migrations)
+
+def run_migrations(conn=None, migrations_dir: str = MIGRATIONS_DIR) -> list:
+    """Apply every pending migration, each in its own transaction. Returns the applied versions"""
+    owns_connection = conn is None
+    if owns_connection:
+        conn = connect_to_db()
+    cursor = conn.cursor()
+    applied = []
+    try:
+        cursor.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_KEY,))
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INT PRIMARY KEY,
+                name TEXT NOT NULL,
+                applied_at TIMESTAMP DEFAULT NOW()
+            )
+        """)
+        conn.commit()
+
+        cursor.execute("SELECT version FROM schema_migrations")
+        done = {row[0] for row in cursor.fetchall()}
+
+        for version, name, path in discover_migrations(migrations_dir):
+            if version in done:
+                continue
+            with open(path, 'r') as f:
+                migration_sql = f.read()
+            print(f"Applying migration {version:04d}_{name}...")
+            try:
+                cursor.execute(migration_sql)
+                cursor.execute("INSERT INTO schema_migrations (version, name) VALUES (%s, %s)", (version, name))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            applied.append(version)
+        return applied
+    finally:
+        try:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_KEY,))
+            conn.commit()
+        except Exception:
+            pass
+        cursor.close()
+        if owns_connection:
+            conn.close()
+
+if __name__ == "__main__":
+    applied_versions = run_migrations()
+    if applied_versions:
+        print(f"Applied migrations: {', '.join(str(version) for version in applied_versions)}")
+    else:
+        print("Database schema is up to date.")
@@ -0,0 +1,12 @@
+-- ===========================================
+-- WEEK SUMMARY INDEXES
+-- ===========================================
+-- Entries and per-project totals are always filtered by user and date range.
+-- project_id and hours are included so the totals aggregate is index-only.
+CREATE INDEX IF NOT EXISTS idx_time_entries_user_date
+    ON time_entries (user_id, entry_date)
+    INCLUDE (project_id, hours);
+
+-- Project week summary filters by user, project and date range.
+CREATE INDEX IF NOT EXISTS idx_time_entries_user_project_date
+    ON time_entries (user_id, project_id, entry_date);
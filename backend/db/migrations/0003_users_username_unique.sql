@@ -0,0 +1,14 @@
+-- ===========================================
+-- UNIQUE USERNAMES
+-- ===========================================
+-- Usernames are normalized to lowercase before they are stored, so a plain
+-- unique constraint is enough. Login looks users up by username and uses it.
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint WHERE conname = 'users_username_key'
+    ) THEN
+        ALTER TABLE users ADD CONSTRAINT users_username_key UNIQUE (username);
+    END IF;
+END
+$$;
@@ -0,0 +1,22 @@
+-- ===========================================
+-- DAILY ROLLUP OF TIME ENTRIES
+-- ===========================================
+-- One row per user, day and project, kept in step with time_entries by the
+-- write paths in services/inputing.py. Summary totals read from here so a
+-- week, month or year costs O(days) instead of O(entries).
+CREATE TABLE IF NOT EXISTS time_entry_daily_totals (
+    user_id UUID NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    project_id INT NOT NULL REFERENCES projects(id) ON DELETE RESTRICT,
+    day DATE NOT NULL,
+    total_hours NUMERIC(12,2) NOT NULL DEFAULT 0,
+    entry_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, day, project_id)
+);
+
+-- Backfill from existing entries
+INSERT INTO time_entry_daily_totals (user_id, project_id, day, total_hours, entry_count)
+SELECT user_id, project_id, entry_date, SUM(hours), COUNT(*)
+FROM time_entries
+WHERE entry_date IS NOT NULL
+GROUP BY user_id, project_id, entry_date
+ON CONFLICT (user_id, day, project_id) DO NOTHING;
@@ -0,0 +1,7 @@
+-- ===========================================
+-- KEYSET PAGINATION INDEX
+-- ===========================================
+-- Entry listings page on (entry_date, id) newest first, so each page is a
+-- single index range scan no matter how deep the client has paged.
+CREATE INDEX IF NOT EXISTS idx_time_entries_user_date_id
+    ON time_entries (user_id, entry_date DESC, id DESC);
@@ -0,0 +1,52 @@
+-- ===========================================
+-- TEAM WEEKLY TOTALS
+-- ===========================================
+-- Hours per week, user and project for the team dashboard. Built from the
+-- daily rollup and refreshed with REFRESH MATERIALIZED VIEW CONCURRENTLY by
+-- services/team.py, so dashboard reads never aggregate time_entries.
+CREATE MATERIALIZED VIEW IF NOT EXISTS team_weekly_totals AS
+SELECT date_trunc('week', dt.day)::date AS week_start,
+       dt.user_id,
+       u.username,
+       dt.project_id,
+       p.name AS project_name,
+       SUM(dt.total_hours) AS total_hours,
+       SUM(dt.entry_count)::int AS entry_count
+FROM time_entry_daily_totals dt
+JOIN users u ON u.user_id = dt.user_id
+JOIN projects p ON p.id = dt.project_id
+GROUP BY 1, 2, 3, 4, 5
+HAVING SUM(dt.entry_count) > 0;
+
+-- Required for CONCURRENTLY refreshes
+CREATE UNIQUE INDEX IF NOT EXISTS idx_team_weekly_totals_key
+    ON team_weekly_totals (week_start, user_id, project_id);
+
+-- Dashboard pages fetch the weeks of one page of users
+CREATE INDEX IF NOT EXISTS idx_team_weekly_totals_username_week
+    ON team_weekly_totals (username, week_start);
+
+-- Team-wide hours per week and project, so the dashboard totals do not
+-- grow with the number of users
+CREATE MATERIALIZED VIEW IF NOT EXISTS team_project_weekly_totals AS
+SELECT week_start,
+       project_id,
+       project_name,
+       SUM(total_hours) AS total_hours,
+       SUM(entry_count)::int AS entry_count,
+       COUNT(*)::int AS user_count
+FROM team_weekly_totals
+GROUP BY 1, 2, 3;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_team_project_weekly_totals_key
+    ON team_project_weekly_totals (week_start, project_id);
+
+-- Postgres does not record when a materialized view was refreshed
+CREATE TABLE IF NOT EXISTS materialized_view_refreshes (
+    view_name TEXT PRIMARY KEY,
+    refreshed_at TIMESTAMPTZ NOT NULL
+);
+
+INSERT INTO materialized_view_refreshes (view_name, refreshed_at)
+VALUES ('team_weekly_totals', NOW()), ('team_project_weekly_totals', NOW())
+ON CONFLICT (view_name) DO NOTHING;
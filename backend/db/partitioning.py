@@ -0,0 +1,281 @@
+"""Monthly range partitioning of time_entries on entry_date.
+
+Partitioning is opt-in: an existing (or empty) time_entries table is
+converted once with ``python -m db.partitioning convert``. After that,
+``maintain`` pre-creates the partitions for the coming months and, when a
+retention is configured, detaches partitions older than that and moves
+them to the ``archive`` schema. Rows outside every monthly partition land
+in ``time_entries_default``.
+
+    python -m db.partitioning convert
+    python -m db.partitioning maintain
+    python -m db.partitioning check-pruning
+"""
+import re
+import sys
+import os
+from datetime import date
+from db.server import connect_to_db
+
+PARTITION_LOCK_KEY = 7341903
+PARENT_TABLE = "time_entries"
+DEFAULT_PARTITION = "time_entries_default"
+ARCHIVE_SCHEMA = "archive"
+PARTITION_NAME_PATTERN = re.compile(r"^time_entries_(\d{4})_(\d{2})$")
+
+PARTITIONED_TABLE_SQL = """
+    CREATE TABLE time_entries (
+        id INT NOT NULL DEFAULT nextval('time_entries_id_seq'),
+        user_id UUID NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+        project_id INT NOT NULL REFERENCES projects(id) ON DELETE RESTRICT,
+        description TEXT,
+        hours NUMERIC(5,2) NOT NULL CHECK (hours > 0),
+        created_at TIMESTAMP DEFAULT NOW(),
+        entry_date DATE NOT NULL DEFAULT CURRENT_DATE
+    ) PARTITION BY RANGE (entry_date)
+"""
+
+# Created on the parent, so every partition gets them. Mirrors migrations 0002 and 0005
+PARTITIONED_INDEXES_SQL = [
+    "ALTER TABLE time_entries ADD PRIMARY KEY (id, entry_date)",
+    "CREATE INDEX idx_time_entries_user_date ON time_entries (user_id, entry_date) INCLUDE (project_id, hours)",
+    "CREATE INDEX idx_time_entries_user_project_date ON time_entries (user_id, project_id, entry_date)",
+    "CREATE INDEX idx_time_entries_user_date_id ON time_entries (user_id, entry_date DESC, id DESC)",
+]
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def partition_name(month: date) -> str:
+    return f"time_entries_{month.year:04d}_{month.month:02d}"
+
+def partition_month(name: str):
+    """Month covered by a partition named time_entries_YYYY_MM, or None for other tables."""
+    match = PARTITION_NAME_PATTERN.match(name)
+    if not match:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+def plan_maintenance(existing_months, today: date, months_ahead: int, retention_months: int) -> tuple:
+    """Return (months to create, months to archive) for the given partition months.
+
+    Partitions are kept from the current month through months_ahead months
+    ahead. With a positive retention_months, partitions that end before
+    the first day of the month retention_months ago are archived.
+    """
+    existing = set(existing_months)
+    current = month_start(today)
+    to_create = [add_months(current, offset) for offset in range(months_ahead + 1)
+                 if add_months(current, offset) not in existing]
+    to_archive = []
+    if retention_months > 0:
+        cutoff = add_months(current, -retention_months)
+        to_archive = sorted(month for month in existing if month < cutoff)
+    return to_create, to_archive
+
+def is_partitioned(conn) -> bool:
+    cursor = conn.cursor()
+    cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", (PARENT_TABLE,))
+    row = cursor.fetchone()
+    return row is not None and row[0] == "p"
+
+def list_partition_months(conn) -> list:
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(%s)
+    """, (PARENT_TABLE,))
+    months = (partition_month(row[0]) for row in cursor.fetchall())
+    return sorted(month for month in months if month is not None)
+
+def get_archived_before(conn):
+    """First day not covered by archived partitions, or None when nothing was archived.
+
+    Archived months keep their rows in the daily rollup, so rollup checks
+    and rebuilds only look at days from this date on.
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT c.relname
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = %s AND c.relkind = 'r'
+    """, (ARCHIVE_SCHEMA,))
+    months = [partition_month(row[0]) for row in cursor.fetchall()]
+    months = [month for month in months if month is not None]
+    return add_months(max(months), 1) if months else None
+
+def create_partition(cursor, month: date):
+    """Create and attach the partition for one month, moving its rows out of the default partition."""
+    name = partition_name(month)
+    lower, upper = month, add_months(month, 1)
+    cursor.execute(f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+    cursor.execute(f"""
+        WITH moved AS (
+            DELETE FROM {DEFAULT_PARTITION} WHERE entry_date >= %s AND entry_date < %s RETURNING *
+        )
+        INSERT INTO {name} SELECT * FROM moved
+    """, (lower, upper))
+    cursor.execute(f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s)", (lower, upper))
+
+def archive_partition(cursor, month: date):
+    name = partition_name(month)
+    cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}")
+    cursor.execute(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}")
+    cursor.execute(f"ALTER TABLE {name} SET SCHEMA {ARCHIVE_SCHEMA}")
+
+def convert_to_partitioned(conn, months_ahead: int = 3) -> int:
+    """Rebuild time_entries as a partitioned table in one transaction. Returns the rows copied.
+
+    Takes an ACCESS EXCLUSIVE lock for the duration of the copy, so run it
+    in a maintenance window.
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT pg_advisory_xact_lock(%s)", (PARTITION_LOCK_KEY,))
+        if is_partitioned(conn):
+            raise ValueError("time_entries is already partitioned")
+        cursor.execute(f"LOCK TABLE {PARENT_TABLE} IN ACCESS EXCLUSIVE MODE")
+        cursor.execute("SELECT COUNT(*) FROM time_entries WHERE entry_date IS NULL")
+        if cursor.fetchone()[0]:
+            raise ValueError("time_entries has rows without entry_date; set it before partitioning")
+        cursor.execute("SELECT MIN(entry_date) FROM time_entries")
+        oldest = cursor.fetchone()[0]
+
+        cursor.execute("ALTER TABLE time_entries RENAME TO time_entries_unpartitioned")
+        cursor.execute("ALTER SEQUENCE time_entries_id_seq OWNED BY NONE")
+        cursor.execute(PARTITIONED_TABLE_SQL)
+        cursor.execute(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT")
+        current = month_start(date.today())
+        month = month_start(oldest) if oldest and oldest < current else current
+        while month <= add_months(current, months_ahead):
+            create_partition(cursor, month)
+            month = add_months(month, 1)
+
+        cursor.execute("""
+            INSERT INTO time_entries (id, user_id, project_id, description, hours, created_at, entry_date)
+            SELECT id, user_id, project_id, description, hours, created_at, entry_date
+            FROM time_entries_unpartitioned
+        """)
+        copied = cursor.rowcount
+        cursor.execute("DROP TABLE time_entries_unpartitioned")
+        cursor.execute("ALTER SEQUENCE time_entries_id_seq OWNED BY time_entries.id")
+        for statement in PARTITIONED_INDEXES_SQL:
+            cursor.execute(statement)
+        conn.commit()
+        return copied
+    except Exception:
+        conn.rollback()
+        raise
+
+def maintain_partitions(conn=None, months_ahead: int = None, retention_months: int = None, today: date = None) -> dict:
+    """Pre-create upcoming monthly partitions and archive expired ones. No-op when not partitioned."""
+    if months_ahead is None:
+        months_ahead = int(os.getenv("TIME_ENTRIES_PARTITION_MONTHS_AHEAD", 3))
+    if retention_months is None:
+        retention_months = int(os.getenv("TIME_ENTRIES_RETENTION_MONTHS", 0))
+    owns_connection = conn is None
+    if owns_connection:
+        conn = connect_to_db()
+    cursor = conn.cursor()
+    try:
+        # Every worker runs this at startup; the lock makes them take turns
+        cursor.execute("SELECT pg_advisory_xact_lock(%s)", (PARTITION_LOCK_KEY,))
+        if not is_partitioned(conn):
+            conn.rollback()
+            return {"partitioned": False, "created": [], "archived": []}
+        to_create, to_archive = plan_maintenance(list_partition_months(conn), today or date.today(),
+                                                 months_ahead, retention_months)
+        for month in to_create:
+            create_partition(cursor, month)
+        for month in to_archive:
+            archive_partition(cursor, month)
+        conn.commit()
+        return {
+            "partitioned": True,
+            "created": [partition_name(month) for month in to_create],
+            "archived": [partition_name(month) for month in to_archive],
+        }
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        if owns_connection:
+            conn.close()
+
+def scanned_partitions(plan) -> list:
+    """Names of the time_entries partitions an EXPLAIN (FORMAT JSON) plan reads."""
+    names = set()
+    stack = [plan[0]["Plan"]] if isinstance(plan, list) else [plan["Plan"]]
+    while stack:
+        node = stack.pop()
+        relation = node.get("Relation Name")
+        if relation and (relation == DEFAULT_PARTITION or partition_month(relation) is not None):
+            names.add(relation)
+        stack.extend(node.get("Plans", []))
+    return sorted(names)
+
+def check_partition_pruning(conn, start_date: date, end_date: date) -> list:
+    """EXPLAIN the summary reads over [start_date, end_date] and report which partitions each one scans.
+
+    A query prunes correctly when it only touches the partitions of the
+    months in the range (plus the default partition when it cannot be ruled out).
+    """
+    from services.checking import WEEK_ENTRIES, WEEK_ENTRIES_BY_PROJECT, build_time_entry_filters
+    from db.prepared import get_statement_sql
+
+    user_id = "00000000-0000-0000-0000-000000000000"
+    where_sql, page_params = build_time_entry_filters(user_id, start_date, end_date)
+    queries = [
+        (WEEK_ENTRIES, get_statement_sql(WEEK_ENTRIES), (user_id, start_date, end_date)),
+        (WEEK_ENTRIES_BY_PROJECT, get_statement_sql(WEEK_ENTRIES_BY_PROJECT), (user_id, start_date, end_date, 1)),
+        ("time_entries_page", f"SELECT te.* FROM time_entries te WHERE {where_sql} ORDER BY te.entry_date DESC, te.id DESC LIMIT 101", tuple(page_params)),
+    ]
+    expected = set()
+    month = month_start(start_date)
+    while month <= end_date:
+        expected.add(partition_name(month))
+        month = add_months(month, 1)
+
+    cursor = conn.cursor()
+    results = []
+    for name, sql, params in queries:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        scanned = scanned_partitions(cursor.fetchone()[0])
+        unexpected = [partition for partition in scanned if partition not in expected and partition != DEFAULT_PARTITION]
+        results.append({"query": name, "scanned": scanned, "pruned": not unexpected})
+    conn.rollback()
+    return results
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "maintain"
+    if command not in ("convert", "maintain", "check-pruning"):
+        print("Usage: python -m db.partitioning [convert|maintain|check-pruning]")
+        sys.exit(2)
+    conn = connect_to_db()
+    try:
+        if command == "convert":
+            print(f"Converted time_entries to monthly partitions: {convert_to_partitioned(conn)} rows copied.")
+        elif command == "maintain":
+            result = maintain_partitions(conn)
+            if not result["partitioned"]:
+                print("time_entries is not partitioned, nothing to do.")
+            else:
+                print(f"Created: {', '.join(result['created']) or 'none'}. Archived: {', '.join(result['archived']) or 'none'}.")
+        else:
+            today = date.today()
+            monday = date.fromordinal(today.toordinal() - today.weekday())
+            results = check_partition_pruning(conn, monday, date.fromordinal(monday.toordinal() + 6))
+            for result in results:
+                print(f"{result['query']}: {'pruned' if result['pruned'] else 'NOT PRUNED'} ({', '.join(result['scanned'])})")
+            sys.exit(0 if all(result["pruned"] for result in results) else 1)
+    finally:
+        conn.close()
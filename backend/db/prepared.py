@@ -0,0 +1,84 @@
+import os
+import re
+import threading
+import weakref
+import psycopg2
+from db.query import execute
+
+# name -> SQL with %s placeholders, registered by the service modules at import time
+_statements = {}
+_statements_lock = threading.Lock()
+
+# connection -> {statement name: prepared successfully}; entries vanish with the connection
+_prepared_connections = weakref.WeakKeyDictionary()
+
+_PLACEHOLDER = re.compile(r"%s")
+
+def prepared_statements_enabled() -> bool:
+    # Disable behind PgBouncer in transaction pooling mode, where session state is not kept
+    return os.getenv("DB_PREPARED_STATEMENTS", "true").lower() not in ("0", "false", "no", "off")
+
+def register_statement(name: str, sql: str) -> str:
+    """Register a hot statement to be prepared on every pooled connection. Returns its name."""
+    with _statements_lock:
+        if _statements.get(name, sql) != sql:
+            raise ValueError(f"Prepared statement {name} is already registered with different SQL")
+        _statements[name] = sql
+    return name
+
+def get_statement_sql(name: str) -> str:
+    return _statements[name]
+
+def to_positional(sql: str) -> str:
+    """Turn psycopg2 %s placeholders into PREPARE's $1, $2, ..."""
+    counter = iter(range(1, sql.count("%s") + 1))
+    return _PLACEHOLDER.sub(lambda _: f"${next(counter)}", sql)
+
+def prepare_statements(conn) -> dict:
+    """PREPARE every registered statement this connection has not seen yet.
+
+    Called at checkout, so it costs one dictionary lookup once a connection
+    is set up. A statement that fails to prepare (e.g. before migrations ran)
+    is remembered as failed and executed as plain SQL on this connection.
+    """
+    try:
+        state = _prepared_connections.get(conn)
+    except TypeError:
+        return {}
+    with _statements_lock:
+        statements = dict(_statements)
+    if state is not None and len(state) == len(statements):
+        return state
+    state = dict(state or {})
+    cursor = conn.cursor()
+    try:
+        for name, sql in statements.items():
+            if name in state:
+                continue
+            try:
+                cursor.execute(f"PREPARE {name} AS {to_positional(sql)}")
+                conn.commit()
+                state[name] = True
+            except psycopg2.Error as e:
+                conn.rollback()
+                state[name] = False
+                print(f"Warning: Could not prepare statement {name}: {str(e).strip()}")
+    finally:
+        cursor.close()
+    _prepared_connections[conn] = state
+    return state
+
+def is_prepared(conn, name: str) -> bool:
+    try:
+        return _prepared_connections.get(conn, {}).get(name, False)
+    except TypeError:
+        return False
+
+def execute_prepared(cursor, label: str, name: str, params=()):
+    """Execute a registered statement by name, or as plain SQL if this connection has not prepared it."""
+    if is_prepared(cursor.connection, name):
+        placeholders = ", ".join(["%s"] * len(params))
+        sql = f"EXECUTE {name} ({placeholders})" if params else f"EXECUTE {name}"
+        execute(cursor, label, sql, params or None, source_sql=_statements[name])
+    else:
+        execute(cursor, label, _statements[name], params)
@@ -0,0 +1,180 @@
+import random
+import threading
+import time
+import os
+import psycopg2
+import psycopg2.extras
+from collections import deque
+from datetime import datetime, timezone
+from lib.metrics import Histogram
+
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Time spent executing SQL, by service function",
+    ["function"],
+)
+
+MAX_PARAMS_SHAPE = 20
+
+
+class SlowQueryLog:
+    """Ring buffer of queries slower than a threshold, with sampled query plans.
+
+    Queries over ``threshold_ms`` are printed and kept (newest last, at most
+    ``max_entries``). For a ``explain_sample_rate`` fraction of slow SELECTs
+    the statement is re-run under EXPLAIN (ANALYZE, BUFFERS) on the same
+    connection and the plan is stored with the entry. Only the shape of the
+    parameters (their types) is recorded, never their values.
+    """
+
+    def __init__(self, threshold_ms: float = 200.0, explain_sample_rate: float = 0.0, max_entries: int = 100):
+        self.threshold_ms = threshold_ms
+        self.explain_sample_rate = explain_sample_rate
+        self._entries = deque(maxlen=max_entries)
+        self._lock = threading.Lock()
+        self._total = 0
+
+    def is_slow(self, duration_ms: float) -> bool:
+        return self.threshold_ms >= 0 and duration_ms >= self.threshold_ms
+
+    def should_explain(self, sql: str) -> bool:
+        # EXPLAIN ANALYZE executes the statement again, so only ever do it for reads
+        if self.explain_sample_rate <= 0 or not sql.lstrip()[:6].upper() == "SELECT":
+            return False
+        return random.random() < self.explain_sample_rate
+
+    def record(self, label: str, sql: str, params, duration_ms: float, rowcount: int, plan=None) -> dict:
+        entry = {
+            "function": label,
+            "duration_ms": round(duration_ms, 3),
+            "rowcount": rowcount,
+            "params_shape": params_shape(params),
+            "query": " ".join(sql.split()),
+            "captured_at": datetime.now(timezone.utc).isoformat(),
+            "plan": plan,
+        }
+        with self._lock:
+            self._entries.append(entry)
+            self._total += 1
+        print(f"Slow query: {label} took {entry['duration_ms']} ms ({rowcount} rows, params {entry['params_shape']})")
+        return entry
+
+    def entries(self) -> list:
+        """Recorded slow queries, newest first."""
+        with self._lock:
+            return list(reversed(self._entries))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "threshold_ms": self.threshold_ms,
+                "explain_sample_rate": self.explain_sample_rate,
+                "buffered": len(self._entries),
+                "max_entries": self._entries.maxlen,
+                "total": self._total,
+            }
+
+
+def params_shape(params):
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: type(value).__name__ for key, value in params.items()}
+    shape = [type(value).__name__ for value in list(params)[:MAX_PARAMS_SHAPE]]
+    if len(params) > MAX_PARAMS_SHAPE:
+        shape.append(f"... {len(params) - MAX_PARAMS_SHAPE} more")
+    return shape
+
+def explain_analyze(cursor, sql: str, params):
+    """Return the EXPLAIN (ANALYZE, BUFFERS) plan for a statement, or None if it fails.
+
+    Runs inside a savepoint so a failing EXPLAIN does not abort the caller's transaction.
+    """
+    conn = cursor.connection
+    explain_cursor = conn.cursor()
+    use_savepoint = not conn.autocommit
+    try:
+        if use_savepoint:
+            explain_cursor.execute("SAVEPOINT slow_query_explain")
+        explain_cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}", params)
+        plan = explain_cursor.fetchone()[0]
+        if use_savepoint:
+            explain_cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+        return plan
+    except psycopg2.Error as e:
+        if use_savepoint:
+            try:
+                explain_cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            except psycopg2.Error:
+                pass
+        return {"error": str(e).strip()}
+    finally:
+        explain_cursor.close()
+
+
+_slow_query_log = None
+_slow_query_log_lock = threading.Lock()
+
+def get_slow_query_log() -> SlowQueryLog:
+    global _slow_query_log
+    if _slow_query_log is None:
+        with _slow_query_log_lock:
+            if _slow_query_log is None:
+                _slow_query_log = SlowQueryLog(
+                    threshold_ms=float(os.getenv("SLOW_QUERY_THRESHOLD_MS", 200)),
+                    explain_sample_rate=float(os.getenv("SLOW_QUERY_EXPLAIN_SAMPLE_RATE", 0)),
+                    max_entries=int(os.getenv("SLOW_QUERY_LOG_SIZE", 100)),
+                )
+    return _slow_query_log
+
+
+def execute(cursor, label: str, sql: str, params=None, source_sql: str = None):
+    """Run cursor.execute, labelled with the service function issuing the query.
+
+    Records the duration, and hands queries over the slow-query threshold to
+    the slow-query log together with their row count and parameter shape.
+    ``source_sql`` is the statement an ``EXECUTE name (...)`` stands for; it
+    is what gets logged and decides whether the query may be explained.
+    """
+    started = time.perf_counter()
+    try:
+        if params is None:
+            cursor.execute(sql)
+        else:
+            cursor.execute(sql, params)
+    finally:
+        elapsed = time.perf_counter() - started
+        DB_QUERY_DURATION.labels(label).observe(elapsed)
+
+    slow_query_log = get_slow_query_log()
+    duration_ms = elapsed * 1000
+    if slow_query_log.is_slow(duration_ms):
+        plan = None
+        # Named (server-side) cursors hold the connection mid-fetch, so they are never explained
+        if getattr(cursor, "name", None) is None and slow_query_log.should_explain(source_sql or sql):
+            # EXPLAIN EXECUTE shows the prepared statement's own (possibly generic) plan
+            plan = explain_analyze(cursor, sql, params)
+        slow_query_log.record(label, source_sql or sql, params, duration_ms, cursor.rowcount, plan)
+
+def execute_values(cursor, label: str, sql: str, rows: list, page_size: int = 1000):
+    """Run psycopg2.extras.execute_values with the same timing and slow-query logging as execute().
+
+    The statement may span several pages, so the logged row count is the
+    number of rows sent and the parameter shape is that of the first row.
+    Multi-row writes are never explained.
+    """
+    started = time.perf_counter()
+    try:
+        psycopg2.extras.execute_values(cursor, sql, rows, page_size=page_size)
+    finally:
+        elapsed = time.perf_counter() - started
+        DB_QUERY_DURATION.labels(label).observe(elapsed)
+
+    slow_query_log = get_slow_query_log()
+    duration_ms = elapsed * 1000
+    if slow_query_log.is_slow(duration_ms):
+        slow_query_log.record(label, sql, rows[0] if rows else None, duration_ms, len(rows))
@@ -0,0 +1,94 @@
+import sys
+from db.server import connect_to_db
+
+# Rows where the rollup disagrees with an aggregate of the raw entries
+VERIFY_DAILY_TOTALS_SQL = """
+    WITH raw AS (
+        SELECT user_id, project_id, entry_date AS day, SUM(hours) AS total_hours, COUNT(*) AS entry_count
+        FROM time_entries
+        WHERE entry_date IS NOT NULL AND entry_date >= %(since)s
+        GROUP BY user_id, project_id, entry_date
+    ),
+    rollup AS (
+        SELECT user_id, project_id, day, total_hours, entry_count
+        FROM time_entry_daily_totals
+        WHERE (entry_count <> 0 OR total_hours <> 0) AND day >= %(since)s
+    )
+    SELECT COALESCE(raw.user_id, rollup.user_id), COALESCE(raw.project_id, rollup.project_id),
+           COALESCE(raw.day, rollup.day), raw.total_hours, rollup.total_hours, raw.entry_count, rollup.entry_count
+    FROM raw
+    FULL OUTER JOIN rollup
+        ON raw.user_id = rollup.user_id AND raw.project_id = rollup.project_id AND raw.day = rollup.day
+    WHERE raw.total_hours IS DISTINCT FROM rollup.total_hours
+       OR raw.entry_count IS DISTINCT FROM rollup.entry_count
+    ORDER BY 1, 3, 2
+"""
+
+def verify_daily_totals(conn, since=None) -> list:
+    """Compare the daily rollup against the raw entries from since on (default: all days) and return every mismatch"""
+    cursor = conn.cursor()
+    cursor.execute(VERIFY_DAILY_TOTALS_SQL, {"since": since or "-infinity"})
+    mismatches = [
+        {
+            "user_id": str(row[0]),
+            "project_id": row[1],
+            "day": row[2].isoformat(),
+            "expected_hours": float(row[3] or 0),
+            "rollup_hours": float(row[4] or 0),
+            "expected_count": row[5] or 0,
+            "rollup_count": row[6] or 0,
+        }
+        for row in cursor.fetchall()
+    ]
+    conn.rollback()
+    return mismatches
+
+def rebuild_daily_totals(conn, since=None) -> int:
+    """Recompute the rollup from raw entries in one transaction. Returns the number of rows written
+
+    With since, only days from that date on are rebuilt, so totals for
+    archived partitions (see db/partitioning.py) are kept.
+    """
+    cursor = conn.cursor()
+    try:
+        # SHARE mode blocks concurrent inserts into time_entries until the rebuild commits
+        cursor.execute("LOCK TABLE time_entries IN SHARE MODE")
+        cursor.execute("LOCK TABLE time_entry_daily_totals IN EXCLUSIVE MODE")
+        if since is None:
+            cursor.execute("DELETE FROM time_entry_daily_totals")
+        else:
+            cursor.execute("DELETE FROM time_entry_daily_totals WHERE day >= %s", (since,))
+        cursor.execute("""
+            INSERT INTO time_entry_daily_totals (user_id, project_id, day, total_hours, entry_count)
+            SELECT user_id, project_id, entry_date, SUM(hours), COUNT(*)
+            FROM time_entries
+            WHERE entry_date IS NOT NULL AND entry_date >= %s
+            GROUP BY user_id, project_id, entry_date
+        """, (since or "-infinity",))
+        rebuilt = cursor.rowcount
+        conn.commit()
+        return rebuilt
+    except Exception:
+        conn.rollback()
+        raise
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "verify"
+    if command not in ("verify", "rebuild"):
+        print("Usage: python -m db.rollups [verify|rebuild]")
+        sys.exit(2)
+    from db.partitioning import get_archived_before
+    conn = connect_to_db()
+    try:
+        since = get_archived_before(conn)
+        if since is not None:
+            print(f"Skipping archived days before {since}.")
+        if command == "rebuild":
+            print(f"Rebuilt daily totals: {rebuild_daily_totals(conn, since)} rows.")
+        mismatches = verify_daily_totals(conn, since)
+        for mismatch in mismatches:
+            print(f"Mismatch: {mismatch}")
+        print(f"{len(mismatches)} mismatched rows.")
+        sys.exit(1 if mismatches else 0)
+    finally:
+        conn.close()
@@ -1,14 +1,493 @@
 import psycopg2
+import psycopg2.extensions
 from dotenv import load_dotenv
+from contextlib import contextmanager
+from collections import deque
+from lib.metrics import REGISTRY, Counter, Gauge, Histogram
+from db.prepared import prepare_statements, prepared_statements_enabled
+import threading
+import time
 import os
 
 load_dotenv()
 
+def connection_params() -> dict:
+    return {
+        "host": os.getenv("DB_HOST"),
+        "port": os.getenv("DB_PORT", "5432"),
+        "database": os.getenv("DB_NAME"),
+        "user": os.getenv("DB_USER"),
+        "password": os.getenv("DB_PASSWORD"),
+    }
+
 def connect_to_db():
-    conn = psycopg2.connect(
-        host=os.getenv("DB_HOST"),
-        database=os.getenv("DB_NAME"),
-        user=os.getenv("DB_USER"),
-        password=os.getenv("DB_PASSWORD"),
-    )
-    return conn
\ No newline at end of file
+    conn = psycopg2.connect(**connection_params())
+    return conn
+
+def replica_connection_params() -> list:
+    """Connection settings for each entry of DB_REPLICA_HOSTS (comma separated).
+
+    An entry is either ``host[:port]``, sharing database and credentials with
+    the primary, or a full libpq DSN / ``postgresql://`` URI.
+    """
+    replicas = []
+    for entry in os.getenv("DB_REPLICA_HOSTS", "").split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        if "://" in entry or "=" in entry:
+            replicas.append({"dsn": entry})
+            continue
+        host, _, port = entry.partition(":")
+        replicas.append({**connection_params(), "host": host, "port": port or "5432"})
+    return replicas
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection could be checked out before the acquire timeout."""
+
+
+class ConnectionPool:
+    """Thread-safe pool of psycopg2 connections.
+
+    Connections are borrowed with ``pool.connection()`` and always returned,
+    rolled back to a clean state. Idle connections above ``min_size`` are
+    closed after ``idle_timeout`` seconds, and connections that sat idle for
+    longer than ``health_check_interval`` are pinged before being handed out.
+    """
+
+    def __init__(self, min_size=1, max_size=10, idle_timeout=300.0, acquire_timeout=10.0,
+                 health_check_interval=30.0, connect=connect_to_db):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Invalid pool size: min_size must be between 0 and max_size")
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+        self.health_check_interval = health_check_interval
+        self._connect = connect
+        self._idle = deque()  # (conn, returned_at), most recently used on the right
+        self._in_use = set()
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._waits = 0
+        self._wait_time = 0.0
+        self._checkouts = 0
+        self._discarded = 0
+
+    def open(self):
+        """Pre-fill the pool up to min_size connections."""
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._idle.append((conn, time.monotonic()))
+                self._cond.notify()
+
+    def acquire(self):
+        deadline = time.monotonic() + self.acquire_timeout
+        waited_since = None
+        while True:
+            conn = None
+            returned_at = None
+            create = False
+            with self._cond:
+                if self._closed:
+                    raise PoolTimeoutError("Connection pool is closed")
+                while not self._idle and self._size >= self.max_size:
+                    if waited_since is None:
+                        waited_since = time.monotonic()
+                        self._waits += 1
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._wait_time += time.monotonic() - waited_since
+                        raise PoolTimeoutError(
+                            f"Timed out after {self.acquire_timeout}s waiting for a database connection"
+                        )
+                    self._cond.wait(remaining)
+                    if self._closed:
+                        raise PoolTimeoutError("Connection pool is closed")
+                if waited_since is not None:
+                    self._wait_time += time.monotonic() - waited_since
+                    waited_since = None
+                if self._idle:
+                    conn, returned_at = self._idle.pop()
+                else:
+                    self._size += 1
+                    create = True
+                self._checkouts += 1
+
+            if create:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+            elif not self._is_healthy(conn, returned_at):
+                self._discard(conn)
+                continue
+
+            with self._cond:
+                self._in_use.add(conn)
+            return conn
+
+    def release(self, conn, discard=False):
+        with self._cond:
+            self._in_use.discard(conn)
+        if not discard and not conn.closed:
+            try:
+                if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                discard = True
+        if discard or conn.closed:
+            self._discard(conn)
+            return
+        with self._cond:
+            if self._closed:
+                self._size -= 1
+                conn.close()
+                return
+            self._idle.append((conn, time.monotonic()))
+            self._reap_idle()
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        discard = False
+        try:
+            yield conn
+        except psycopg2.InterfaceError:
+            discard = True
+            raise
+        except psycopg2.OperationalError:
+            discard = True
+            raise
+        finally:
+            self.release(conn, discard=discard)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "size": self._size,
+                "in_use": len(self._in_use),
+                "idle": len(self._idle),
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "wait_time_seconds": round(self._wait_time, 6),
+                "discarded": self._discarded,
+            }
+
+    def _is_healthy(self, conn, returned_at) -> bool:
+        if conn.closed:
+            return False
+        if time.monotonic() - returned_at < self.health_check_interval:
+            return True
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._size -= 1
+            self._discarded += 1
+            self._cond.notify()
+
+    def _reap_idle(self):
+        # Caller holds self._cond. Oldest idle connections sit on the left.
+        now = time.monotonic()
+        while (self._idle and self._size > self.min_size
+               and now - self._idle[0][1] > self.idle_timeout):
+            conn, _ = self._idle.popleft()
+            self._size -= 1
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+class ReplicaRouter:
+    """Hands out replica connections for read-only work, round robin.
+
+    A replica whose connection fails is skipped for ``retry_interval``
+    seconds; one whose pool is merely exhausted is only skipped for that
+    call. Keys passed to ``mark_write`` (user ids) stay on the primary for
+    ``sticky_seconds`` so a user reads their own writes despite replication
+    lag. ``acquire`` returns None whenever the caller should use the primary.
+    """
+
+    def __init__(self, pools, retry_interval=30.0, sticky_seconds=5.0):
+        if not pools:
+            raise ValueError("ReplicaRouter needs at least one replica pool")
+        self._pools = list(pools)
+        self.retry_interval = retry_interval
+        self.sticky_seconds = sticky_seconds
+        self._down_until = [0.0] * len(self._pools)
+        self._sticky = {}  # key -> monotonic time the stickiness ends
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def mark_write(self, key):
+        if key is None or self.sticky_seconds <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._sticky[key] = now + self.sticky_seconds
+            if len(self._sticky) > 10000:
+                self._sticky = {k: until for k, until in self._sticky.items() if until > now}
+
+    def is_sticky(self, key) -> bool:
+        if key is None:
+            return False
+        with self._lock:
+            until = self._sticky.get(key)
+            if until is None:
+                return False
+            if until > time.monotonic():
+                return True
+            del self._sticky[key]
+            return False
+
+    def mark_down(self, index):
+        with self._lock:
+            self._down_until[index] = time.monotonic() + self.retry_interval
+
+    def is_healthy(self, index) -> bool:
+        with self._lock:
+            return self._down_until[index] <= time.monotonic()
+
+    def acquire(self, sticky_key=None):
+        """Return (replica index, connection), or None to read from the primary."""
+        if self.is_sticky(sticky_key):
+            DB_READS.labels("sticky").inc()
+            return None
+        with self._lock:
+            start = self._next
+            self._next = (self._next + 1) % len(self._pools)
+        for offset in range(len(self._pools)):
+            index = (start + offset) % len(self._pools)
+            if not self.is_healthy(index):
+                continue
+            try:
+                conn = self._pools[index].acquire()
+            except PoolTimeoutError:
+                # Saturated, not broken: try the next replica, or the primary for this read only
+                continue
+            except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+                self.mark_down(index)
+                print(f"Warning: Read replica {index} unavailable, skipping it for {self.retry_interval:g}s: {str(e).strip()}")
+                continue
+            DB_READS.labels("replica").inc()
+            return index, conn
+        DB_READS.labels("fallback").inc()
+        return None
+
+    def release(self, index, conn, discard=False):
+        self._pools[index].release(conn, discard=discard)
+
+    def open(self):
+        for index, pool in enumerate(self._pools):
+            try:
+                pool.open()
+            except psycopg2.Error as e:
+                self.mark_down(index)
+                print(f"Warning: Read replica {index} warm-up failed: {str(e).strip()}")
+
+    def close(self):
+        for pool in self._pools:
+            pool.close()
+
+    def stats(self) -> list:
+        return [
+            {"replica": index, "healthy": self.is_healthy(index), **pool.stats()}
+            for index, pool in enumerate(self._pools)
+        ]
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool() -> ConnectionPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    min_size=int(os.getenv("DB_POOL_MIN_SIZE", 1)),
+                    max_size=int(os.getenv("DB_POOL_MAX_SIZE", 10)),
+                    idle_timeout=float(os.getenv("DB_POOL_IDLE_TIMEOUT", 300)),
+                    acquire_timeout=float(os.getenv("DB_POOL_ACQUIRE_TIMEOUT", 10)),
+                    health_check_interval=float(os.getenv("DB_POOL_HEALTH_CHECK_INTERVAL", 30)),
+                )
+    return _pool
+
+_replica_router = None
+_replica_router_lock = threading.Lock()
+
+def get_replica_router():
+    """The read replica router, or None when DB_REPLICA_HOSTS is not set."""
+    global _replica_router
+    if _replica_router is None:
+        replicas = replica_connection_params()
+        if not replicas:
+            return None
+        with _replica_router_lock:
+            if _replica_router is None:
+                pools = [
+                    ConnectionPool(
+                        min_size=int(os.getenv("DB_REPLICA_POOL_MIN_SIZE", 1)),
+                        max_size=int(os.getenv("DB_REPLICA_POOL_MAX_SIZE", os.getenv("DB_POOL_MAX_SIZE", 10))),
+                        idle_timeout=float(os.getenv("DB_POOL_IDLE_TIMEOUT", 300)),
+                        # Give up on a replica quickly and read from the primary instead
+                        acquire_timeout=float(os.getenv("DB_REPLICA_ACQUIRE_TIMEOUT", 2)),
+                        health_check_interval=float(os.getenv("DB_POOL_HEALTH_CHECK_INTERVAL", 30)),
+                        connect=lambda params=params: psycopg2.connect(**params),
+                    )
+                    for params in replicas
+                ]
+                _replica_router = ReplicaRouter(
+                    pools,
+                    retry_interval=float(os.getenv("DB_REPLICA_RETRY_INTERVAL", 30)),
+                    sticky_seconds=float(os.getenv("DB_REPLICA_STICKY_SECONDS", 5)),
+                )
+    return _replica_router
+
+def init_pool() -> ConnectionPool:
+    pool = get_pool()
+    pool.open()
+    router = get_replica_router()
+    if router is not None:
+        router.open()
+    return pool
+
+def close_pool():
+    global _pool, _replica_router
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+    with _replica_router_lock:
+        if _replica_router is not None:
+            _replica_router.close()
+            _replica_router = None
+
+DB_POOL_ACQUIRE_DURATION = Histogram(
+    "db_pool_acquire_seconds",
+    "Time spent waiting for a pooled connection, including new connection setup",
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections",
+    "Pooled connections by state",
+    ["state"],
+)
+DB_READS = Counter(
+    "db_reads_total",
+    "Read-only checkouts when replicas are configured, by where they were served",
+    ["route"],
+)
+
+@contextmanager
+def get_connection():
+    """Borrow a pooled connection for the duration of the with-block."""
+    started = time.perf_counter()
+    with get_pool().connection() as conn:
+        DB_POOL_ACQUIRE_DURATION.observe(time.perf_counter() - started)
+        if prepared_statements_enabled():
+            prepare_statements(conn)
+        yield conn
+
+@contextmanager
+def get_read_connection(sticky_key=None):
+    """Borrow a connection for read-only work.
+
+    Served by a read replica when DB_REPLICA_HOSTS is set, otherwise, or when
+    no replica is healthy, or while ``sticky_key`` recently wrote, by the
+    primary. A replica that fails mid-read is skipped for a while; the error
+    still propagates to the caller.
+    """
+    router = get_replica_router()
+    started = time.perf_counter()
+    checkout = router.acquire(sticky_key) if router is not None else None
+    if checkout is None:
+        with get_connection() as conn:
+            yield conn
+        return
+    index, conn = checkout
+    DB_POOL_ACQUIRE_DURATION.observe(time.perf_counter() - started)
+    discard = False
+    try:
+        if prepared_statements_enabled():
+            prepare_statements(conn)
+        yield conn
+    except psycopg2.extensions.QueryCanceledError:
+        # statement_timeout cancelled a slow read; the replica and its connection are fine
+        raise
+    except (psycopg2.InterfaceError, psycopg2.OperationalError):
+        discard = True
+        router.mark_down(index)
+        raise
+    finally:
+        router.release(index, conn, discard=discard)
+
+def mark_primary_write(sticky_key):
+    """Keep reads for ``sticky_key`` on the primary for DB_REPLICA_STICKY_SECONDS."""
+    router = get_replica_router()
+    if router is not None:
+        router.mark_write(sticky_key)
+
+def replicas_enabled() -> bool:
+    return get_replica_router() is not None
+
+def get_pool_stats() -> dict:
+    return get_pool().stats()
+
+def get_replica_stats() -> list:
+    router = get_replica_router()
+    return router.stats() if router is not None else []
+
+@REGISTRY.register_collector
+def _collect_pool_metrics():
+    # Only report an existing pool; a scrape should not open database connections
+    pool = _pool
+    if pool is None:
+        return
+    stats = pool.stats()
+    DB_POOL_CONNECTIONS.labels("in_use").set(stats["in_use"])
+    DB_POOL_CONNECTIONS.labels("idle").set(stats["idle"])
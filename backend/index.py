@@ -1,39 +1,89 @@
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Depends, Header, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from models.user import UserSignup, UserLogin
-from models.time import TimeEntry
-from datetime import datetime, timedelta
+from models.time import TimeEntry, TimeEntryBatch
+from datetime import date, datetime, timedelta
+from contextlib import asynccontextmanager
 
-from db.server import connect_to_db
+from db.server import get_connection, init_pool, close_pool, get_pool_stats, get_replica_stats
+from db.executor import run_db, shutdown_db_executor
 from db.init_db import init_database
+from db.partitioning import maintain_partitions
+from db.query import get_slow_query_log
 
 from lib.normalize_inputs import normalize_username, normalize_email
-from lib.validate_inputs import validate_password
-
-from services.checking import check_if_username_exists, check_if_email_exists, get_user, get_project_id, get_time_entries, get_time_entries_by_project, get_project_totals
-from services.inputing import store_user, store_time_entry
-
-from utils.password import hash_password, verify_password
+from lib.validate_inputs import validate_password, validate_hours, validate_entry_date
+
+from services.projects import get_project_registry
+from services.summary_cache import get_summary_cache
+from services.checking import MAX_PAGE_SIZE
+from services.inputing import UserAlreadyExistsError
+from services.write_batcher import close_time_entry_batcher
+from services.team import get_team_summary_refresher, MAX_TEAM_PAGE_SIZE, MAX_TEAM_WEEKS
+from services.trends import build_trends, TREND_BUCKETS, MAX_TREND_WEEKS, MAX_TREND_WINDOW
+from services.exporting import stream_time_entries_export, EXPORT_FORMATS
+from services.repository import get_user, get_project_registry_fresh, get_week_summary_data, get_time_entries_page, get_range_summary, get_daily_totals, get_team_summary, store_user, store_time_entry, store_time_entries
+
+from utils.password import hash_password_async, verify_password_async, PasswordPoolSaturated, get_password_pool_stats, shutdown_password_pool
 from utils.generate_uuid import generate_uuid
 from lib.jwt_token import generate_jwt_token
+from lib.pagination import decode_cursor
+from lib.serialization import FastJSONResponse
 
-from middlewares.auth_middleware import get_current_user
+from middlewares.auth_middleware import get_current_user, get_current_admin, token_cache
+from middlewares.metrics_middleware import MetricsMiddleware
+from middlewares.rate_limit_middleware import RateLimitMiddleware
+from lib.metrics import REGISTRY, CONTENT_TYPE as METRICS_CONTENT_TYPE
 
 import os
 import uvicorn
 
 
+# Initialize database and connection pool on startup, release connections on shutdown
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        init_database()
+    except Exception as e:
+        print(f"Warning: Database initialization failed: {e}")
+        print("The application will continue, but database operations may fail.")
+    try:
+        init_pool()
+    except Exception as e:
+        print(f"Warning: Connection pool warm-up failed: {e}")
+    try:
+        maintain_partitions()
+    except Exception as e:
+        print(f"Warning: Partition maintenance failed: {e}")
+    try:
+        get_project_registry().refresh()
+    except Exception as e:
+        print(f"Warning: Project registry load failed: {e}")
+    get_team_summary_refresher().start()
+    yield
+    await get_team_summary_refresher().stop()
+    await close_time_entry_batcher()
+    shutdown_password_pool()
+    shutdown_db_executor()
+    close_pool()
+
 app = FastAPI(
     title="Time Tracker APP API",
     description="API for the Time Tracker APP",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8000))
     uvicorn.run("index:app", host="0.0.0.0", port=port)
 
+# Token buckets per user (write routes) or client IP (auth routes); added before CORS
+# so 429 responses still carry the CORS headers
+if os.getenv("RATE_LIMIT_ENABLED", "true").lower() not in ("0", "false", "no", "off"):
+    app.add_middleware(RateLimitMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -42,27 +92,69 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize database on startup
-@app.on_event("startup")
-async def startup_event():
-    try:
-        init_database()
-    except Exception as e:
-        print(f"Warning: Database initialization failed: {e}")
-        print("The application will continue, but database operations may fail.")
+# Per-route request metrics for GET /metrics; cheap enough to leave on in production
+if os.getenv("METRICS_ENABLED", "true").lower() not in ("0", "false", "no", "off"):
+    app.add_middleware(MetricsMiddleware)
+
+def get_current_week() -> tuple:
+    # Calculate the current week (Monday to Sunday)
+    today = datetime.now()
+    # Get Monday of current week (weekday() returns 0=Monday, 6=Sunday)
+    days_since_monday = today.weekday()
+    monday = today - timedelta(days=days_since_monday)
+    sunday = monday + timedelta(days=6)
+    return monday.strftime("%Y-%m-%d"), sunday.strftime("%Y-%m-%d")
+
+def resolve_date_range(start: str | None, end: str | None) -> tuple:
+    # Missing bounds default to the current week
+    week_start, week_end = get_current_week()
+    start_date = date.fromisoformat(validate_entry_date(start) if start else week_start)
+    end_date = date.fromisoformat(validate_entry_date(end) if end else week_end)
+    if start_date > end_date:
+        raise ValueError("Start date must be on or before end date")
+    return start_date.isoformat(), end_date.isoformat()
 
 @app.get("/")
 async def root():
     return {"message": "Server is running"}
 
+def ping_database():
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1")
+
 @app.get("/health")
 async def health():
-    conn = connect_to_db()
-    if conn:
+    try:
+        await run_db(ping_database)
         return JSONResponse(status_code=200, content={"message": "Health check successful"})
-    else:
+    except Exception:
         return JSONResponse(status_code=500, content={"message": "Health check failed"})
 
+@app.get("/health/pool")
+async def pool_health():
+    stats = get_pool_stats()
+    replicas = get_replica_stats()
+    if replicas:
+        stats["replicas"] = replicas
+    return JSONResponse(status_code=200, content=stats)
+
+@app.get("/health/cache")
+async def cache_health():
+    return JSONResponse(status_code=200, content=get_summary_cache().stats())
+
+@app.get("/health/token_cache")
+async def token_cache_health():
+    return JSONResponse(status_code=200, content=token_cache.stats())
+
+@app.get("/health/password")
+async def password_health():
+    return JSONResponse(status_code=200, content=get_password_pool_stats())
+
+@app.get("/metrics")
+async def metrics():
+    return Response(content=REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
 @app.post("/v1/auth/signup")
 async def signup(user: UserSignup):
     #TODO: Implement signup logic.
@@ -83,17 +175,11 @@ async def signup(user: UserSignup):
     except ValueError as e:
         return JSONResponse(status_code=400, content={"message": str(e)})
 
-    # check if the username is already taken
-    is_username_exists = check_if_username_exists(username)
-    
-    #check if the email is already taken
-    is_email_exists = check_if_email_exists(email)
-
-    if is_username_exists or is_email_exists:
-        return JSONResponse(status_code=400, content={"message": "Username or email already exists"})
-    
     #hash the password
-    hashed_password = hash_password(password)
+    try:
+        hashed_password = await hash_password_async(password)
+    except PasswordPoolSaturated as e:
+        return JSONResponse(status_code=503, content={"message": str(e)}, headers={"Retry-After": str(e.retry_after)})
 
     #generate uuid
     user_id = generate_uuid()
@@ -114,11 +200,15 @@ async def signup(user: UserSignup):
         "created_at": created_at,
     }
 
+    #store the user in the database, duplicate usernames and emails are caught by the unique constraints
+    try:
+        response = await store_user(storing_payload)
+    except UserAlreadyExistsError as e:
+        return JSONResponse(status_code=400, content={"message": str(e), "field": e.field})
+
     #generate the jwt token
     token = generate_jwt_token(jwt_payload)
 
-    #store the user in the database
-    response = store_user(storing_payload)
     if response == True:
         return JSONResponse(status_code=201, content={"message": "User created successfully", "token": token})
     else:
@@ -135,7 +225,7 @@ async def login(user: UserLogin):
     
     #get the user from the database
     try:
-        user_data = get_user(username)
+        user_data = await get_user(username)
     except ValueError as e:
         return JSONResponse(status_code=400, content={"message": str(e)})
 
@@ -146,7 +236,11 @@ async def login(user: UserLogin):
     created_at = str(user_data["created_at"])
 
     # Verify the password
-    if not verify_password(user.password, hashed_password):
+    try:
+        is_valid_password = await verify_password_async(user.password, hashed_password)
+    except PasswordPoolSaturated as e:
+        return JSONResponse(status_code=503, content={"message": str(e)}, headers={"Retry-After": str(e.retry_after)})
+    if not is_valid_password:
         return JSONResponse(status_code=400, content={"message": "Invalid password"})
 
     
@@ -167,13 +261,34 @@ async def login(user: UserLogin):
 async def logout():
     return JSONResponse(status_code=200, content={"message": "User logged out successfully"})
 
+@app.get("/v1/projects")
+async def list_projects(if_none_match: str | None = Header(default=None)):
+    try:
+        registry = await get_project_registry_fresh()
+    except Exception as e:
+        return JSONResponse(status_code=500, content={"message": str(e)})
+
+    headers = {"ETag": registry.etag, "Cache-Control": "no-cache"}
+    if if_none_match == registry.etag:
+        return Response(status_code=304, headers=headers)
+
+    return FastJSONResponse(
+        status_code=200,
+        content={"message": "Projects retrieved successfully", "projects": registry.list_projects()},
+        headers=headers
+    )
+
 @app.post("/v1/time/add")
 async def add_time(time: TimeEntry, current_user: dict = Depends(get_current_user)):
     user_id = current_user["user_id"]
 
     try:
         # get project id
-        project_id = get_project_id(time.project_name)
+        registry = await get_project_registry_fresh()
+        project_id = registry.get_id(time.project_name)
+        if project_id is None:
+            return JSONResponse(status_code=400, content={"message": "Project not found"})
+        entry_date = validate_entry_date(time.entry_date)
     except Exception as e:
         return JSONResponse(status_code=400, content={"message": str(e)})
     
@@ -183,94 +298,320 @@ async def add_time(time: TimeEntry, current_user: dict = Depends(get_current_use
         "project_id": project_id,
         "description": time.description,
         "hours": time.hours,
-        "entry_date": time.entry_date,
+        "entry_date": entry_date,
     }
 
     #store the time entry in the database
     try: 
-        store_time_entry(time_entry_payload)
+        await store_time_entry(time_entry_payload)
     except Exception as e:
         return JSONResponse(status_code=400, content={"message": str(e)})
-    
+    get_summary_cache().invalidate_user(user_id)
+    get_team_summary_refresher().note_writes(1)
+
     return JSONResponse(status_code=200, content={"message": "Time entry added successfully"})
 
-@app.get("/v1/time/get_week_summary")
-async def get_week_summary(current_user: dict = Depends(get_current_user)):
+@app.post("/v1/time/add_batch")
+async def add_time_batch(batch: TimeEntryBatch, current_user: dict = Depends(get_current_user)):
     user_id = current_user["user_id"]
-    
-    # Calculate the current week (Monday to Sunday)
-    today = datetime.now()
-    # Get Monday of current week (weekday() returns 0=Monday, 6=Sunday)
-    days_since_monday = today.weekday()
-    monday = today - timedelta(days=days_since_monday)
-    sunday = monday + timedelta(days=6)
-    
-    start_date = monday.strftime("%Y-%m-%d")
-    end_date = sunday.strftime("%Y-%m-%d")
 
-    #get the time entries for the week
+    # resolve project names once for the whole batch
     try:
-        time_entries = get_time_entries(user_id, start_date, end_date)
+        registry = await get_project_registry_fresh()
     except Exception as e:
         return JSONResponse(status_code=400, content={"message": str(e)})
-    
-    #get the total hours for the week
-    total_hours = sum(time_entry["hours"] for time_entry in time_entries)
-    
 
+    #validate every entry before writing anything
+    time_entry_payloads = []
+    errors = []
+    for index, time in enumerate(batch.entries):
+        try:
+            project_id = registry.get_id(time.project_name)
+            if project_id is None:
+                raise ValueError("Project not found")
+            hours = validate_hours(time.hours)
+            entry_date = validate_entry_date(time.entry_date)
+        except ValueError as e:
+            errors.append({"index": index, "message": str(e)})
+            continue
+        time_entry_payloads.append({
+            "user_id": user_id,
+            "project_id": project_id,
+            "description": time.description,
+            "hours": hours,
+            "entry_date": entry_date,
+        })
+
+    if errors:
+        return JSONResponse(status_code=400, content={"message": "Some time entries are invalid", "errors": errors})
+
+    #store all time entries in a single transaction
     try:
-        project_totals = get_project_totals(user_id, start_date, end_date)
+        count = await store_time_entries(time_entry_payloads)
     except Exception as e:
         return JSONResponse(status_code=400, content={"message": str(e)})
+    get_summary_cache().invalidate_user(user_id)
+    get_team_summary_refresher().note_writes(count)
+
+    return JSONResponse(status_code=200, content={"message": "Time entries added successfully", "count": count})
+
+@app.get("/v1/time/get_week_summary")
+async def get_week_summary(current_user: dict = Depends(get_current_user), if_none_match: str | None = Header(default=None)):
+    user_id = current_user["user_id"]
+    
+    start_date, end_date = get_current_week()
+
+    cache = get_summary_cache()
+    cache_key = ("week", start_date, None)
+    # 304 only while this worker still holds the entry behind that ETag, so a worker that
+    # missed the user's write never confirms stale data for longer than SUMMARY_CACHE_TTL
+    summary, etag = cache.lookup(user_id, cache_key)
+    if summary is not None and if_none_match == etag:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+
+    #get the time entries, project totals and total hours for the week in one query
+    if summary is None:
+        version = cache.get_version(user_id)
+        try:
+            summary = await get_week_summary_data(user_id, start_date, end_date)
+        except Exception as e:
+            return JSONResponse(status_code=400, content={"message": str(e)})
+        etag = cache.set(user_id, cache_key, summary, version)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
     
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=200, 
         content={
             "message": "Time entries retrieved successfully", 
-            "time_entries": time_entries, 
-            "total_hours": total_hours,
-            "project_totals": project_totals,
+            "time_entries": summary["time_entries"], 
+            "total_hours": summary["total_hours"],
+            "project_totals": summary["project_totals"],
             "week_start": start_date,
             "week_end": end_date
-        }
+        },
+        headers=headers
     )
 
 @app.get("/v1/time/get_project_week_summary")
-async def get_project_week_summary(project_name: str, current_user: dict = Depends(get_current_user)):
+async def get_project_week_summary(project_name: str, current_user: dict = Depends(get_current_user), if_none_match: str | None = Header(default=None)):
     user_id = current_user["user_id"]
     
-    # Calculate the current week (Monday to Sunday)
-    today = datetime.now()
-    days_since_monday = today.weekday()
-    monday = today - timedelta(days=days_since_monday)
-    sunday = monday + timedelta(days=6)
-    
-    start_date = monday.strftime("%Y-%m-%d")
-    end_date = sunday.strftime("%Y-%m-%d")
+    start_date, end_date = get_current_week()
 
     try:
-        project_id = get_project_id(project_name)
+        registry = await get_project_registry_fresh()
+        project_id = registry.get_id(project_name)
         if project_id is None:
             return JSONResponse(status_code=400, content={"message": "Project not found"})
     except Exception as e:
         return JSONResponse(status_code=400, content={"message": str(e)})
     
-    #get the time entries for the week for this specific project
-    try:
-        time_entries = get_time_entries_by_project(user_id, start_date, end_date, project_id)
-    except Exception as e:
-        return JSONResponse(status_code=400, content={"message": str(e)})
+    cache = get_summary_cache()
+    cache_key = ("week", start_date, project_id)
+    # 304 only while this worker still holds the entry behind that ETag, so a worker that
+    # missed the user's write never confirms stale data for longer than SUMMARY_CACHE_TTL
+    summary, etag = cache.lookup(user_id, cache_key)
+    if summary is not None and if_none_match == etag:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+
+    #get the time entries and total hours for the week for this specific project
+    if summary is None:
+        version = cache.get_version(user_id)
+        try:
+            summary = await get_week_summary_data(user_id, start_date, end_date, project_id)
+        except Exception as e:
+            return JSONResponse(status_code=400, content={"message": str(e)})
+        etag = cache.set(user_id, cache_key, summary, version)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
     
-    #get the total hours for the week for this project
-    total_hours = sum(time_entry["hours"] for time_entry in time_entries)
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=200, 
         content={
             "message": "Time entries retrieved successfully", 
             "project_name": project_name,
-            "time_entries": time_entries, 
-            "total_hours": total_hours,
+            "time_entries": summary["time_entries"], 
+            "total_hours": summary["total_hours"],
             "week_start": start_date,
             "week_end": end_date
+        },
+        headers=headers
+    )
+
+@app.get("/v1/time/entries")
+async def list_time_entries(
+    start: str | None = None,
+    end: str | None = None,
+    project: str | None = None,
+    limit: int = Query(default=100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    current_user: dict = Depends(get_current_user)
+):
+    user_id = current_user["user_id"]
+
+    try:
+        start_date, end_date = resolve_date_range(start, end)
+        page_cursor = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"message": str(e)})
+
+    project_id = None
+    if project:
+        try:
+            registry = await get_project_registry_fresh()
+            project_id = registry.get_id(project)
+            if project_id is None:
+                return JSONResponse(status_code=400, content={"message": "Project not found"})
+        except Exception as e:
+            return JSONResponse(status_code=400, content={"message": str(e)})
+
+    try:
+        page = await get_time_entries_page(user_id, start_date, end_date, project_id, limit, page_cursor)
+    except Exception as e:
+        return JSONResponse(status_code=400, content={"message": str(e)})
+
+    return FastJSONResponse(
+        status_code=200,
+        content={
+            "message": "Time entries retrieved successfully",
+            "time_entries": page["time_entries"],
+            "next_cursor": page["next_cursor"],
+            "start": start_date,
+            "end": end_date
+        }
+    )
+
+@app.get("/v1/time/summary")
+async def get_summary(
+    start: str | None = None,
+    end: str | None = None,
+    project: str | None = None,
+    current_user: dict = Depends(get_current_user)
+):
+    user_id = current_user["user_id"]
+
+    try:
+        start_date, end_date = resolve_date_range(start, end)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"message": str(e)})
+
+    project_id = None
+    if project:
+        try:
+            registry = await get_project_registry_fresh()
+            project_id = registry.get_id(project)
+            if project_id is None:
+                return JSONResponse(status_code=400, content={"message": "Project not found"})
+        except Exception as e:
+            return JSONResponse(status_code=400, content={"message": str(e)})
+
+    try:
+        summary = await get_range_summary(user_id, start_date, end_date, project_id)
+    except Exception as e:
+        return JSONResponse(status_code=400, content={"message": str(e)})
+
+    return FastJSONResponse(
+        status_code=200,
+        content={
+            "message": "Summary retrieved successfully",
+            "project_totals": summary["project_totals"],
+            "total_hours": summary["total_hours"],
+            "entry_count": summary["entry_count"],
+            "start": start_date,
+            "end": end_date
         }
     )
+
+@app.get("/v1/time/trends")
+async def get_trends(
+    weeks: int = Query(default=52, ge=1, le=MAX_TREND_WEEKS),
+    bucket: str = "week",
+    window: int = Query(default=4, ge=1, le=MAX_TREND_WINDOW),
+    current_user: dict = Depends(get_current_user),
+    if_none_match: str | None = Header(default=None)
+):
+    user_id = current_user["user_id"]
+    if bucket not in TREND_BUCKETS:
+        return JSONResponse(status_code=400, content={"message": "Bucket must be week or month"})
+
+    # the last `weeks` whole weeks, ending with the current one
+    week_start, end_date = get_current_week()
+    start = datetime.strptime(week_start, "%Y-%m-%d").date() - timedelta(weeks=weeks - 1)
+    end = datetime.strptime(end_date, "%Y-%m-%d").date()
+    start_date = start.isoformat()
+
+    cache = get_summary_cache()
+    cache_key = ("trends", start_date, weeks, bucket, window)
+    # 304 only while this worker still holds the entry behind that ETag, so a worker that
+    # missed the user's write never confirms stale data for longer than SUMMARY_CACHE_TTL
+    trends, etag = cache.lookup(user_id, cache_key)
+    if trends is not None and if_none_match == etag:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+
+    if trends is None:
+        version = cache.get_version(user_id)
+        try:
+            daily_totals = await get_daily_totals(user_id, start_date, end_date)
+        except Exception as e:
+            return JSONResponse(status_code=400, content={"message": str(e)})
+        trends = build_trends(daily_totals, start, end, bucket, window)
+        etag = cache.set(user_id, cache_key, trends, version)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    return FastJSONResponse(
+        status_code=200,
+        content={"message": "Trends retrieved successfully", "start": start_date, "end": end_date, **trends},
+        headers=headers
+    )
+
+@app.get("/v1/admin/export/time_entries")
+async def export_time_entries(
+    start: str,
+    end: str,
+    format: str = "csv",
+    current_user: dict = Depends(get_current_admin)
+):
+    if format not in EXPORT_FORMATS:
+        return JSONResponse(status_code=400, content={"message": "Format must be csv or ndjson"})
+    try:
+        start_date, end_date = resolve_date_range(start, end)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"message": str(e)})
+
+    media_type, _ = EXPORT_FORMATS[format]
+    file_name = f"time_entries_{start_date}_{end_date}.{format}"
+    # The generator is iterated in a worker thread, one chunk per send, so memory stays flat
+    return StreamingResponse(
+        stream_time_entries_export(start_date, end_date, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{file_name}"'}
+    )
+
+@app.get("/v1/admin/team/summary")
+async def get_team_summary_route(
+    weeks: int = Query(default=4, ge=1, le=MAX_TEAM_WEEKS),
+    limit: int = Query(default=100, ge=1, le=MAX_TEAM_PAGE_SIZE),
+    cursor: str | None = None,
+    current_user: dict = Depends(get_current_admin)
+):
+    # the last `weeks` whole weeks, ending with the current one
+    week_start, end_date = get_current_week()
+    start_date = (datetime.strptime(week_start, "%Y-%m-%d").date() - timedelta(weeks=weeks - 1)).isoformat()
+
+    try:
+        summary = await get_team_summary(start_date, end_date, limit, cursor)
+    except Exception as e:
+        return JSONResponse(status_code=400, content={"message": str(e)})
+
+    return FastJSONResponse(
+        status_code=200,
+        content={"message": "Team summary retrieved successfully", "start": start_date, "end": end_date, **summary}
+    )
+
+@app.get("/v1/admin/slow_queries")
+async def list_slow_queries(current_user: dict = Depends(get_current_admin)):
+    slow_query_log = get_slow_query_log()
+    return FastJSONResponse(status_code=200, content={
+        "message": "Slow queries retrieved successfully",
+        "stats": slow_query_log.stats(),
+        "slow_queries": slow_query_log.entries(),
+    })
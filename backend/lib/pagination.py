@@ -0,0 +1,17 @@
+import base64
+from datetime import date
+
+def encode_cursor(entry_date, entry_id: int) -> str:
+    # the cursor is the (entry_date, id) of the last row on the page
+    if isinstance(entry_date, date):
+        entry_date = entry_date.isoformat()
+    raw = f"{entry_date}|{entry_id}".encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        entry_date, entry_id = base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8').split("|")
+        return date.fromisoformat(entry_date).isoformat(), int(entry_id)
+    except (ValueError, UnicodeError):
+        raise ValueError("Invalid cursor")
@@ -0,0 +1,139 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+def refill(tokens: float, updated_at: float, now: float, rate: float, capacity: float) -> float:
+    # Tokens accrue continuously at `rate` per second, up to the bucket capacity
+    return min(capacity, tokens + max(0.0, now - updated_at) * rate)
+
+def take_token(tokens: float, rate: float, cost: float = 1.0) -> tuple:
+    """Spend ``cost`` tokens from an already refilled bucket.
+
+    Returns (allowed, tokens left, seconds until the request would be allowed).
+    """
+    if tokens >= cost:
+        return True, tokens - cost, 0.0
+    return False, tokens, (cost - tokens) / rate
+
+
+class MemoryBucketStore:
+    """Token buckets held in this process.
+
+    The least recently used buckets are dropped past ``max_keys``; a dropped
+    bucket simply starts full again, as if its client had been idle.
+    """
+
+    blocking = False
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> (tokens, updated_at)
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: float, capacity: float, cost: float = 1.0) -> tuple:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            allowed, tokens, retry_after = take_token(refill(tokens, updated_at, now, rate, capacity), rate, cost)
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, tokens, retry_after
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class SQLiteBucketStore:
+    """Token buckets in a SQLite file, shared by every worker process on a host.
+
+    Each take is one short ``BEGIN IMMEDIATE`` transaction, so concurrent
+    workers never spend the same token. Buckets untouched for ``prune_after``
+    seconds (long enough to have refilled) are deleted now and then. A take
+    waits at most ``busy_timeout`` seconds for another worker's transaction,
+    then raises sqlite3.OperationalError rather than queue up behind it.
+    """
+
+    # take() does file I/O and may wait on a lock, so callers run it off the event loop
+    blocking = True
+
+    def __init__(self, path: str, prune_after: float = 3600.0, prune_every: int = 1000, busy_timeout: float = 0.05):
+        self.path = path
+        self.prune_after = prune_after
+        self.prune_every = prune_every
+        self.busy_timeout = busy_timeout
+        self._takes = 0
+        self._lock = threading.Lock()
+        # Setup may wait for a worker starting up at the same time; takes only get busy_timeout
+        self._conn = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS token_buckets (
+                key TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute(f"PRAGMA busy_timeout = {int(busy_timeout * 1000)}")
+
+    def take(self, key: str, rate: float, capacity: float, cost: float = 1.0) -> tuple:
+        # Wall clock, since monotonic clocks are not comparable across processes
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT tokens, updated_at FROM token_buckets WHERE key = ?", (key,)).fetchone()
+                tokens, updated_at = row if row else (capacity, now)
+                allowed, tokens, retry_after = take_token(refill(tokens, updated_at, now, rate, capacity), rate, cost)
+                self._conn.execute(
+                    "INSERT INTO token_buckets (key, tokens, updated_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at",
+                    (key, tokens, now),
+                )
+                self._takes += 1
+                if self._takes % self.prune_every == 0:
+                    self._conn.execute("DELETE FROM token_buckets WHERE updated_at < ?", (now - self.prune_after,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return allowed, tokens, retry_after
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM token_buckets")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# RATE_LIMIT_STORE name -> factory; another shared backend only needs take(key, rate, capacity, cost)
+# and a ``blocking`` flag telling the middleware whether take must run in a thread
+RATE_LIMIT_STORES = {
+    "memory": lambda: MemoryBucketStore(max_keys=int(os.getenv("RATE_LIMIT_MAX_KEYS", 100000))),
+    "sqlite": lambda: SQLiteBucketStore(
+        os.getenv("RATE_LIMIT_SQLITE_PATH", os.path.join(tempfile.gettempdir(), "time_tracker_rate_limit.sqlite3")),
+        busy_timeout=float(os.getenv("RATE_LIMIT_SQLITE_BUSY_TIMEOUT_MS", 50)) / 1000,
+    ),
+}
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_rate_limit_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                name = os.getenv("RATE_LIMIT_STORE", "memory").lower()
+                if name not in RATE_LIMIT_STORES:
+                    raise ValueError(f"Unknown RATE_LIMIT_STORE {name}, expected one of {', '.join(RATE_LIMIT_STORES)}")
+                _store = RATE_LIMIT_STORES[name]()
+    return _store
@@ -0,0 +1,94 @@
+import json
+from decimal import Decimal
+from datetime import datetime, date
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional speedup, the stdlib encoder is used without it
+    orjson = None
+
+# Postgres type OIDs reported in cursor.description
+NUMERIC_OID = 1700
+DATE_OID = 1082
+TIMESTAMP_OID = 1114
+TIMESTAMPTZ_OID = 1184
+
+def _to_float(value):
+    return float(value)
+
+def _to_isoformat(value):
+    return value.isoformat()
+
+def _to_plain(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+CONVERTERS_BY_OID = {
+    NUMERIC_OID: _to_float,
+    DATE_OID: _to_isoformat,
+    TIMESTAMP_OID: _to_isoformat,
+    TIMESTAMPTZ_OID: _to_isoformat,
+}
+
+def _converter_for_value(value):
+    if value is None:
+        return _to_plain
+    if isinstance(value, Decimal):
+        return _to_float
+    if isinstance(value, (datetime, date)):
+        return _to_isoformat
+    return None
+
+def build_row_converter(description, sample_row=None):
+    """Return a function turning a result row into a JSON-ready dict.
+
+    Converters are chosen once per result set from the column type OIDs
+    (or from a sample row when the type is not reported), so per row only
+    the NUMERIC/DATE/TIMESTAMP columns are touched.
+    """
+    names = [desc[0] for desc in description]
+    converted = []
+    for index, desc in enumerate(description):
+        type_code = desc[1] if len(desc) > 1 else None
+        if type_code in CONVERTERS_BY_OID:
+            converter = CONVERTERS_BY_OID[type_code]
+        elif type_code is None and sample_row is not None:
+            converter = _converter_for_value(sample_row[index])
+        elif type_code is None:
+            converter = _to_plain
+        else:
+            converter = None
+        if converter is not None:
+            converted.append((names[index], index, converter))
+
+    def convert(row):
+        row_dict = dict(zip(names, row))
+        for name, index, converter in converted:
+            value = row[index]
+            if value is not None:
+                row_dict[name] = converter(value)
+        return row_dict
+
+    return convert
+
+def rows_to_dicts(cursor, rows) -> list:
+    if not rows:
+        return []
+    convert = build_row_converter(cursor.description, rows[0])
+    return [convert(row) for row in rows]
+
+def dumps_json(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode('utf-8')
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse that encodes with orjson when it is installed."""
+
+    def render(self, content) -> bytes:
+        return dumps_json(content)
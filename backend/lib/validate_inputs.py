@@ -1,4 +1,5 @@
 import re
+from datetime import datetime
 
 def validate_password(password: str) -> str:
     # check if the password is at least 8 characters long
@@ -13,4 +14,20 @@ def validate_password(password: str) -> str:
     # check if the password contains at least one number
     if not re.search(r'[0-9]', password):
         raise ValueError("Password must contain at least one number")
-    return password
\ No newline at end of file
+    return password
+
+def validate_hours(hours: float) -> float:
+    # hours are stored as NUMERIC(5,2) with a positive check constraint
+    if hours <= 0:
+        raise ValueError("Hours must be greater than 0")
+    if hours > 24:
+        raise ValueError("Hours cannot exceed 24 per entry")
+    return hours
+
+def validate_entry_date(entry_date: str) -> str:
+    try:
+        parsed = datetime.strptime(entry_date, "%Y-%m-%d")
+    except ValueError:
+        raise ValueError("Entry date must be in YYYY-MM-DD format")
+    # strptime also accepts 2024-1-5; hand back the zero-padded form so dates compare and group as text
+    return parsed.date().isoformat()
@@ -1,16 +1,46 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from lib.jwt_token import verify_jwt_token
+from lib.cache import LRUCache
+import hashlib
+import time
 import jwt
+import os
 
 # Security scheme for Bearer token
 security = HTTPBearer()
 
+# Recently verified tokens, keyed by a digest of the token so the raw token is not kept around
+token_cache = LRUCache(
+    max_entries=int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", 10000)),
+    ttl=float(os.getenv("TOKEN_CACHE_TTL", 300)),
+)
+
+def is_token_cache_enabled() -> bool:
+    return os.getenv("TOKEN_CACHE_ENABLED", "true").lower() not in ("0", "false", "no", "off")
+
+def verify_token_cached(token: str) -> dict:
+    if not is_token_cache_enabled():
+        return verify_jwt_token(token)
+
+    key = hashlib.sha256(token.encode('utf-8')).digest()
+    jwt_payload = token_cache.get(key)
+    if jwt_payload is not None:
+        return dict(jwt_payload)
+
+    jwt_payload = verify_jwt_token(token)
+    # Never keep a token past its own exp claim
+    expires_at = time.monotonic() + token_cache.ttl
+    if isinstance(jwt_payload.get("exp"), (int, float)):
+        expires_at = min(expires_at, time.monotonic() + jwt_payload["exp"] - time.time())
+    token_cache.set(key, dict(jwt_payload), expires_at=expires_at)
+    return jwt_payload
+
 def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     token = credentials.credentials
     
     try:
-        jwt_payload = verify_jwt_token(token)
+        jwt_payload = verify_token_cached(token)
         return jwt_payload
     except jwt.ExpiredSignatureError:
         raise HTTPException(
@@ -26,4 +56,16 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Authentication failed: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+def get_admin_usernames() -> set:
+    return {name.strip().lower() for name in os.getenv("ADMIN_USERNAMES", "").split(",") if name.strip()}
+
+def get_current_admin(current_user: dict = Depends(get_current_user)):
+    # Admin routes are limited to the usernames listed in ADMIN_USERNAMES
+    if current_user.get("username") not in get_admin_usernames():
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return current_user
@@ -0,0 +1,58 @@
+import time
+from lib.metrics import Counter, Gauge, Histogram
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests handled, by route template and status code",
+    ["method", "route", "status"],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request until its response body is sent",
+    ["method", "route"],
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requests currently being handled",
+)
+
+# requests that matched no route share one label so scanners cannot blow up cardinality
+UNMATCHED_ROUTE = "unmatched"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording per-route counts, status codes and latency.
+
+    The route label is the matched path template (``/v1/time/entries``), not
+    the raw URL, so the number of series stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._in_flight = HTTP_REQUESTS_IN_FLIGHT.labels()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        self._in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            self._in_flight.dec()
+            route = scope.get("route")
+            route_path = getattr(route, "path", UNMATCHED_ROUTE)
+            method = scope["method"]
+            HTTP_REQUEST_DURATION.labels(method, route_path).observe(elapsed)
+            HTTP_REQUESTS.labels(method, route_path, str(status_code)).inc()
@@ -0,0 +1,136 @@
+import asyncio
+import functools
+import json
+import math
+import os
+from lib.metrics import Counter
+from lib.rate_limit import get_rate_limit_store
+from middlewares.auth_middleware import verify_token_cached
+
+RATE_LIMITED_REQUESTS = Counter(
+    "rate_limited_requests_total",
+    "Requests rejected with 429 by the rate limiter, by route",
+    ["route"],
+)
+
+# (method, path) -> (bucket key, requests allowed, per seconds). Auth routes are keyed
+# by client IP since there is no user yet; the write routes by the JWT's user_id.
+DEFAULT_BUDGETS = {
+    ("POST", "/v1/auth/login"): ("ip", 10, 60),
+    ("POST", "/v1/auth/signup"): ("ip", 5, 300),
+    ("POST", "/v1/time/add"): ("user", 120, 60),
+    ("POST", "/v1/time/add_batch"): ("user", 20, 60),
+}
+
+def parse_budgets(value: str, defaults: dict = DEFAULT_BUDGETS) -> dict:
+    """Apply RATE_LIMIT_BUDGETS overrides, e.g. ``POST /v1/time/add=60/60;POST /v1/auth/login=off``.
+
+    Routes under /v1/auth/ are keyed by IP, any other route by user.
+    """
+    budgets = dict(defaults)
+    for item in (value or "").split(";"):
+        if not item.strip():
+            continue
+        route, _, budget = item.partition("=")
+        method, _, path = route.strip().partition(" ")
+        key = (method.upper(), path.strip())
+        if not key[1] or not budget.strip():
+            raise ValueError(f"Invalid rate limit budget {item.strip()}, expected 'METHOD /path=requests/seconds'")
+        if budget.strip().lower() == "off":
+            budgets.pop(key, None)
+            continue
+        try:
+            limit, _, period = budget.partition("/")
+            limit, period = int(limit), float(period)
+        except ValueError:
+            raise ValueError(f"Invalid rate limit budget {item.strip()}, expected 'METHOD /path=requests/seconds'")
+        if limit < 1 or period <= 0:
+            raise ValueError(f"Invalid rate limit budget {item.strip()}, requests and seconds must be positive")
+        key_by = "ip" if key[1].startswith("/v1/auth/") else "user"
+        budgets[key] = (key_by, limit, period)
+    return budgets
+
+
+class RateLimitMiddleware:
+    """Pure ASGI middleware applying a token bucket per client and route.
+
+    Each budgeted route allows bursts of ``requests`` and refills at
+    ``requests / seconds`` per second. Rejected requests get a 429 with
+    Retry-After before any handler, database or bcrypt work runs. Routes
+    without a budget pass straight through.
+    """
+
+    def __init__(self, app, budgets: dict = None, store=None, trust_forwarded: bool = None):
+        self.app = app
+        self.budgets = budgets if budgets is not None else parse_budgets(os.getenv("RATE_LIMIT_BUDGETS", ""))
+        self._store = store
+        if trust_forwarded is None:
+            # Only behind a proxy that sets X-Forwarded-For; otherwise clients could pick their own key
+            trust_forwarded = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "false").lower() in ("1", "true", "yes", "on")
+        self.trust_forwarded = trust_forwarded
+
+    @property
+    def store(self):
+        if self._store is None:
+            self._store = get_rate_limit_store()
+        return self._store
+
+    async def __call__(self, scope, receive, send):
+        budget = self.budgets.get((scope.get("method"), scope.get("path"))) if scope["type"] == "http" else None
+        if budget is None:
+            await self.app(scope, receive, send)
+            return
+
+        key_by, limit, period = budget
+        headers = {name.decode("latin-1").lower(): value.decode("latin-1") for name, value in scope.get("headers", [])}
+        key = f"{scope['method']} {scope['path']}|{self._client_key(key_by, scope, headers)}"
+        try:
+            allowed, _, retry_after = await self._take(key, rate=limit / period, capacity=limit)
+        except Exception as e:
+            # Fail open: a broken limiter store must not take the API down with it
+            print(f"Warning: Rate limit store failed: {e}")
+            allowed = True
+
+        if allowed:
+            await self.app(scope, receive, send)
+            return
+
+        RATE_LIMITED_REQUESTS.labels(scope["path"]).inc()
+        retry_after_seconds = max(1, math.ceil(retry_after))
+        body = json.dumps({"message": "Too many requests", "retry_after": retry_after_seconds}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"retry-after", str(retry_after_seconds).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def _take(self, key: str, rate: float, capacity: float) -> tuple:
+        store = self.store
+        if not getattr(store, "blocking", False):
+            return store.take(key, rate=rate, capacity=capacity)
+        # Shared stores touch files or the network; keep that off the event loop
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(store.take, key, rate=rate, capacity=capacity))
+
+    def _client_key(self, key_by: str, scope, headers: dict) -> str:
+        if key_by == "user":
+            authorization = headers.get("authorization", "")
+            scheme, _, token = authorization.partition(" ")
+            if scheme.lower() == "bearer" and token:
+                try:
+                    return f"user:{verify_token_cached(token.strip())['user_id']}"
+                except Exception:
+                    # Invalid tokens are rejected by the route; until then they share their IP's bucket
+                    pass
+        return f"ip:{self._client_ip(scope, headers)}"
+
+    def _client_ip(self, scope, headers: dict) -> str:
+        if self.trust_forwarded and headers.get("x-forwarded-for"):
+            return headers["x-forwarded-for"].split(",")[0].strip()
+        client = scope.get("client")
+        return client[0] if client else "unknown"
@@ -5,4 +5,7 @@ class TimeEntry(BaseModel):
     project_name: str
     description: str
     hours: float
-    entry_date: str = Field(default=datetime.now().strftime("%Y-%m-%d"))
\ No newline at end of file
+    entry_date: str = Field(default=datetime.now().strftime("%Y-%m-%d"))
+
+class TimeEntryBatch(BaseModel):
+    entries: list[TimeEntry] = Field(min_length=1, max_length=500)
@@ -1,162 +1,167 @@
-from db.server import connect_to_db
-from fastapi.responses import JSONResponse
+from db.server import get_connection, get_read_connection, replicas_enabled
+from db.query import execute
+from db.prepared import register_statement, execute_prepared
+from lib.serialization import rows_to_dicts
 
-def check_if_username_exists(username: str) -> bool:
-    # check if the username is already taken
-    conn = connect_to_db()
-    if conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM users WHERE username = %s", (username,))
-        result = cursor.fetchone()
-        if result:
-            return True
-        else:
-            return False
-    else:
-        return JSONResponse(status_code=500, content={"message": "Database connection failed"})
+# Hot statements, prepared once per pooled connection and executed by name
+GET_USER = register_statement("get_user", "SELECT * FROM users WHERE username = %s")
+WEEK_ENTRIES = register_statement("week_entries", """
+            SELECT te.*, p.name as project_name 
+            FROM time_entries te 
+            JOIN projects p ON te.project_id = p.id 
+            WHERE te.user_id = %s AND te.entry_date BETWEEN %s AND %s
+            ORDER BY te.entry_date DESC
+""")
+WEEK_ENTRIES_BY_PROJECT = register_statement("week_entries_by_project", """
+            SELECT te.*, p.name as project_name 
+            FROM time_entries te 
+            JOIN projects p ON te.project_id = p.id 
+            WHERE te.user_id = %s AND te.entry_date BETWEEN %s AND %s AND te.project_id = %s
+            ORDER BY te.entry_date DESC
+""")
 
-def check_if_email_exists(email: str) -> bool:
-    # check if the email is already taken
-    conn = connect_to_db()
-    if conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM users WHERE email = %s", (email,))
-        result = cursor.fetchone()
-        if result:
-            return True
-        else:
-            return False
-    else:
-        return JSONResponse(status_code=500, content={"message": "Database connection failed"})
+def fetch_user(conn, username: str):
+    cursor = conn.cursor()
+    execute_prepared(cursor, "get_user", GET_USER, (username,))
+    result = cursor.fetchone()
+    if result:
+        # Get column names from cursor description
+        column_names = [desc[0] for desc in cursor.description]
+        # Convert tuple to dictionary
+        return dict(zip(column_names, result))
+    return None
 
 def get_user(username: str) -> dict:
-    conn = connect_to_db()
-    if conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM users WHERE username = %s", (username,))
-        result = cursor.fetchone()
-        if result:
-            # Get column names from cursor description
-            column_names = [desc[0] for desc in cursor.description]
-            # Convert tuple to dictionary
-            user_dict = dict(zip(column_names, result))
-            return user_dict
-        else:
-            raise ValueError("User not found")
-    else:
-        raise ValueError("Database connection failed")
+    with get_read_connection() as conn:
+        user_dict = fetch_user(conn, username)
+    if user_dict is None and replicas_enabled():
+        # A user who just signed up may not have reached the replica yet
+        with get_connection() as conn:
+            user_dict = fetch_user(conn, username)
+    if user_dict is None:
+        raise ValueError("User not found")
+    return user_dict
 
-def get_project_id(project_name: str) -> int:
-    conn = connect_to_db()
-    if conn:
+def get_projects() -> list:
+    with get_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute("SELECT id FROM projects WHERE name = %s", (project_name,))
-        result = cursor.fetchone()
-        if result:
-            return result[0]
-        else:
-            return None
-    else:
-        raise ValueError("Database connection failed")
+        execute(cursor, "get_projects", "SELECT id, name, description FROM projects ORDER BY name")
+        result = cursor.fetchall()
+        return [{"id": row[0], "name": row[1], "description": row[2]} for row in result]
 
-def get_time_entries(user_id: str, start_date: str, end_date: str) -> list:
+def get_week_summary_data(user_id: str, start_date: str, end_date: str, project_id: int = None) -> dict:
     from decimal import Decimal
-    from datetime import datetime, date
-    
-    conn = connect_to_db()
-    if conn:
-        cursor = conn.cursor()
-        # Join with projects table to get project name
-        cursor.execute("""
-            SELECT te.*, p.name as project_name 
-            FROM time_entries te 
-            JOIN projects p ON te.project_id = p.id 
-            WHERE te.user_id = %s AND te.entry_date BETWEEN %s AND %s
-            ORDER BY te.entry_date DESC
-        """, (user_id, start_date, end_date))
-        result = cursor.fetchall()
-        if result:
-            # Get column names from cursor description
-            column_names = [desc[0] for desc in cursor.description]
-            # Convert each row to dictionary and handle Decimal/datetime serialization
-            time_entries_list = []
-            for row in result:
-                entry_dict = dict(zip(column_names, row))
-                # Convert non-JSON-serializable types for JSON serialization
-                for key, value in entry_dict.items():
-                    if isinstance(value, Decimal):
-                        entry_dict[key] = float(value)
-                    elif isinstance(value, (datetime, date)):
-                        entry_dict[key] = value.isoformat()
-                time_entries_list.append(entry_dict)
-            return time_entries_list
-        else:
-            return []
+
+    # One round trip: fetch the entries once and aggregate the totals from the same rows
+    if project_id is None:
+        statement, params = WEEK_ENTRIES, (user_id, start_date, end_date)
     else:
-        raise ValueError("Database connection failed")
+        statement, params = WEEK_ENTRIES_BY_PROJECT, (user_id, start_date, end_date, project_id)
 
-def get_time_entries_by_project(user_id: str, start_date: str, end_date: str, project_id: int) -> list:
-    from decimal import Decimal
-    from datetime import datetime, date
-    
-    conn = connect_to_db()
-    if conn:
+    with get_read_connection(user_id) as conn:
         cursor = conn.cursor()
-        # Join with projects table to get project name
-        cursor.execute("""
+        execute_prepared(cursor, "get_week_summary_data", statement, params)
+        result = cursor.fetchall()
+        time_entries_list = rows_to_dicts(cursor, result)
+        column_names = [desc[0] for desc in cursor.description] if result else []
+
+    project_totals = {}
+    total_hours = Decimal(0)
+    if result:
+        hours_index = column_names.index("hours")
+        project_index = column_names.index("project_name")
+        for row in result:
+            hours = row[hours_index]
+            project_name = row[project_index]
+            # Keep the sums in Decimal so totals match what SUM() would return
+            total_hours += hours
+            project_totals[project_name] = project_totals.get(project_name, Decimal(0)) + hours
+
+    sorted_totals = sorted(project_totals.items(), key=lambda item: item[1], reverse=True)
+    return {
+        "time_entries": time_entries_list,
+        "project_totals": {name: float(hours) for name, hours in sorted_totals},
+        "total_hours": float(total_hours),
+    }
+
+MAX_PAGE_SIZE = 500
+
+def build_time_entry_filters(user_id: str, start_date: str, end_date: str, project_id: int = None, alias: str = "te", date_column: str = "entry_date") -> tuple:
+    # Shared WHERE clause for range reads over time_entries (te) and the daily rollup (dt)
+    conditions = [f"{alias}.user_id = %s", f"{alias}.{date_column} BETWEEN %s AND %s"]
+    params = [user_id, start_date, end_date]
+    if project_id is not None:
+        conditions.append(f"{alias}.project_id = %s")
+        params.append(project_id)
+    return " AND ".join(conditions), params
+
+def get_time_entries_page(user_id: str, start_date: str, end_date: str, project_id: int = None, limit: int = 100, cursor: tuple = None) -> dict:
+    from lib.pagination import encode_cursor
+
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    where_sql, params = build_time_entry_filters(user_id, start_date, end_date, project_id)
+    if cursor is not None:
+        # Keyset pagination: continue strictly after the last (entry_date, id) already returned
+        where_sql += " AND (te.entry_date, te.id) < (%s, %s)"
+        params.extend(cursor)
+    params.append(limit + 1)
+
+    with get_read_connection(user_id) as conn:
+        db_cursor = conn.cursor()
+        execute(db_cursor, "get_time_entries_page", f"""
             SELECT te.*, p.name as project_name 
             FROM time_entries te 
             JOIN projects p ON te.project_id = p.id 
-            WHERE te.user_id = %s AND te.entry_date BETWEEN %s AND %s AND te.project_id = %s
-            ORDER BY te.entry_date DESC
-        """, (user_id, start_date, end_date, project_id))
-        result = cursor.fetchall()
-        if result:
-            # Get column names from cursor description
-            column_names = [desc[0] for desc in cursor.description]
-            # Convert each row to dictionary and handle Decimal/datetime serialization
-            time_entries_list = []
-            for row in result:
-                entry_dict = dict(zip(column_names, row))
-                # Convert non-JSON-serializable types for JSON serialization
-                for key, value in entry_dict.items():
-                    if isinstance(value, Decimal):
-                        entry_dict[key] = float(value)
-                    elif isinstance(value, (datetime, date)):
-                        entry_dict[key] = value.isoformat()
-                time_entries_list.append(entry_dict)
-            return time_entries_list
-        else:
-            return []
-    else:
-        raise ValueError("Database connection failed")
+            WHERE {where_sql}
+            ORDER BY te.entry_date DESC, te.id DESC
+            LIMIT %s
+        """, tuple(params))
+        result = db_cursor.fetchall()
+        has_more = len(result) > limit
+        time_entries_list = rows_to_dicts(db_cursor, result[:limit])
+
+    next_cursor = None
+    if has_more:
+        last_entry = time_entries_list[-1]
+        next_cursor = encode_cursor(last_entry["entry_date"], last_entry["id"])
 
-def get_project_totals(user_id: str, start_date: str, end_date: str) -> dict:
+    return {"time_entries": time_entries_list, "next_cursor": next_cursor}
+
+def get_range_summary(user_id: str, start_date: str, end_date: str, project_id: int = None) -> dict:
     from decimal import Decimal
-    
-    conn = connect_to_db()
-    if conn:
+
+    where_sql, params = build_time_entry_filters(user_id, start_date, end_date, project_id, alias="dt", date_column="day")
+    with get_read_connection(user_id) as conn:
         cursor = conn.cursor()
-        cursor.execute("""
-            SELECT p.name as project_name, SUM(te.hours) as total_hours
-            FROM time_entries te
-            JOIN projects p ON te.project_id = p.id
-            WHERE te.user_id = %s AND te.entry_date BETWEEN %s AND %s
+        execute(cursor, "get_range_summary", f"""
+            SELECT p.name as project_name, SUM(dt.total_hours) as total_hours, SUM(dt.entry_count) as entry_count
+            FROM time_entry_daily_totals dt
+            JOIN projects p ON dt.project_id = p.id
+            WHERE {where_sql}
             GROUP BY p.name
+            HAVING SUM(dt.entry_count) > 0
             ORDER BY total_hours DESC
-        """, (user_id, start_date, end_date))
+        """, tuple(params))
         result = cursor.fetchall()
-        if result:
-            project_totals = {}
-            for row in result:
-                project_name = row[0]
-                total_hours = row[1]
-                # Convert Decimal to float
-                if isinstance(total_hours, Decimal):
-                    total_hours = float(total_hours)
-                project_totals[project_name] = total_hours
-            return project_totals
-        else:
-            return {}
-    else:
-        raise ValueError("Database connection failed")
\ No newline at end of file
+
+    total_hours = sum((row[1] for row in result), Decimal(0))
+    return {
+        "project_totals": {row[0]: float(row[1]) for row in result},
+        "total_hours": float(total_hours),
+        "entry_count": int(sum(row[2] for row in result)),
+    }
+
+def get_daily_totals(user_id: str, start_date: str, end_date: str) -> dict:
+    # Per-day, per-project totals from the rollup as parallel lists, ready to load into arrays
+    with get_read_connection(user_id) as conn:
+        cursor = conn.cursor()
+        execute(cursor, "get_daily_totals", """
+            SELECT dt.day - %s::date AS day_offset, p.name as project_name, dt.total_hours::float8 AS total_hours
+            FROM time_entry_daily_totals dt
+            JOIN projects p ON dt.project_id = p.id
+            WHERE dt.user_id = %s AND dt.day BETWEEN %s AND %s AND dt.entry_count > 0
+        """, (start_date, user_id, start_date, end_date))
+        result = cursor.fetchall()
+
+    day_offsets, projects, hours = zip(*result) if result else ((), (), ())
+    return {"day_offsets": list(day_offsets), "projects": list(projects), "hours": list(hours)}
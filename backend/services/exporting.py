@@ -0,0 +1,63 @@
+import csv
+import io
+import os
+from db.server import get_connection
+from db.query import execute
+from lib.serialization import build_row_converter, dumps_json
+
+EXPORT_COLUMNS = ["id", "user_id", "username", "project_name", "entry_date", "hours", "description", "created_at"]
+
+EXPORT_QUERY = """
+    SELECT te.id, te.user_id, u.username, p.name AS project_name, te.entry_date, te.hours, te.description, te.created_at
+    FROM time_entries te
+    JOIN users u ON te.user_id = u.user_id
+    JOIN projects p ON te.project_id = p.id
+    WHERE te.entry_date BETWEEN %s AND %s
+    ORDER BY te.entry_date, te.id
+"""
+
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", 5000))
+
+def _encode_csv(rows: list, convert, header: bool) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_COLUMNS)
+    writer.writerows(convert(row).values() for row in rows)
+    return buffer.getvalue().encode('utf-8')
+
+def _encode_ndjson(rows: list, convert, header: bool) -> bytes:
+    return b"".join(dumps_json(convert(row)) + b"\n" for row in rows)
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", _encode_csv),
+    "ndjson": ("application/x-ndjson", _encode_ndjson),
+}
+
+def stream_time_entries_export(start_date: str, end_date: str, export_format: str = "csv", chunk_rows: int = EXPORT_CHUNK_ROWS):
+    """Yield the export as encoded chunks of at most chunk_rows rows.
+
+    Rows are read through a named (server-side) cursor, so only one chunk is
+    held in memory at a time and the next chunk is not fetched until the
+    consumer asks for it.
+    """
+    _, encode = EXPORT_FORMATS[export_format]
+    with get_connection() as conn:
+        cursor = conn.cursor(name="time_entries_export")
+        cursor.itersize = chunk_rows
+        try:
+            execute(cursor, "stream_time_entries_export", EXPORT_QUERY, (start_date, end_date))
+            header = True
+            convert = None
+            while True:
+                rows = cursor.fetchmany(chunk_rows)
+                if not rows and not header:
+                    break
+                if convert is None and rows:
+                    convert = build_row_converter(cursor.description, rows[0])
+                yield encode(rows, convert, header)
+                header = False
+                if len(rows) < chunk_rows:
+                    break
+        finally:
+            cursor.close()
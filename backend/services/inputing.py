@@ -1,21 +1,93 @@
-from db.server import connect_to_db
+from db.server import get_connection, mark_primary_write
+from db.query import execute, execute_values
+from db.prepared import register_statement, execute_prepared
+from psycopg2 import errors
+from decimal import Decimal, ROUND_HALF_UP
+from datetime import date, datetime
+from lib.validate_inputs import validate_entry_date
+
+# Unique constraints on users and the signup field each one protects
+USER_UNIQUE_CONSTRAINTS = {
+    "users_username_key": "username",
+    "users_email_key": "email",
+}
+
+class UserAlreadyExistsError(Exception):
+    """Raised when a signup collides with an existing username or email."""
+
+    def __init__(self, field: str):
+        super().__init__(f"{field.capitalize()} already exists")
+        self.field = field
 
 def store_user(user: dict) -> bool:
-    conn = connect_to_db()
-    if conn:
+    # A single insert: the unique constraints detect duplicates, also between concurrent signups
+    with get_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute("INSERT INTO users (user_id, username, email, password_hash, created_at) VALUES (%s, %s, %s, %s, %s)", (user["user_id"], user["username"], user["email"], user["password"], user["created_at"]))
+        try:
+            execute(cursor, "store_user", "INSERT INTO users (user_id, username, email, password_hash, created_at) VALUES (%s, %s, %s, %s, %s)", (user["user_id"], user["username"], user["email"], user["password"], user["created_at"]))
+        except errors.UniqueViolation as e:
+            conn.rollback()
+            field = USER_UNIQUE_CONSTRAINTS.get(e.diag.constraint_name)
+            if field is None:
+                raise
+            raise UserAlreadyExistsError(field)
         conn.commit()
         return True
-    else:
-        return False
+
+UPSERT_DAILY_TOTALS_SQL = """
+    INSERT INTO time_entry_daily_totals (user_id, project_id, day, total_hours, entry_count) VALUES %s
+    ON CONFLICT (user_id, day, project_id) DO UPDATE SET
+        total_hours = time_entry_daily_totals.total_hours + EXCLUDED.total_hours,
+        entry_count = time_entry_daily_totals.entry_count + EXCLUDED.entry_count
+"""
+
+def rollup_day(entry_date) -> str:
+    # 2024-1-5 and 2024-01-05 are the same rollup row; one upsert must not touch it twice
+    if isinstance(entry_date, datetime):
+        entry_date = entry_date.date()
+    if isinstance(entry_date, date):
+        return entry_date.isoformat()
+    return validate_entry_date(entry_date)
+
+def apply_daily_totals(cursor, time_entries: list, sign: int = 1):
+    # Fold entries into the (user, day, project) rollup inside the caller's transaction.
+    # Deletes and edits pass sign=-1 for the rows they remove.
+    deltas = {}
+    for time_entry in time_entries:
+        key = (time_entry["user_id"], rollup_day(time_entry["entry_date"]), time_entry["project_id"])
+        hours, count = deltas.get(key, (Decimal(0), 0))
+        # Round like NUMERIC(5,2) does so the rollup matches the stored entries exactly
+        entry_hours = Decimal(str(time_entry["hours"])).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+        deltas[key] = (hours + entry_hours * sign, count + sign)
+    # Sorted keys keep lock order stable between concurrent writers
+    rows = [(user_id, project_id, day, hours, count) for (user_id, day, project_id), (hours, count) in sorted(deltas.items())]
+    execute_values(cursor, "apply_daily_totals", UPSERT_DAILY_TOTALS_SQL, rows, page_size=1000)
+
+INSERT_TIME_ENTRY = register_statement("insert_time_entry", "INSERT INTO time_entries (user_id, project_id, description, hours, entry_date) VALUES (%s, %s, %s, %s, %s)")
 
 def store_time_entry(time_entry: dict) -> bool:
-    conn = connect_to_db()
-    if conn:
+    with get_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute("INSERT INTO time_entries (user_id, project_id, description, hours, entry_date) VALUES (%s, %s, %s, %s, %s)", (time_entry["user_id"], time_entry["project_id"], time_entry["description"], time_entry["hours"], time_entry["entry_date"]))
+        execute_prepared(cursor, "store_time_entry", INSERT_TIME_ENTRY, (time_entry["user_id"], time_entry["project_id"], time_entry["description"], time_entry["hours"], time_entry["entry_date"]))
+        apply_daily_totals(cursor, [time_entry])
         conn.commit()
-        return True
-    else:
-        return False
\ No newline at end of file
+    # Read this user's data from the primary until replicas have caught up
+    mark_primary_write(time_entry["user_id"])
+    return True
+
+def store_time_entries(time_entries: list) -> int:
+    # insert every entry with one multi-row statement inside a single transaction
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        execute_values(
+            cursor,
+            "store_time_entries",
+            "INSERT INTO time_entries (user_id, project_id, description, hours, entry_date) VALUES %s",
+            [(time_entry["user_id"], time_entry["project_id"], time_entry["description"], time_entry["hours"], time_entry["entry_date"]) for time_entry in time_entries],
+            page_size=1000,
+        )
+        apply_daily_totals(cursor, time_entries)
+        conn.commit()
+    for user_id in {time_entry["user_id"] for time_entry in time_entries}:
+        mark_primary_write(user_id)
+    return len(time_entries)
@@ -0,0 +1,69 @@
+import hashlib
+import json
+import threading
+import time
+import os
+from services.checking import get_projects
+
+class ProjectRegistry:
+    """In-process copy of the projects table.
+
+    Projects are seeded once and almost never change, so lookups are served
+    from memory. The registry reloads itself after ``ttl`` seconds or after
+    ``invalidate()`` has been called.
+    """
+
+    def __init__(self, ttl: float = 300.0, loader=get_projects):
+        self.ttl = ttl
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._projects = []
+        self._ids_by_name = {}
+        self._names_by_id = {}
+        self._etag = None
+        self._loaded_at = None
+
+    def refresh(self):
+        projects = self._loader()
+        ids_by_name = {project["name"]: project["id"] for project in projects}
+        names_by_id = {project["id"]: project["name"] for project in projects}
+        digest = hashlib.sha1(json.dumps(projects, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+        with self._lock:
+            self._projects = projects
+            self._ids_by_name = ids_by_name
+            self._names_by_id = names_by_id
+            self._etag = f'"{digest}"'
+            self._loaded_at = time.monotonic()
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+    def is_stale(self) -> bool:
+        with self._lock:
+            return self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl
+
+    def get_id(self, project_name: str) -> int:
+        return self._ids_by_name.get(project_name)
+
+    def get_name(self, project_id: int) -> str:
+        return self._names_by_id.get(project_id)
+
+    def list_projects(self) -> list:
+        return list(self._projects)
+
+    @property
+    def etag(self) -> str:
+        return self._etag
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_project_registry() -> ProjectRegistry:
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ProjectRegistry(ttl=float(os.getenv("PROJECT_REGISTRY_TTL", 300)))
+    return _registry
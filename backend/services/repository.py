@@ -0,0 +1,44 @@
+# Async data-access layer used by the API routes.
+# Each function awaits the matching synchronous service on the DB executor,
+# so a worker can keep many database round trips in flight at once.
+from db.executor import run_db
+from services import checking, inputing, team
+from services.projects import get_project_registry
+from services.write_batcher import get_time_entry_batcher
+
+async def get_user(username: str) -> dict:
+    return await run_db(checking.get_user, username)
+
+async def get_project_registry_fresh():
+    registry = get_project_registry()
+    if registry.is_stale():
+        await run_db(registry.refresh)
+    return registry
+
+async def get_week_summary_data(user_id: str, start_date: str, end_date: str, project_id: int = None) -> dict:
+    return await run_db(checking.get_week_summary_data, user_id, start_date, end_date, project_id)
+
+async def get_time_entries_page(user_id: str, start_date: str, end_date: str, project_id: int = None, limit: int = 100, cursor: tuple = None) -> dict:
+    return await run_db(checking.get_time_entries_page, user_id, start_date, end_date, project_id, limit, cursor)
+
+async def get_range_summary(user_id: str, start_date: str, end_date: str, project_id: int = None) -> dict:
+    return await run_db(checking.get_range_summary, user_id, start_date, end_date, project_id)
+
+async def get_daily_totals(user_id: str, start_date: str, end_date: str) -> dict:
+    return await run_db(checking.get_daily_totals, user_id, start_date, end_date)
+
+async def store_user(user: dict) -> bool:
+    return await run_db(inputing.store_user, user)
+
+async def store_time_entry(time_entry: dict) -> bool:
+    # With TIME_ENTRY_BATCHING on, the entry is committed together with concurrent ones
+    batcher = get_time_entry_batcher()
+    if batcher is not None:
+        return await batcher.submit(time_entry)
+    return await run_db(inputing.store_time_entry, time_entry)
+
+async def store_time_entries(time_entries: list) -> int:
+    return await run_db(inputing.store_time_entries, time_entries)
+
+async def get_team_summary(start_date: str, end_date: str, limit: int, after: str = None) -> dict:
+    return await run_db(team.get_team_summary, start_date, end_date, limit, after)
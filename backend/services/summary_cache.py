@@ -0,0 +1,71 @@
+import hashlib
+import itertools
+import threading
+import uuid
+import os
+from lib.cache import LRUCache
+
+class SummaryCache:
+    """Per-user cache of computed summaries with a data version per user.
+
+    Every write for a user bumps that user's version. Cached summaries are
+    keyed by the version they were computed at and are ignored once it is stale.
+    Each stored summary gets its own ETag, and a matching If-None-Match may only
+    be answered with 304 while that entry is still cached, so even a worker that
+    never saw the user's write serves data at most ``ttl`` seconds old.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 300.0):
+        self._cache = LRUCache(max_entries=max_entries, ttl=ttl)
+        self._versions = {}
+        self._lock = threading.Lock()
+        self._boot_id = uuid.uuid4().hex
+        self._entry_ids = itertools.count()
+
+    def get_version(self, user_id: str) -> int:
+        return self._versions.get(user_id, 0)
+
+    def invalidate_user(self, user_id: str):
+        with self._lock:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+
+    def lookup(self, user_id: str, key: tuple) -> tuple:
+        """Return (summary, etag) of the live entry at the user's current version, or (None, None)."""
+        # Entries are stored under the version they were computed at, so after a
+        # write the old entries simply stop matching and age out of the LRU
+        entry = self._cache.get((user_id, self.get_version(user_id), key))
+        return entry if entry is not None else (None, None)
+
+    def get(self, user_id: str, key: tuple):
+        return self.lookup(user_id, key)[0]
+
+    def set(self, user_id: str, key: tuple, value, version: int) -> str:
+        """Store a summary and return its ETag.
+
+        version must be read before the summary was computed, so a write that
+        lands during the computation leaves this entry already stale. The ETag
+        is unique to this entry: once it expires, a recomputed summary never
+        validates an ETag handed out for the old one.
+        """
+        raw = f"{self._boot_id}:{next(self._entry_ids)}:{user_id}:{version}:{key!r}"
+        etag = f'"{hashlib.sha1(raw.encode("utf-8")).hexdigest()}"'
+        self._cache.set((user_id, version, key), (value, etag))
+        return etag
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+_summary_cache = None
+_summary_cache_lock = threading.Lock()
+
+def get_summary_cache() -> SummaryCache:
+    global _summary_cache
+    if _summary_cache is None:
+        with _summary_cache_lock:
+            if _summary_cache is None:
+                _summary_cache = SummaryCache(
+                    max_entries=int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", 10000)),
+                    ttl=float(os.getenv("SUMMARY_CACHE_TTL", 300)),
+                )
+    return _summary_cache
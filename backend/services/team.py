@@ -0,0 +1,170 @@
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from db.server import get_connection
+from db.query import execute
+from db.executor import run_db
+
+# Refreshed in this order: the team totals are aggregated from the per-user view
+TEAM_VIEWS = ("team_weekly_totals", "team_project_weekly_totals")
+TEAM_REFRESH_LOCK_KEY = 7341904
+MAX_TEAM_PAGE_SIZE = 500
+MAX_TEAM_WEEKS = 52
+
+def refresh_team_summary() -> bool:
+    """Refresh the team views without blocking readers. Returns False if another refresh is running."""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        # Only one worker refreshes at a time; the others skip instead of queueing up behind it
+        execute(cursor, "refresh_team_summary", "SELECT pg_try_advisory_xact_lock(%s)", (TEAM_REFRESH_LOCK_KEY,))
+        if not cursor.fetchone()[0]:
+            conn.rollback()
+            return False
+        for view in TEAM_VIEWS:
+            execute(cursor, "refresh_team_summary", f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}")
+        # NOW() is the transaction start, i.e. the snapshot the refreshed views reflect
+        execute(cursor, "refresh_team_summary", """
+            INSERT INTO materialized_view_refreshes (view_name, refreshed_at)
+            SELECT unnest(%s::text[]), NOW()
+            ON CONFLICT (view_name) DO UPDATE SET refreshed_at = EXCLUDED.refreshed_at
+        """, (list(TEAM_VIEWS),))
+        conn.commit()
+        return True
+
+def get_team_summary(start_date: str, end_date: str, limit: int = 100, after: str = None) -> dict:
+    """Weekly hours per user and project for one page of users, plus team totals per week and project.
+
+    Only the materialized views are read, through their indexes, so the cost
+    follows the page size and the number of weeks rather than the number of
+    users or time entries. Rows are returned as parallel arrays.
+    """
+    limit = max(1, min(limit, MAX_TEAM_PAGE_SIZE))
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        # One extra user tells whether another page exists
+        execute(cursor, "get_team_summary", """
+            SELECT username FROM users
+            WHERE username > %s
+            ORDER BY username
+            LIMIT %s
+        """, (after or "", limit + 1))
+        usernames = [row[0] for row in cursor.fetchall()]
+        next_cursor = usernames[limit - 1] if len(usernames) > limit else None
+        usernames = usernames[:limit]
+
+        execute(cursor, "get_team_summary", """
+            SELECT username, week_start, project_name, total_hours::float8, entry_count
+            FROM team_weekly_totals
+            WHERE username = ANY(%s) AND week_start BETWEEN %s AND %s
+            ORDER BY username, week_start, project_name
+        """, (usernames, start_date, end_date))
+        rows = cursor.fetchall()
+
+        execute(cursor, "get_team_summary", """
+            SELECT week_start, project_name, total_hours::float8, entry_count, user_count
+            FROM team_project_weekly_totals
+            WHERE week_start BETWEEN %s AND %s
+            ORDER BY week_start, project_name
+        """, (start_date, end_date))
+        totals = cursor.fetchall()
+
+        execute(cursor, "get_team_summary", "SELECT refreshed_at FROM materialized_view_refreshes WHERE view_name = %s", (TEAM_VIEWS[0],))
+        refreshed = cursor.fetchone()
+
+    refreshed_at = refreshed[0] if refreshed else None
+    return {
+        "users": usernames,
+        "rows": {
+            "username": [row[0] for row in rows],
+            "week_start": [row[1].isoformat() for row in rows],
+            "project_name": [row[2] for row in rows],
+            "total_hours": [row[3] for row in rows],
+            "entry_count": [row[4] for row in rows],
+        },
+        "team_totals": {
+            "week_start": [row[0].isoformat() for row in totals],
+            "project_name": [row[1] for row in totals],
+            "total_hours": [row[2] for row in totals],
+            "entry_count": [row[3] for row in totals],
+            "user_count": [row[4] for row in totals],
+        },
+        "next_cursor": next_cursor,
+        "refreshed_at": refreshed_at.isoformat() if refreshed_at else None,
+        "staleness_seconds": round((datetime.now(timezone.utc) - refreshed_at).total_seconds(), 1) if refreshed_at else None,
+    }
+
+
+class TeamSummaryRefresher:
+    """Background task keeping the team view fresh.
+
+    Refreshes every ``interval`` seconds, and sooner once ``burst_writes``
+    time entries were written since the last refresh, but never more often
+    than every ``min_interval`` seconds.
+    """
+
+    def __init__(self, interval: float = 300.0, burst_writes: int = 500, min_interval: float = 30.0, refresh=None):
+        self.interval = interval
+        self.burst_writes = burst_writes
+        self.min_interval = min_interval
+        self._refresh = refresh or (lambda: run_db(refresh_team_summary))
+        self._pending_writes = 0
+        self._last_refresh = time.monotonic()
+        self._burst = None
+        self._task = None
+
+    def note_writes(self, count: int = 1):
+        self._pending_writes += count
+        if self._burst is not None and self.burst_writes > 0 and self._pending_writes >= self.burst_writes:
+            self._burst.set()
+
+    def start(self):
+        if self._task is None and self.interval > 0:
+            self._burst = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def refresh_now(self) -> bool:
+        pending = self._pending_writes
+        refreshed = await self._refresh()
+        self._last_refresh = time.monotonic()
+        if refreshed:
+            self._pending_writes = max(0, self._pending_writes - pending)
+        return refreshed
+
+    async def _run(self):
+        while True:
+            timeout = max(0.0, self._last_refresh + self.interval - time.monotonic())
+            try:
+                await asyncio.wait_for(self._burst.wait(), timeout=timeout)
+                # Burst: wait out the minimum spacing between refreshes
+                await asyncio.sleep(max(0.0, self._last_refresh + self.min_interval - time.monotonic()))
+            except asyncio.TimeoutError:
+                pass
+            self._burst.clear()
+            try:
+                await self.refresh_now()
+            except Exception as e:
+                self._last_refresh = time.monotonic()
+                print(f"Warning: Team summary refresh failed: {e}")
+
+
+_refresher = None
+
+def get_team_summary_refresher() -> TeamSummaryRefresher:
+    global _refresher
+    if _refresher is None:
+        _refresher = TeamSummaryRefresher(
+            interval=float(os.getenv("TEAM_SUMMARY_REFRESH_INTERVAL", 300)),
+            burst_writes=int(os.getenv("TEAM_SUMMARY_REFRESH_AFTER_WRITES", 500)),
+            min_interval=float(os.getenv("TEAM_SUMMARY_MIN_REFRESH_INTERVAL", 30)),
+        )
+    return _refresher
@@ -0,0 +1,69 @@
+import numpy as np
+from datetime import date
+
+TREND_BUCKETS = ("week", "month")
+MAX_TREND_WEEKS = 260
+MAX_TREND_WINDOW = 52
+
+def _bucket_indexes(day_offsets: np.ndarray, start_date: date, end_date: date, bucket: str) -> tuple:
+    # Map each day (as an offset from start_date) to its bucket, and label every bucket in the range
+    start = np.datetime64(start_date, "D")
+    if bucket == "week":
+        # start_date is a Monday, so whole weeks are plain integer division
+        bucket_count = (end_date - start_date).days // 7 + 1
+        labels = (start + np.arange(bucket_count) * 7).astype(str)
+        return day_offsets // 7, bucket_count, labels
+    first_month = start.astype("datetime64[M]")
+    last_month = np.datetime64(end_date, "D").astype("datetime64[M]")
+    months = (start + day_offsets).astype("datetime64[M]")
+    bucket_count = int((last_month - first_month).astype(int)) + 1
+    labels = np.arange(first_month, last_month + 1).astype(str)
+    return (months - first_month).astype(np.int64), bucket_count, labels
+
+def build_trends(daily_totals: dict, start_date: date, end_date: date, bucket: str = "week", window: int = 4) -> dict:
+    """Aggregate per-day, per-project totals into week or month buckets.
+
+    daily_totals holds parallel lists (day_offsets from start_date, project
+    names, hours) as returned by get_daily_totals. Everything is computed
+    on NumPy arrays and returned as parallel arrays: one value per bucket for
+    totals and the trailing moving average, one row per project
+    for its hours, and one value per project for its totals and share.
+    Projects are ordered by total hours, largest first.
+    """
+    day_offsets = np.asarray(daily_totals["day_offsets"], dtype=np.int64)
+    hours = np.asarray(daily_totals["hours"], dtype=np.float64)
+    project_names, project_indexes = np.unique(np.asarray(daily_totals["projects"], dtype=str), return_inverse=True)
+
+    bucket_indexes, bucket_count, labels = _bucket_indexes(day_offsets, start_date, end_date, bucket)
+    project_count = len(project_names)
+
+    # One pass: bincount over the flattened (bucket, project) cell index
+    cells = np.bincount(
+        bucket_indexes * project_count + project_indexes,
+        weights=hours,
+        minlength=bucket_count * project_count,
+    ).astype(np.float64, copy=False).reshape(bucket_count, project_count)
+
+    totals = cells.sum(axis=1)
+    cumulative = np.cumsum(totals)
+    moving_average = cumulative.copy()
+    moving_average[window:] -= cumulative[:-window]
+    moving_average /= np.minimum(np.arange(1, bucket_count + 1), window)
+
+    project_totals = cells.sum(axis=0)
+    order = np.argsort(-project_totals, kind="stable")
+    grand_total = project_totals.sum()
+    shares = project_totals[order] / grand_total if grand_total else np.zeros(project_count)
+
+    return {
+        "bucket": bucket,
+        "window": window,
+        "buckets": labels.tolist(),
+        "total_hours": np.round(totals, 2).tolist(),
+        "moving_average": np.round(moving_average, 2).tolist(),
+        "projects": project_names[order].tolist(),
+        "project_hours": np.round(cells[:, order].T, 2).tolist(),
+        "project_totals": np.round(project_totals[order], 2).tolist(),
+        "project_shares": np.round(shares, 4).tolist(),
+        "grand_total": round(float(grand_total), 2),
+    }
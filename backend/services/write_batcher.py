@@ -0,0 +1,113 @@
+import asyncio
+import os
+import psycopg2
+from db.executor import run_db
+from lib.metrics import Histogram
+from services import inputing
+
+TIME_ENTRY_BATCH_SIZE = Histogram(
+    "time_entry_batch_size",
+    "Time entries committed per group-commit transaction",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+
+class TimeEntryWriteBatcher:
+    """Group commit for single time entry inserts.
+
+    ``submit`` queues an entry and resolves once the transaction holding it
+    has committed, so a request is only acknowledged after its entry is
+    durable. A batch is flushed when ``max_batch`` entries are waiting or
+    ``max_wait_ms`` after its first entry, whichever comes first, and written
+    with store_time_entries: one transaction, one commit, one fsync.
+    """
+
+    def __init__(self, max_batch: int = 100, max_wait_ms: float = 5.0, store_many=None, store_one=None):
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self._store_many = store_many or (lambda entries: run_db(inputing.store_time_entries, entries))
+        self._store_one = store_one or (lambda entry: run_db(inputing.store_time_entry, entry))
+        self._pending = []
+        self._timer = None
+        self._flushes = set()
+        self._closed = False
+
+    async def submit(self, time_entry: dict) -> bool:
+        if self._closed:
+            raise RuntimeError("Time entry batcher is closed")
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((time_entry, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush_pending()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait, self._flush_pending)
+        # A cancelled request (client gone) must not cancel the write its batch may already hold
+        return await asyncio.shield(future)
+
+    def _flush_pending(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        task = asyncio.create_task(self._write(batch))
+        # Several batches may be in flight: the next one fills while the previous commits
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _write(self, batch: list):
+        TIME_ENTRY_BATCH_SIZE.observe(len(batch))
+        try:
+            await self._store_many([entry for entry, _ in batch])
+        except (psycopg2.IntegrityError, psycopg2.DataError):
+            # One bad entry must not fail its neighbours: retry them one by one,
+            # so only the offending request sees the error
+            for entry, future in batch:
+                try:
+                    _resolve(future, result=await self._store_one(entry))
+                except Exception as e:
+                    _resolve(future, error=e)
+            return
+        except Exception as e:
+            for _, future in batch:
+                _resolve(future, error=e)
+            return
+        for _, future in batch:
+            _resolve(future, result=True)
+
+    async def close(self):
+        """Write out queued entries and wait for in-flight batches, e.g. on shutdown."""
+        self._closed = True
+        self._flush_pending()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+def _resolve(future, result=None, error=None):
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+_batcher = None
+
+def time_entry_batching_enabled() -> bool:
+    return os.getenv("TIME_ENTRY_BATCHING", "false").lower() in ("1", "true", "yes", "on")
+
+def get_time_entry_batcher():
+    """The shared batcher, or None when TIME_ENTRY_BATCHING is off (the default)."""
+    global _batcher
+    if _batcher is None and time_entry_batching_enabled():
+        _batcher = TimeEntryWriteBatcher(
+            max_batch=int(os.getenv("TIME_ENTRY_BATCH_SIZE", 100)),
+            max_wait_ms=float(os.getenv("TIME_ENTRY_BATCH_MAX_WAIT_MS", 5)),
+        )
+    return _batcher
+
+async def close_time_entry_batcher():
+    global _batcher
+    if _batcher is not None:
+        await _batcher.close()
+        _batcher = None
@@ -0,0 +1,57 @@
+import pytest
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+from db.executor import run_db, get_db_executor, shutdown_db_executor
+
+class TestDbExecutor:
+    """Test cases for running blocking database calls off the event loop"""
+
+    @pytest.fixture(autouse=True)
+    def fresh_executor(self):
+        shutdown_db_executor()
+        yield
+        shutdown_db_executor()
+
+    def test_run_db_returns_result(self):
+        """Test that run_db returns the function result and forwards arguments"""
+        result = asyncio.run(run_db(lambda a, b=0: a + b, 2, b=3))
+
+        assert result == 5
+
+    def test_run_db_runs_off_the_event_loop_thread(self):
+        """Test that the function is executed on an executor thread"""
+        async def main():
+            return threading.get_ident(), await run_db(threading.get_ident)
+
+        loop_thread, worker_thread = asyncio.run(main())
+
+        assert loop_thread != worker_thread
+
+    def test_run_db_propagates_exceptions(self):
+        """Test that exceptions raised by the function reach the caller"""
+        def fail():
+            raise ValueError("User not found")
+
+        with pytest.raises(ValueError, match="User not found"):
+            asyncio.run(run_db(fail))
+
+    def test_blocking_calls_overlap(self):
+        """Test that concurrent calls do not serialize on the event loop"""
+        async def main():
+            started = time.perf_counter()
+            await asyncio.gather(*(run_db(time.sleep, 0.1) for _ in range(5)))
+            return time.perf_counter() - started
+
+        with patch.dict('os.environ', {"DB_EXECUTOR_WORKERS": "5"}):
+            elapsed = asyncio.run(main())
+
+        assert elapsed < 0.3
+
+    def test_executor_size_follows_env(self):
+        """Test that the executor is sized from the environment"""
+        with patch.dict('os.environ', {"DB_EXECUTOR_WORKERS": "3"}):
+            executor = get_db_executor()
+
+        assert executor._max_workers == 3
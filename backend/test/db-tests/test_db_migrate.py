@@ -0,0 +1,80 @@
+import pytest
+from unittest.mock import MagicMock, call
+from db.migrate import discover_migrations, run_migrations, MIGRATION_LOCK_KEY
+
+@pytest.fixture
+def migrations_dir(tmp_path):
+    (tmp_path / "0002_add_index.sql").write_text("CREATE INDEX idx ON t (c);")
+    (tmp_path / "0001_initial.sql").write_text("CREATE TABLE t (c INT);")
+    (tmp_path / "README.md").write_text("not a migration")
+    return str(tmp_path)
+
+class TestMigrations:
+    """Test cases for the versioned migration runner"""
+
+    def test_discover_migrations_ordered(self, migrations_dir):
+        """Test that migrations are discovered in version order and other files are ignored"""
+        migrations = discover_migrations(migrations_dir)
+
+        assert [(version, name) for version, name, _ in migrations] == [(1, "initial"), (2, "add_index")]
+
+    def test_discover_migrations_duplicate_version(self, migrations_dir, tmp_path):
+        """Test that two scripts with the same version are rejected"""
+        (tmp_path / "0002_other.sql").write_text("SELECT 1;")
+
+        with pytest.raises(ValueError, match="Duplicate migration version 2"):
+            discover_migrations(migrations_dir)
+
+    def test_repository_migrations_are_valid(self):
+        """Test that the shipped migrations start at version 1 without gaps"""
+        versions = [version for version, _, _ in discover_migrations()]
+
+        assert versions == list(range(1, len(versions) + 1))
+
+    def test_run_migrations_applies_only_pending(self, migrations_dir):
+        """Test that already-applied versions are skipped"""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchall.return_value = [(1,)]
+
+        applied = run_migrations(mock_conn, migrations_dir)
+
+        assert applied == [2]
+        executed = [c.args[0] for c in mock_cursor.execute.call_args_list]
+        assert "CREATE INDEX idx ON t (c);" in executed
+        assert "CREATE TABLE t (c INT);" not in executed
+        mock_cursor.execute.assert_any_call(
+            "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)", (2, "add_index")
+        )
+
+    def test_run_migrations_holds_advisory_lock(self, migrations_dir):
+        """Test that the advisory lock is taken first and released at the end"""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchall.return_value = []
+
+        run_migrations(mock_conn, migrations_dir)
+
+        calls = mock_cursor.execute.call_args_list
+        assert calls[0] == call("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_KEY,))
+        assert calls[-1] == call("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_KEY,))
+
+    def test_run_migrations_rolls_back_failed_migration(self, migrations_dir):
+        """Test that a failing migration is rolled back and the lock is still released"""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchall.return_value = []
+
+        def execute(sql, params=None):
+            if sql.startswith("CREATE TABLE t"):
+                raise RuntimeError("syntax error")
+        mock_cursor.execute.side_effect = execute
+
+        with pytest.raises(RuntimeError):
+            run_migrations(mock_conn, migrations_dir)
+
+        mock_conn.rollback.assert_called_once()
+        mock_cursor.execute.assert_called_with("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_KEY,))
@@ -0,0 +1,115 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from datetime import date
+from db.partitioning import (
+    add_months, partition_name, partition_month, plan_maintenance, scanned_partitions,
+    maintain_partitions, convert_to_partitioned, get_archived_before,
+)
+
+class TestPartitionHelpers:
+    """Test cases for month arithmetic and partition naming"""
+
+    def test_add_months_crosses_years(self):
+        """Test that month arithmetic wraps around year boundaries"""
+        assert add_months(date(2024, 11, 1), 3) == date(2025, 2, 1)
+        assert add_months(date(2024, 1, 1), -1) == date(2023, 12, 1)
+
+    def test_partition_name_round_trip(self):
+        """Test that partition names map back to their month"""
+        assert partition_name(date(2024, 3, 1)) == "time_entries_2024_03"
+        assert partition_month("time_entries_2024_03") == date(2024, 3, 1)
+        assert partition_month("time_entries_default") is None
+
+    def test_plan_creates_missing_future_months(self):
+        """Test that the current and upcoming months are created when missing"""
+        existing = [date(2024, 5, 1), date(2024, 6, 1)]
+
+        to_create, to_archive = plan_maintenance(existing, date(2024, 6, 15), months_ahead=2, retention_months=0)
+
+        assert to_create == [date(2024, 7, 1), date(2024, 8, 1)]
+        assert to_archive == []
+
+    def test_plan_archives_past_retention(self):
+        """Test that partitions older than the retention are archived"""
+        existing = [date(2023, 12, 1), date(2024, 1, 1), date(2024, 2, 1), date(2024, 3, 1)]
+
+        _, to_archive = plan_maintenance(existing, date(2024, 3, 10), months_ahead=0, retention_months=2)
+
+        assert to_archive == [date(2023, 12, 1)]
+
+    def test_scanned_partitions_walks_plan(self):
+        """Test that partition scans are collected from nested plan nodes"""
+        plan = [{"Plan": {"Node Type": "Sort", "Plans": [
+            {"Node Type": "Hash Join", "Plans": [
+                {"Node Type": "Append", "Plans": [
+                    {"Node Type": "Index Scan", "Relation Name": "time_entries_2024_03"},
+                    {"Node Type": "Seq Scan", "Relation Name": "time_entries_default"},
+                ]},
+                {"Node Type": "Seq Scan", "Relation Name": "projects"},
+            ]},
+        ]}}]
+
+        assert scanned_partitions(plan) == ["time_entries_2024_03", "time_entries_default"]
+
+
+class TestPartitionMaintenance:
+    """Test cases for partition maintenance and conversion"""
+
+    def test_maintain_is_noop_when_not_partitioned(self):
+        """Test that maintenance does nothing for a plain time_entries table"""
+        conn = MagicMock()
+        with patch('db.partitioning.is_partitioned', return_value=False):
+            result = maintain_partitions(conn, months_ahead=3, retention_months=0)
+
+        assert result == {"partitioned": False, "created": [], "archived": []}
+        conn.commit.assert_not_called()
+
+    def test_maintain_creates_and_archives(self):
+        """Test that maintenance attaches new months and moves expired ones to the archive schema"""
+        conn = MagicMock()
+        cursor = conn.cursor.return_value
+        existing = [date(2024, 1, 1), date(2024, 5, 1), date(2024, 6, 1)]
+
+        with patch('db.partitioning.is_partitioned', return_value=True), \
+             patch('db.partitioning.list_partition_months', return_value=existing):
+            result = maintain_partitions(conn, months_ahead=1, retention_months=3, today=date(2024, 6, 2))
+
+        assert result["created"] == ["time_entries_2024_07"]
+        assert result["archived"] == ["time_entries_2024_01"]
+        executed = [c.args[0] for c in cursor.execute.call_args_list]
+        assert any("ATTACH PARTITION time_entries_2024_07" in sql for sql in executed)
+        assert "ALTER TABLE time_entries DETACH PARTITION time_entries_2024_01" in executed
+        assert "ALTER TABLE time_entries_2024_01 SET SCHEMA archive" in executed
+        conn.commit.assert_called_once()
+
+    def test_maintain_rolls_back_on_error(self):
+        """Test that a failed maintenance run leaves the partitions untouched"""
+        conn = MagicMock()
+        with patch('db.partitioning.is_partitioned', side_effect=RuntimeError("boom")):
+            with pytest.raises(RuntimeError):
+                maintain_partitions(conn, months_ahead=1, retention_months=0)
+
+        conn.rollback.assert_called_once()
+
+    def test_convert_refuses_rows_without_entry_date(self):
+        """Test that conversion stops before touching the table when entry_date is missing"""
+        conn = MagicMock()
+        conn.cursor.return_value.fetchone.return_value = (3,)
+
+        with patch('db.partitioning.is_partitioned', return_value=False):
+            with pytest.raises(ValueError):
+                convert_to_partitioned(conn)
+
+        executed = [c.args[0] for c in conn.cursor.return_value.execute.call_args_list]
+        assert not any("RENAME" in sql for sql in executed)
+        conn.rollback.assert_called_once()
+
+    def test_archived_before_is_month_after_newest_archive(self):
+        """Test that rollup checks start after the newest archived month"""
+        conn = MagicMock()
+        conn.cursor.return_value.fetchall.return_value = [("time_entries_2023_11",), ("time_entries_2024_01",), ("other",)]
+
+        assert get_archived_before(conn) == date(2024, 2, 1)
+
+        conn.cursor.return_value.fetchall.return_value = []
+        assert get_archived_before(conn) is None
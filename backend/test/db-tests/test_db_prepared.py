@@ -0,0 +1,146 @@
+import pytest
+import psycopg2
+from unittest.mock import MagicMock, patch
+from db import prepared
+from db.prepared import register_statement, to_positional, prepare_statements, execute_prepared, is_prepared
+
+class FakeConnection:
+    """Weak-referenceable stand-in for a psycopg2 connection"""
+
+    def __init__(self):
+        self.cursor_mock = MagicMock()
+        self.commit = MagicMock()
+        self.rollback = MagicMock()
+
+    def cursor(self):
+        return self.cursor_mock
+
+@pytest.fixture
+def statements():
+    with patch.dict(prepared._statements, clear=True):
+        register_statement("test_get_user", "SELECT * FROM users WHERE username = %s")
+        register_statement("test_insert", "INSERT INTO t (a, b) VALUES (%s, %s)")
+        yield
+
+class TestPreparedStatements:
+    """Test cases for per-connection prepared statements"""
+
+    def test_to_positional(self):
+        """Test that %s placeholders become numbered PREPARE parameters"""
+        assert to_positional("SELECT * FROM t WHERE a = %s AND b BETWEEN %s AND %s") == \
+            "SELECT * FROM t WHERE a = $1 AND b BETWEEN $2 AND $3"
+
+    def test_register_conflicting_sql_raises(self, statements):
+        """Test that a name cannot be reused for a different statement"""
+        assert register_statement("test_get_user", "SELECT * FROM users WHERE username = %s") == "test_get_user"
+        with pytest.raises(ValueError):
+            register_statement("test_get_user", "SELECT 1")
+
+    def test_prepare_statements_once_per_connection(self, statements):
+        """Test that statements are prepared on first checkout only"""
+        conn = FakeConnection()
+
+        prepare_statements(conn)
+        prepare_statements(conn)
+
+        executed = [c.args[0] for c in conn.cursor_mock.execute.call_args_list]
+        assert executed == [
+            "PREPARE test_get_user AS SELECT * FROM users WHERE username = $1",
+            "PREPARE test_insert AS INSERT INTO t (a, b) VALUES ($1, $2)",
+        ]
+        assert is_prepared(conn, "test_get_user")
+
+    def test_newly_registered_statement_is_prepared_later(self, statements):
+        """Test that a statement registered after setup is prepared on the next checkout"""
+        conn = FakeConnection()
+        prepare_statements(conn)
+
+        register_statement("test_late", "SELECT 2")
+        prepare_statements(conn)
+
+        assert conn.cursor_mock.execute.call_args_list[-1].args[0] == "PREPARE test_late AS SELECT 2"
+        assert conn.cursor_mock.execute.call_count == 3
+
+    def test_failed_prepare_falls_back_to_plain_sql(self, statements):
+        """Test that a statement that fails to prepare is executed as plain SQL"""
+        conn = FakeConnection()
+        conn.cursor_mock.execute.side_effect = [psycopg2.ProgrammingError("relation does not exist"), None]
+
+        prepare_statements(conn)
+        conn.rollback.assert_called_once()
+        assert not is_prepared(conn, "test_get_user")
+        assert is_prepared(conn, "test_insert")
+
+        cursor = MagicMock()
+        cursor.connection = conn
+        execute_prepared(cursor, "get_user", "test_get_user", ("testuser",))
+        cursor.execute.assert_called_once_with("SELECT * FROM users WHERE username = %s", ("testuser",))
+
+    def test_execute_prepared_uses_execute_by_name(self, statements):
+        """Test that a prepared statement is run with EXECUTE"""
+        conn = FakeConnection()
+        prepare_statements(conn)
+        cursor = MagicMock()
+        cursor.connection = conn
+
+        execute_prepared(cursor, "store", "test_insert", ("a", 1))
+
+        cursor.execute.assert_called_once_with("EXECUTE test_insert (%s, %s)", ("a", 1))
+
+    def test_slow_prepared_statement_logs_registered_sql_and_plan(self, statements):
+        """Test that a slow EXECUTE is logged as its SELECT and explained by name"""
+        from db.query import SlowQueryLog
+        conn = FakeConnection()
+        prepare_statements(conn)
+        conn.autocommit = True
+        conn.cursor_mock = MagicMock()
+        conn.cursor_mock.fetchone.return_value = ([{"Plan": {"Node Type": "Index Scan"}}],)
+        cursor = MagicMock()
+        cursor.connection = conn
+        cursor.rowcount = 1
+        cursor.name = None
+        slow_query_log = SlowQueryLog(threshold_ms=0, explain_sample_rate=1.0)
+
+        with patch('db.query.get_slow_query_log', return_value=slow_query_log):
+            execute_prepared(cursor, "get_user", "test_get_user", ("testuser",))
+
+        conn.cursor_mock.execute.assert_called_once_with(
+            "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) EXECUTE test_get_user (%s)", ("testuser",)
+        )
+        entry = slow_query_log.entries()[0]
+        assert entry["query"] == "SELECT * FROM users WHERE username = %s"
+        assert entry["plan"] == [{"Plan": {"Node Type": "Index Scan"}}]
+
+    def test_unprepared_connection_runs_plain_sql(self, statements):
+        """Test that connections outside the pool run the registered SQL directly"""
+        cursor = MagicMock()
+
+        execute_prepared(cursor, "get_user", "test_get_user", ("testuser",))
+
+        cursor.execute.assert_called_once_with("SELECT * FROM users WHERE username = %s", ("testuser",))
+
+    def test_get_connection_prepares_at_checkout(self, statements):
+        """Test that get_connection prepares statements on the borrowed connection"""
+        from db import server
+        conn = FakeConnection()
+        pool = MagicMock()
+        pool.connection.return_value.__enter__.return_value = conn
+
+        with patch('db.server.get_pool', return_value=pool), patch.dict('os.environ', {"DB_PREPARED_STATEMENTS": "true"}):
+            with server.get_connection() as borrowed:
+                assert borrowed is conn
+
+        assert is_prepared(conn, "test_insert")
+
+    def test_disabled_prepared_statements(self, statements):
+        """Test that DB_PREPARED_STATEMENTS=false skips preparation"""
+        from db import server
+        conn = FakeConnection()
+        pool = MagicMock()
+        pool.connection.return_value.__enter__.return_value = conn
+
+        with patch('db.server.get_pool', return_value=pool), patch.dict('os.environ', {"DB_PREPARED_STATEMENTS": "false"}):
+            with server.get_connection():
+                pass
+
+        conn.cursor_mock.execute.assert_not_called()
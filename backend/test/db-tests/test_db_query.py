@@ -0,0 +1,163 @@
+import pytest
+import psycopg2
+from unittest.mock import MagicMock, patch
+from db.query import execute, execute_values, DB_QUERY_DURATION, SlowQueryLog, params_shape
+
+def observed_count(label: str) -> int:
+    counts, _ = DB_QUERY_DURATION.labels(label).snapshot()
+    return sum(counts)
+
+def make_cursor(rowcount=3):
+    cursor = MagicMock()
+    cursor.name = None
+    cursor.rowcount = rowcount
+    cursor.connection.autocommit = False
+    cursor.connection.cursor.return_value.fetchone.return_value = ([{"Plan": {"Node Type": "Seq Scan"}}],)
+    return cursor
+
+class TestQueryExecute:
+    """Test cases for the instrumented query wrapper"""
+
+    def test_execute_passes_sql_and_params(self):
+        """Test that execute forwards the statement and parameters to the cursor"""
+        cursor = MagicMock()
+
+        execute(cursor, "test_execute_params", "SELECT * FROM users WHERE username = %s", ("testuser",))
+
+        cursor.execute.assert_called_once_with("SELECT * FROM users WHERE username = %s", ("testuser",))
+
+    def test_execute_without_params(self):
+        """Test that execute omits the parameters argument when none are given"""
+        cursor = MagicMock()
+
+        execute(cursor, "test_execute_no_params", "SELECT 1")
+
+        cursor.execute.assert_called_once_with("SELECT 1")
+
+    def test_execute_records_duration_by_label(self):
+        """Test that each execution is observed under its service function label"""
+        before = observed_count("test_execute_label")
+
+        execute(MagicMock(), "test_execute_label", "SELECT 1")
+        execute(MagicMock(), "test_execute_label", "SELECT 1")
+
+        assert observed_count("test_execute_label") == before + 2
+
+    def test_failed_query_is_still_recorded(self):
+        """Test that a failing statement is timed and the error propagates"""
+        cursor = MagicMock()
+        cursor.execute.side_effect = psycopg2.OperationalError("connection lost")
+        before = observed_count("test_execute_failure")
+
+        with pytest.raises(psycopg2.OperationalError):
+            execute(cursor, "test_execute_failure", "SELECT 1")
+
+        assert observed_count("test_execute_failure") == before + 1
+
+
+class TestSlowQueryLog:
+    """Test cases for the slow-query log and EXPLAIN sampling"""
+
+    def test_fast_query_is_not_recorded(self):
+        """Test that queries under the threshold are not logged"""
+        slow_query_log = SlowQueryLog(threshold_ms=10000)
+
+        with patch('db.query.get_slow_query_log', return_value=slow_query_log):
+            execute(make_cursor(), "test_fast_query", "SELECT 1")
+
+        assert slow_query_log.entries() == []
+
+    def test_slow_query_records_shape_not_values(self):
+        """Test that a slow query is logged with row count and parameter types only"""
+        slow_query_log = SlowQueryLog(threshold_ms=0)
+
+        with patch('db.query.get_slow_query_log', return_value=slow_query_log):
+            execute(make_cursor(rowcount=7), "get_user", "SELECT *\n  FROM users WHERE username = %s", ("secretname",))
+
+        entry = slow_query_log.entries()[0]
+        assert entry["function"] == "get_user"
+        assert entry["rowcount"] == 7
+        assert entry["params_shape"] == ["str"]
+        assert entry["query"] == "SELECT * FROM users WHERE username = %s"
+        assert "secretname" not in str(entry)
+        assert entry["plan"] is None
+
+    def test_sampled_select_captures_plan_in_savepoint(self):
+        """Test that a sampled slow SELECT is explained inside a savepoint"""
+        slow_query_log = SlowQueryLog(threshold_ms=0, explain_sample_rate=1.0)
+        cursor = make_cursor()
+
+        with patch('db.query.get_slow_query_log', return_value=slow_query_log):
+            execute(cursor, "get_time_entries", "SELECT * FROM time_entries WHERE user_id = %s", ("u",))
+
+        explain_calls = [c.args for c in cursor.connection.cursor.return_value.execute.call_args_list]
+        assert explain_calls[0] == ("SAVEPOINT slow_query_explain",)
+        assert explain_calls[1] == ("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) SELECT * FROM time_entries WHERE user_id = %s", ("u",))
+        assert explain_calls[2] == ("RELEASE SAVEPOINT slow_query_explain",)
+        assert slow_query_log.entries()[0]["plan"] == [{"Plan": {"Node Type": "Seq Scan"}}]
+
+    def test_failed_explain_rolls_back_to_savepoint(self):
+        """Test that a failing EXPLAIN leaves the caller's transaction usable"""
+        slow_query_log = SlowQueryLog(threshold_ms=0, explain_sample_rate=1.0)
+        cursor = make_cursor()
+        explain_cursor = cursor.connection.cursor.return_value
+        explain_cursor.execute.side_effect = [None, psycopg2.ProgrammingError("boom"), None]
+
+        with patch('db.query.get_slow_query_log', return_value=slow_query_log):
+            execute(cursor, "get_user", "SELECT 1")
+
+        assert explain_cursor.execute.call_args_list[-1].args == ("ROLLBACK TO SAVEPOINT slow_query_explain",)
+        assert slow_query_log.entries()[0]["plan"] == {"error": "boom"}
+
+    def test_writes_are_never_explained(self):
+        """Test that EXPLAIN ANALYZE is not run for statements with side effects"""
+        slow_query_log = SlowQueryLog(threshold_ms=0, explain_sample_rate=1.0)
+        cursor = make_cursor()
+
+        with patch('db.query.get_slow_query_log', return_value=slow_query_log):
+            execute(cursor, "store_time_entry", "INSERT INTO time_entries VALUES (%s)", (1,))
+
+        cursor.connection.cursor.assert_not_called()
+        assert slow_query_log.entries()[0]["plan"] is None
+
+    def test_slow_multi_row_write_is_logged_without_plan(self):
+        """Test execute_values writes reach the slow-query log with the number of rows sent"""
+        slow_query_log = SlowQueryLog(threshold_ms=0, explain_sample_rate=1.0)
+        cursor = make_cursor(rowcount=1)
+        rows = [("u1", 1, 1.5), ("u1", 2, 2.0), ("u2", 1, 0.5)]
+        before = observed_count("store_time_entries")
+
+        with patch('db.query.get_slow_query_log', return_value=slow_query_log), \
+                patch('db.query.psycopg2.extras.execute_values') as mock_execute_values:
+            execute_values(cursor, "store_time_entries", "INSERT INTO time_entries VALUES %s", rows, page_size=2)
+
+        mock_execute_values.assert_called_once_with(cursor, "INSERT INTO time_entries VALUES %s", rows, page_size=2)
+        entry = slow_query_log.entries()[0]
+        assert entry["function"] == "store_time_entries"
+        assert entry["rowcount"] == 3
+        assert entry["params_shape"] == ["str", "int", "float"]
+        assert entry["plan"] is None
+        cursor.connection.cursor.assert_not_called()
+        assert observed_count("store_time_entries") == before + 1
+
+    def test_ring_buffer_keeps_newest(self):
+        """Test that the buffer drops the oldest entries and lists newest first"""
+        slow_query_log = SlowQueryLog(threshold_ms=0, max_entries=2)
+
+        for label in ("first", "second", "third"):
+            slow_query_log.record(label, "SELECT 1", None, 500, 1)
+
+        assert [entry["function"] for entry in slow_query_log.entries()] == ["third", "second"]
+        assert slow_query_log.stats()["total"] == 3
+
+    def test_negative_threshold_disables_logging(self):
+        """Test that a negative threshold turns the slow-query log off"""
+        assert SlowQueryLog(threshold_ms=-1).is_slow(10 ** 6) is False
+
+    def test_params_shape_truncates_long_lists(self):
+        """Test that long parameter lists are summarised"""
+        shape = params_shape(list(range(25)))
+
+        assert shape[:2] == ["int", "int"]
+        assert shape[-1] == "... 5 more"
+        assert params_shape({"user_id": "u"}) == {"user_id": "str"}
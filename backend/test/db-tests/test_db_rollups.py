@@ -0,0 +1,71 @@
+import pytest
+from unittest.mock import MagicMock
+from datetime import date
+from decimal import Decimal
+from db.rollups import verify_daily_totals, rebuild_daily_totals
+
+class TestDailyTotalsRollup:
+    """Test cases for verifying and rebuilding the daily totals rollup"""
+
+    def test_verify_reports_mismatches(self):
+        """Test that mismatched rows are returned as dictionaries"""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchall.return_value = [("u1", 1, date(2024, 1, 1), Decimal("3.00"), None, 2, None)]
+
+        mismatches = verify_daily_totals(mock_conn)
+
+        assert mismatches == [{
+            "user_id": "u1",
+            "project_id": 1,
+            "day": "2024-01-01",
+            "expected_hours": 3.0,
+            "rollup_hours": 0.0,
+            "expected_count": 2,
+            "rollup_count": 0,
+        }]
+
+    def test_verify_no_mismatches(self):
+        """Test that a consistent rollup yields no mismatches"""
+        mock_conn = MagicMock()
+        mock_conn.cursor.return_value.fetchall.return_value = []
+
+        assert verify_daily_totals(mock_conn) == []
+
+    def test_rebuild_locks_and_commits(self):
+        """Test that rebuild locks writers out, recomputes and commits once"""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.rowcount = 42
+
+        assert rebuild_daily_totals(mock_conn) == 42
+
+        executed = [c.args[0] for c in mock_cursor.execute.call_args_list]
+        assert executed[0] == "LOCK TABLE time_entries IN SHARE MODE"
+        assert "DELETE FROM time_entry_daily_totals" in executed
+        mock_conn.commit.assert_called_once()
+
+    def test_rebuild_rolls_back_on_error(self):
+        """Test that a failed rebuild leaves the rollup untouched"""
+        mock_conn = MagicMock()
+        mock_conn.cursor.return_value.execute.side_effect = [None, None, None, RuntimeError("boom")]
+
+        with pytest.raises(RuntimeError):
+            rebuild_daily_totals(mock_conn)
+
+        mock_conn.rollback.assert_called_once()
+        mock_conn.commit.assert_not_called()
+
+    def test_rebuild_since_keeps_archived_days(self):
+        """Test that a rebuild from a date only replaces rollup rows from that day on"""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+
+        rebuild_daily_totals(mock_conn, since=date(2024, 2, 1))
+
+        calls = mock_cursor.execute.call_args_list
+        assert calls[2].args == ("DELETE FROM time_entry_daily_totals WHERE day >= %s", (date(2024, 2, 1),))
+        assert calls[3].args[1] == (date(2024, 2, 1),)
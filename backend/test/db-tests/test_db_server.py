@@ -0,0 +1,306 @@
+import pytest
+import threading
+from contextlib import contextmanager
+import psycopg2
+import psycopg2.extensions
+from unittest.mock import MagicMock
+from db.server import ConnectionPool, PoolTimeoutError, ReplicaRouter, replica_connection_params, get_read_connection
+
+def make_connection():
+    conn = MagicMock()
+    conn.closed = 0
+    conn.get_transaction_status.return_value = psycopg2.extensions.TRANSACTION_STATUS_IDLE
+    return conn
+
+class TestConnectionPool:
+    """Test cases for the database connection pool"""
+
+    def test_open_prefills_min_size(self):
+        """Test that open() creates min_size idle connections"""
+        connect = MagicMock(side_effect=make_connection)
+        pool = ConnectionPool(min_size=2, max_size=4, connect=connect)
+
+        pool.open()
+
+        stats = pool.stats()
+        assert connect.call_count == 2
+        assert stats["idle"] == 2
+        assert stats["in_use"] == 0
+
+    def test_connection_is_reused(self):
+        """Test that a released connection is handed out again"""
+        connect = MagicMock(side_effect=make_connection)
+        pool = ConnectionPool(min_size=0, max_size=2, connect=connect)
+
+        with pool.connection() as first:
+            assert pool.stats()["in_use"] == 1
+        with pool.connection() as second:
+            pass
+
+        assert first is second
+        assert connect.call_count == 1
+        assert pool.stats()["checkouts"] == 2
+
+    def test_release_rolls_back_open_transaction(self):
+        """Test that a connection left inside a transaction is rolled back on release"""
+        conn = make_connection()
+        conn.get_transaction_status.return_value = psycopg2.extensions.TRANSACTION_STATUS_INTRANS
+        pool = ConnectionPool(min_size=0, max_size=1, connect=lambda: conn)
+
+        with pool.connection():
+            pass
+
+        conn.rollback.assert_called_once()
+        assert pool.stats()["idle"] == 1
+
+    def test_operational_error_discards_connection(self):
+        """Test that a connection is dropped when the with-block raises OperationalError"""
+        conn = make_connection()
+        pool = ConnectionPool(min_size=0, max_size=1, connect=lambda: conn)
+
+        with pytest.raises(psycopg2.OperationalError):
+            with pool.connection():
+                raise psycopg2.OperationalError("server closed the connection")
+
+        stats = pool.stats()
+        assert stats["size"] == 0
+        assert stats["discarded"] == 1
+        conn.close.assert_called_once()
+
+    def test_unhealthy_idle_connection_is_replaced(self):
+        """Test that a closed idle connection is discarded on checkout"""
+        connect = MagicMock(side_effect=make_connection)
+        pool = ConnectionPool(min_size=0, max_size=1, connect=connect)
+
+        with pool.connection() as stale:
+            pass
+        stale.closed = 1
+        with pool.connection() as fresh:
+            pass
+
+        assert fresh is not stale
+        assert connect.call_count == 2
+
+    def test_health_check_pings_long_idle_connection(self):
+        """Test that connections idle past the health check interval are pinged"""
+        conn = make_connection()
+        pool = ConnectionPool(min_size=0, max_size=1, health_check_interval=0, connect=lambda: conn)
+
+        with pool.connection():
+            pass
+        with pool.connection():
+            pass
+
+        conn.cursor.return_value.execute.assert_called_with("SELECT 1")
+
+    def test_acquire_times_out_when_exhausted(self):
+        """Test that acquire raises PoolTimeoutError when the pool is exhausted"""
+        pool = ConnectionPool(min_size=0, max_size=1, acquire_timeout=0.05, connect=make_connection)
+
+        with pool.connection():
+            with pytest.raises(PoolTimeoutError):
+                pool.acquire()
+
+        stats = pool.stats()
+        assert stats["waits"] == 1
+        assert stats["wait_time_seconds"] > 0
+
+    def test_waiter_receives_released_connection(self):
+        """Test that a blocked acquire is woken up by a release"""
+        pool = ConnectionPool(min_size=0, max_size=1, acquire_timeout=2, connect=make_connection)
+        conn = pool.acquire()
+        acquired = []
+
+        thread = threading.Thread(target=lambda: acquired.append(pool.acquire()))
+        thread.start()
+        pool.release(conn)
+        thread.join(timeout=2)
+
+        assert acquired == [conn]
+        assert pool.stats()["waits"] == 1
+
+    def test_idle_connections_above_min_size_are_reaped(self):
+        """Test that idle connections past the idle timeout are closed"""
+        pool = ConnectionPool(min_size=1, max_size=3, idle_timeout=0, connect=make_connection)
+        first = pool.acquire()
+        second = pool.acquire()
+
+        pool.release(first)
+        pool.release(second)
+
+        stats = pool.stats()
+        assert stats["size"] == 1
+        assert stats["idle"] == 1
+
+    def test_close_closes_idle_and_returned_connections(self):
+        """Test that close() shuts down idle connections and ones returned afterwards"""
+        pool = ConnectionPool(min_size=0, max_size=2, connect=make_connection)
+        busy = pool.acquire()
+        idle_conn = pool.acquire()
+        pool.release(idle_conn)
+
+        pool.close()
+        pool.release(busy)
+
+        busy.close.assert_called_once()
+        idle_conn.close.assert_called_once()
+        with pytest.raises(PoolTimeoutError):
+            pool.acquire()
+
+    def test_invalid_sizes_raise(self):
+        """Test that inconsistent pool sizes are rejected"""
+        with pytest.raises(ValueError):
+            ConnectionPool(min_size=5, max_size=2)
+
+
+def make_replica_pool(conn=None, error=None):
+    pool = MagicMock()
+    if error is not None:
+        pool.acquire.side_effect = error
+    else:
+        pool.acquire.return_value = conn or make_connection()
+    return pool
+
+class TestReplicaRouter:
+    """Test cases for read replica routing"""
+
+    def test_round_robin_across_replicas(self):
+        """Test consecutive reads alternate between healthy replicas"""
+        first, second = make_replica_pool(), make_replica_pool()
+        router = ReplicaRouter([first, second])
+
+        indexes = [router.acquire()[0] for _ in range(4)]
+
+        assert indexes == [0, 1, 0, 1]
+
+    def test_unreachable_replica_is_skipped_then_retried(self, monkeypatch):
+        """Test a failing replica is marked down, skipped, and tried again after the retry interval"""
+        broken = make_replica_pool(error=psycopg2.OperationalError("connection refused"))
+        healthy = make_replica_pool()
+        router = ReplicaRouter([broken, healthy], retry_interval=30)
+        clock = [1000.0]
+        monkeypatch.setattr("db.server.time.monotonic", lambda: clock[0])
+
+        assert router.acquire()[0] == 1
+        assert router.is_healthy(0) is False
+        assert router.acquire()[0] == 1
+        assert broken.acquire.call_count == 1
+
+        clock[0] += 31
+        router.acquire()
+        assert broken.acquire.call_count == 2
+
+    def test_falls_back_to_primary_when_no_replica_is_healthy(self):
+        """Test acquire returns None so the caller reads from the primary"""
+        router = ReplicaRouter([make_replica_pool(error=psycopg2.OperationalError("connection refused"))])
+
+        assert router.acquire() is None
+        assert router.acquire() is None
+
+    def test_exhausted_replica_pool_is_not_marked_down(self):
+        """Test a pool timeout falls back for that read only and keeps the replica in rotation"""
+        busy = make_replica_pool(error=PoolTimeoutError("timed out"))
+        router = ReplicaRouter([busy])
+
+        assert router.acquire() is None
+        assert router.is_healthy(0) is True
+
+        busy.acquire.side_effect = None
+        busy.acquire.return_value = make_connection()
+        assert router.acquire()[0] == 0
+
+    def test_exhausted_replica_pool_tries_next_replica(self):
+        """Test a saturated replica hands the read to the next one"""
+        router = ReplicaRouter([make_replica_pool(error=PoolTimeoutError("timed out")), make_replica_pool()])
+
+        assert router.acquire()[0] == 1
+        assert router.is_healthy(0) is True
+
+    def test_recent_writer_sticks_to_primary(self, monkeypatch):
+        """Test a key that just wrote reads from the primary until stickiness expires"""
+        replica = make_replica_pool()
+        router = ReplicaRouter([replica], sticky_seconds=5)
+        clock = [1000.0]
+        monkeypatch.setattr("db.server.time.monotonic", lambda: clock[0])
+
+        router.mark_write("user-1")
+
+        assert router.acquire("user-1") is None
+        assert router.acquire("user-2") is not None
+        clock[0] += 6
+        assert router.acquire("user-1") is not None
+
+    def test_replica_connection_params(self, monkeypatch):
+        """Test host[:port] entries share the primary settings and DSNs are passed through"""
+        monkeypatch.setenv("DB_NAME", "timetracker")
+        monkeypatch.setenv("DB_REPLICA_HOSTS", "replica1:5433, replica2 ,postgresql://reader@replica3/timetracker")
+
+        replicas = replica_connection_params()
+
+        assert replicas[0]["host"] == "replica1" and replicas[0]["port"] == "5433"
+        assert replicas[0]["database"] == "timetracker"
+        assert replicas[1]["port"] == "5432"
+        assert replicas[2] == {"dsn": "postgresql://reader@replica3/timetracker"}
+
+
+class TestGetReadConnection:
+    """Test cases for the read connection context manager"""
+
+    def test_uses_primary_without_replicas(self, monkeypatch):
+        """Test reads go to the primary pool when no replicas are configured"""
+        monkeypatch.setattr("db.server.get_replica_router", lambda: None)
+        primary = make_connection()
+
+        @contextmanager
+        def fake_get_connection():
+            yield primary
+
+        monkeypatch.setattr("db.server.get_connection", fake_get_connection)
+
+        with get_read_connection("user-1") as conn:
+            assert conn is primary
+
+    def test_replica_error_marks_it_down_and_discards_connection(self, monkeypatch):
+        """Test a connection error during a replica read takes that replica out of rotation"""
+        replica_conn = make_connection()
+        pool = make_replica_pool(replica_conn)
+        router = ReplicaRouter([pool])
+        monkeypatch.setattr("db.server.get_replica_router", lambda: router)
+        monkeypatch.setenv("DB_PREPARED_STATEMENTS", "false")
+
+        with pytest.raises(psycopg2.OperationalError):
+            with get_read_connection() as conn:
+                assert conn is replica_conn
+                raise psycopg2.OperationalError("server closed the connection")
+
+        pool.release.assert_called_once_with(replica_conn, discard=True)
+        assert router.is_healthy(0) is False
+
+    def test_statement_timeout_keeps_replica_in_rotation(self, monkeypatch):
+        """Test a cancelled slow read neither marks the replica down nor discards its connection"""
+        replica_conn = make_connection()
+        pool = make_replica_pool(replica_conn)
+        router = ReplicaRouter([pool])
+        monkeypatch.setattr("db.server.get_replica_router", lambda: router)
+        monkeypatch.setenv("DB_PREPARED_STATEMENTS", "false")
+
+        with pytest.raises(psycopg2.extensions.QueryCanceledError):
+            with get_read_connection():
+                raise psycopg2.extensions.QueryCanceledError("canceling statement due to statement timeout")
+
+        pool.release.assert_called_once_with(replica_conn, discard=False)
+        assert router.is_healthy(0) is True
+
+    def test_replica_checkout_records_acquire_duration(self, monkeypatch):
+        """Test replica checkouts show up in the pool acquire histogram like primary ones"""
+        from db.server import DB_POOL_ACQUIRE_DURATION
+        router = ReplicaRouter([make_replica_pool()])
+        monkeypatch.setattr("db.server.get_replica_router", lambda: router)
+        monkeypatch.setenv("DB_PREPARED_STATEMENTS", "false")
+        counts_before, _ = DB_POOL_ACQUIRE_DURATION.labels().snapshot()
+
+        with get_read_connection():
+            pass
+
+        counts_after, _ = DB_POOL_ACQUIRE_DURATION.labels().snapshot()
+        assert sum(counts_after) - sum(counts_before) == 1
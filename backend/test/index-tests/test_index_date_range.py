@@ -0,0 +1,39 @@
+import pytest
+from unittest.mock import patch, AsyncMock
+from fastapi.testclient import TestClient
+from index import app, resolve_date_range
+from middlewares.auth_middleware import get_current_user
+
+@pytest.fixture
+def client():
+    app.dependency_overrides[get_current_user] = lambda: {"user_id": "u1"}
+    yield TestClient(app)
+    app.dependency_overrides.pop(get_current_user, None)
+
+class TestResolveDateRange:
+    """Test cases for the start/end query parameters of the range routes"""
+
+    def test_bounds_are_compared_as_dates(self):
+        """Test that a bound without zero padding is ordered by date, not as text"""
+        assert resolve_date_range("2024-1-5", "2024-01-10") == ("2024-01-05", "2024-01-10")
+        with pytest.raises(ValueError, match="Start date must be on or before end date"):
+            resolve_date_range("2024-09-01", "2024-1-5")
+
+    def test_entries_route_accepts_unpadded_dates(self, client):
+        """Test /v1/time/entries queries the normalized range"""
+        page = {"time_entries": [], "next_cursor": None}
+        with patch('index.get_time_entries_page', new=AsyncMock(return_value=page)) as mock_page:
+            response = client.get("/v1/time/entries", params={"start": "2024-1-5", "end": "2024-01-10"})
+
+        assert response.status_code == 200
+        assert (response.json()["start"], response.json()["end"]) == ("2024-01-05", "2024-01-10")
+        assert mock_page.call_args[0][1:3] == ("2024-01-05", "2024-01-10")
+
+    def test_summary_route_rejects_reversed_unpadded_range(self, client):
+        """Test /v1/time/summary never sends a reversed range to the query"""
+        with patch('index.get_range_summary', new=AsyncMock()) as mock_summary:
+            response = client.get("/v1/time/summary", params={"start": "2024-09-01", "end": "2024-1-5"})
+
+        assert response.status_code == 400
+        assert response.json()["message"] == "Start date must be on or before end date"
+        mock_summary.assert_not_called()
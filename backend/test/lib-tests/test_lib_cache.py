@@ -0,0 +1,70 @@
+import pytest
+import time
+from lib.cache import LRUCache
+
+class TestLRUCache:
+    """Test cases for the LRU cache with expiry"""
+
+    def test_get_and_set(self):
+        """Test storing and reading a value"""
+        cache = LRUCache(max_entries=2)
+        cache.set("a", 1)
+
+        assert cache.get("a") == 1
+        assert cache.get("missing") is None
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_least_recently_used_is_evicted(self):
+        """Test that the least recently used entry is evicted first"""
+        cache = LRUCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+
+    def test_entries_expire_after_ttl(self):
+        """Test that entries are dropped once their TTL has passed"""
+        cache = LRUCache(ttl=0)
+        cache.set("a", 1)
+
+        assert cache.get("a") is None
+        assert cache.stats()["expirations"] == 1
+        assert len(cache) == 0
+
+    def test_explicit_expiry(self):
+        """Test that an explicit expiry overrides the default TTL"""
+        cache = LRUCache(ttl=3600)
+        cache.set("a", 1, expires_at=time.monotonic() - 1)
+        cache.set("b", 2, expires_at=time.monotonic() + 60)
+
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+
+    def test_delete_and_clear(self):
+        """Test removing entries"""
+        cache = LRUCache()
+        cache.set("a", 1)
+        cache.set("b", 2)
+
+        cache.delete("a")
+        assert cache.get("a") is None
+        cache.clear()
+        assert len(cache) == 0
+
+    def test_hit_ratio(self):
+        """Test that the hit ratio reflects lookups"""
+        cache = LRUCache()
+        cache.set("a", 1)
+        cache.get("a")
+        cache.get("a")
+        cache.get("a")
+        cache.get("b")
+
+        assert cache.stats()["hit_ratio"] == 0.75
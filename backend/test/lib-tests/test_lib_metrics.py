@@ -0,0 +1,82 @@
+import pytest
+from lib.metrics import Registry, Counter, Gauge, Histogram
+
+class TestMetrics:
+    """Test cases for the Prometheus metrics primitives"""
+
+    def test_counter_renders_labels(self):
+        """Test that counters render one sample per label set"""
+        registry = Registry()
+        counter = Counter("requests_total", "Requests", ["route"], registry=registry)
+
+        counter.labels("/a").inc()
+        counter.labels("/a").inc(2)
+        counter.labels("/b").inc()
+
+        output = registry.render()
+        assert "# TYPE requests_total counter" in output
+        assert 'requests_total{route="/a"} 3.0' in output
+        assert 'requests_total{route="/b"} 1.0' in output
+
+    def test_gauge_inc_dec_set(self):
+        """Test that gauges move both ways and can be set"""
+        registry = Registry()
+        gauge = Gauge("in_flight", "In flight", registry=registry)
+
+        gauge.inc()
+        gauge.inc()
+        gauge.dec()
+        assert "in_flight 1.0" in registry.render()
+
+        gauge.set(7)
+        assert "in_flight 7.0" in registry.render()
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test that histogram buckets, sum and count follow the exposition format"""
+        registry = Registry()
+        histogram = Histogram("latency_seconds", "Latency", ["function"], buckets=(0.1, 1.0), registry=registry)
+
+        child = histogram.labels("get_user")
+        child.observe(0.05)
+        child.observe(0.1)
+        child.observe(0.5)
+        child.observe(3)
+
+        output = registry.render()
+        assert 'latency_seconds_bucket{function="get_user",le="0.1"} 2' in output
+        assert 'latency_seconds_bucket{function="get_user",le="1.0"} 3' in output
+        assert 'latency_seconds_bucket{function="get_user",le="+Inf"} 4' in output
+        assert 'latency_seconds_sum{function="get_user"} 3.65' in output
+        assert 'latency_seconds_count{function="get_user"} 4' in output
+
+    def test_label_values_are_escaped(self):
+        """Test that quotes, backslashes and newlines in label values are escaped"""
+        registry = Registry()
+        counter = Counter("escaped_total", "Escaped", ["value"], registry=registry)
+
+        counter.labels('a"b\\c\nd').inc()
+
+        assert 'escaped_total{value="a\\"b\\\\c\\nd"} 1.0' in registry.render()
+
+    def test_wrong_label_count_raises(self):
+        """Test that label values must match the declared label names"""
+        counter = Counter("strict_total", "Strict", ["a", "b"], registry=Registry())
+
+        with pytest.raises(ValueError):
+            counter.labels("only-one")
+
+    def test_duplicate_names_are_rejected(self):
+        """Test that a registry refuses two metrics with the same name"""
+        registry = Registry()
+        Counter("dup_total", "First", registry=registry)
+
+        with pytest.raises(ValueError):
+            Counter("dup_total", "Second", registry=registry)
+
+    def test_collectors_run_before_render(self):
+        """Test that registered collectors refresh values at scrape time"""
+        registry = Registry()
+        gauge = Gauge("pool_size", "Pool size", registry=registry)
+        registry.register_collector(lambda: gauge.set(4))
+
+        assert "pool_size 4.0" in registry.render()
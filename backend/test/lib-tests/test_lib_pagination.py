@@ -0,0 +1,28 @@
+import pytest
+from datetime import date
+from lib.pagination import encode_cursor, decode_cursor
+
+class TestPagination:
+    """Test cases for keyset pagination cursors"""
+
+    def test_cursor_roundtrip(self):
+        """Test that an encoded cursor decodes to the same key"""
+        cursor = encode_cursor(date(2024, 3, 15), 1234)
+
+        assert decode_cursor(cursor) == ("2024-03-15", 1234)
+
+    def test_cursor_accepts_string_dates(self):
+        """Test that ISO date strings are accepted when encoding"""
+        assert decode_cursor(encode_cursor("2024-03-15", 7)) == ("2024-03-15", 7)
+
+    def test_cursor_is_url_safe(self):
+        """Test that cursors contain no characters that need URL escaping"""
+        cursor = encode_cursor(date(2024, 3, 15), 999999999)
+
+        assert all(c.isalnum() or c in "-_" for c in cursor)
+
+    def test_decode_invalid_cursor(self):
+        """Test that malformed cursors raise ValueError"""
+        for cursor in ["not-a-cursor", encode_cursor("2024-13-40", 1), "", "%%%"]:
+            with pytest.raises(ValueError, match="Invalid cursor"):
+                decode_cursor(cursor)
@@ -0,0 +1,103 @@
+import pytest
+import sqlite3
+import time
+from lib.rate_limit import refill, take_token, MemoryBucketStore, SQLiteBucketStore
+
+class TestTokenBucket:
+    """Test cases for the token bucket arithmetic"""
+
+    def test_refill_is_capped_at_capacity(self):
+        """Test tokens accrue with elapsed time but never past the capacity"""
+        assert refill(0.0, 100.0, 102.0, rate=1.5, capacity=10) == 3.0
+        assert refill(9.0, 100.0, 200.0, rate=1.5, capacity=10) == 10
+
+    def test_take_reports_wait_when_empty(self):
+        """Test a rejected take says how long until one token is available"""
+        assert take_token(2.0, rate=0.5) == (True, 1.0, 0.0)
+        allowed, tokens, retry_after = take_token(0.25, rate=0.5)
+        assert allowed is False
+        assert tokens == 0.25
+        assert retry_after == pytest.approx(1.5)
+
+
+class TestMemoryBucketStore:
+    """Test cases for the in-process bucket store"""
+
+    def test_burst_then_reject_then_refill(self, monkeypatch):
+        """Test a full bucket allows a burst of capacity requests, then refills over time"""
+        clock = [1000.0]
+        monkeypatch.setattr("lib.rate_limit.time.monotonic", lambda: clock[0])
+        store = MemoryBucketStore()
+
+        results = [store.take("u1", rate=1.0, capacity=3)[0] for _ in range(4)]
+        assert results == [True, True, True, False]
+        assert store.take("u1", rate=1.0, capacity=3)[2] == pytest.approx(1.0)
+
+        clock[0] += 1.0
+        assert store.take("u1", rate=1.0, capacity=3)[0] is True
+
+    def test_keys_are_independent(self):
+        """Test one client's empty bucket does not affect another"""
+        store = MemoryBucketStore()
+        store.take("u1", rate=0.001, capacity=1)
+
+        assert store.take("u1", rate=0.001, capacity=1)[0] is False
+        assert store.take("u2", rate=0.001, capacity=1)[0] is True
+
+    def test_least_recently_used_buckets_are_dropped(self):
+        """Test the store stays bounded past max_keys"""
+        store = MemoryBucketStore(max_keys=2)
+        for key in ("a", "b", "c"):
+            store.take(key, rate=0.001, capacity=1)
+
+        assert len(store._buckets) == 2
+        # "a" was dropped, so it starts full again
+        assert store.take("a", rate=0.001, capacity=1)[0] is True
+
+
+class TestSQLiteBucketStore:
+    """Test cases for the shared SQLite bucket store"""
+
+    def test_buckets_are_shared_between_store_instances(self, tmp_path):
+        """Test two workers opening the same file spend from the same bucket"""
+        path = str(tmp_path / "buckets.sqlite3")
+        worker_a = SQLiteBucketStore(path)
+        worker_b = SQLiteBucketStore(path)
+
+        assert worker_a.take("u1", rate=0.001, capacity=2)[0] is True
+        assert worker_b.take("u1", rate=0.001, capacity=2)[0] is True
+        assert worker_a.take("u1", rate=0.001, capacity=2)[0] is False
+        assert worker_b.take("u2", rate=0.001, capacity=2)[0] is True
+
+        worker_a.close()
+        worker_b.close()
+
+    def test_idle_buckets_are_pruned(self, tmp_path, monkeypatch):
+        """Test buckets untouched for prune_after seconds are deleted"""
+        clock = [1000.0]
+        monkeypatch.setattr("lib.rate_limit.time.time", lambda: clock[0])
+        store = SQLiteBucketStore(str(tmp_path / "buckets.sqlite3"), prune_after=60, prune_every=2)
+        store.take("old", rate=1.0, capacity=1)
+        clock[0] += 120
+        store.take("new", rate=1.0, capacity=1)
+
+        keys = [row[0] for row in store._conn.execute("SELECT key FROM token_buckets")]
+        assert keys == ["new"]
+        store.close()
+
+    def test_locked_database_gives_up_after_busy_timeout(self, tmp_path):
+        """Test a take raises instead of waiting long on another worker's transaction"""
+        path = str(tmp_path / "buckets.sqlite3")
+        worker_a = SQLiteBucketStore(path, busy_timeout=0.05)
+        worker_b = SQLiteBucketStore(path)
+        worker_b._conn.execute("BEGIN IMMEDIATE")
+
+        started = time.perf_counter()
+        with pytest.raises(sqlite3.OperationalError):
+            worker_a.take("u1", rate=1.0, capacity=1)
+
+        assert time.perf_counter() - started < 1.0
+        worker_b._conn.execute("ROLLBACK")
+        assert worker_a.take("u1", rate=1.0, capacity=1)[0] is True
+        worker_a.close()
+        worker_b.close()
@@ -0,0 +1,63 @@
+import pytest
+import json
+from unittest.mock import MagicMock, patch
+from decimal import Decimal
+from datetime import date, datetime
+from lib import serialization
+from lib.serialization import build_row_converter, rows_to_dicts, dumps_json, FastJSONResponse, NUMERIC_OID, DATE_OID, TIMESTAMP_OID
+
+DESCRIPTION = [("id", 23), ("hours", NUMERIC_OID), ("entry_date", DATE_OID), ("created_at", TIMESTAMP_OID), ("description", 25)]
+ROW = (1, Decimal("1.50"), date(2024, 1, 2), datetime(2024, 1, 2, 9, 30), "Standup")
+
+class TestSerialization:
+    """Test cases for the row serialization layer"""
+
+    def test_converter_uses_type_oids(self):
+        """Test that columns are converted according to their Postgres type"""
+        convert = build_row_converter(DESCRIPTION)
+
+        assert convert(ROW) == {
+            "id": 1, "hours": 1.5, "entry_date": "2024-01-02", "created_at": "2024-01-02T09:30:00", "description": "Standup"
+        }
+
+    def test_converter_keeps_nulls(self):
+        """Test that NULL values are passed through untouched"""
+        convert = build_row_converter(DESCRIPTION)
+
+        assert convert((2, None, None, None, None)) == {
+            "id": 2, "hours": None, "entry_date": None, "created_at": None, "description": None
+        }
+
+    def test_converter_sniffs_sample_without_type_codes(self):
+        """Test that converters are inferred from a sample row when type codes are missing"""
+        description = [(name,) for name, _ in DESCRIPTION]
+        convert = build_row_converter(description, ROW)
+
+        assert convert(ROW)["hours"] == 1.5
+        assert convert(ROW)["created_at"] == "2024-01-02T09:30:00"
+
+    def test_rows_to_dicts(self):
+        """Test converting a whole result set"""
+        cursor = MagicMock()
+        cursor.description = DESCRIPTION
+
+        assert rows_to_dicts(cursor, [ROW, ROW])[1]["entry_date"] == "2024-01-02"
+        assert rows_to_dicts(cursor, []) == []
+
+    def test_dumps_json_matches_stdlib(self):
+        """Test that the fast encoder output parses to the same content"""
+        content = {"message": "ok", "hours": 1.5, "names": ["Ünïcode", None]}
+
+        assert json.loads(dumps_json(content)) == content
+
+    def test_dumps_json_without_orjson(self):
+        """Test the stdlib fallback when orjson is not installed"""
+        with patch.object(serialization, 'orjson', None):
+            assert dumps_json({"a": [1, 2]}) == b'{"a":[1,2]}'
+
+    def test_fast_json_response(self):
+        """Test that FastJSONResponse renders bytes with a JSON content type"""
+        response = FastJSONResponse(status_code=200, content={"total_hours": 2.5})
+
+        assert json.loads(response.body) == {"total_hours": 2.5}
+        assert response.media_type == "application/json"
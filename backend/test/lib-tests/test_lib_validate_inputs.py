@@ -1,6 +1,6 @@
 import pytest
 from fastapi.responses import JSONResponse
-from lib.validate_inputs import validate_password
+from lib.validate_inputs import validate_password, validate_hours, validate_entry_date
 
 class TestValidateInputs:
     """Test cases for input validation functions"""
@@ -130,3 +130,38 @@ class TestValidateInputs:
         
         assert isinstance(result, JSONResponse)
         assert result.status_code == 400
+
+
+class TestValidateTimeEntryInputs:
+    """Test cases for time entry validation functions"""
+
+    def test_validate_hours_valid(self):
+        """Test validating a positive number of hours"""
+        assert validate_hours(1.5) == 1.5
+        assert validate_hours(24) == 24
+
+    def test_validate_hours_zero_or_negative(self):
+        """Test validating zero or negative hours"""
+        with pytest.raises(ValueError, match="Hours must be greater than 0"):
+            validate_hours(0)
+        with pytest.raises(ValueError, match="Hours must be greater than 0"):
+            validate_hours(-2)
+
+    def test_validate_hours_too_many(self):
+        """Test validating more hours than fit in a day"""
+        with pytest.raises(ValueError, match="Hours cannot exceed 24 per entry"):
+            validate_hours(25)
+
+    def test_validate_entry_date_valid(self):
+        """Test validating a well-formed date"""
+        assert validate_entry_date("2024-02-29") == "2024-02-29"
+
+    def test_validate_entry_date_is_zero_padded(self):
+        """Test that dates without zero padding come back in YYYY-MM-DD form"""
+        assert validate_entry_date("2024-1-5") == "2024-01-05"
+
+    def test_validate_entry_date_invalid(self):
+        """Test validating malformed or impossible dates"""
+        for entry_date in ["2024-13-01", "2023-02-29", "01/02/2024", ""]:
+            with pytest.raises(ValueError, match="Entry date must be in YYYY-MM-DD format"):
+                validate_entry_date(entry_date)
@@ -0,0 +1,113 @@
+import pytest
+import time
+import jwt
+from unittest.mock import patch
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from middlewares import auth_middleware
+from middlewares.auth_middleware import get_current_admin, get_admin_usernames, get_current_user, verify_token_cached, token_cache
+
+class TestAuthMiddleware:
+    """Test cases for authentication dependencies"""
+
+    @patch.dict('os.environ', {"ADMIN_USERNAMES": "alice, Bob ,"})
+    def test_get_admin_usernames_normalized(self):
+        """Test that admin usernames are trimmed, lowercased and blanks ignored"""
+        assert get_admin_usernames() == {"alice", "bob"}
+
+    @patch.dict('os.environ', {"ADMIN_USERNAMES": "alice"})
+    def test_get_current_admin_allows_admin(self):
+        """Test that a listed user passes the admin check"""
+        user = {"user_id": "u1", "username": "alice"}
+
+        assert get_current_admin(user) == user
+
+    @patch.dict('os.environ', {"ADMIN_USERNAMES": "alice"})
+    def test_get_current_admin_rejects_other_users(self):
+        """Test that other users get 403"""
+        with pytest.raises(HTTPException) as excinfo:
+            get_current_admin({"user_id": "u2", "username": "bob"})
+
+        assert excinfo.value.status_code == 403
+
+    @patch.dict('os.environ', {}, clear=True)
+    def test_get_current_admin_without_config(self):
+        """Test that nobody is an admin when ADMIN_USERNAMES is unset"""
+        with pytest.raises(HTTPException):
+            get_current_admin({"user_id": "u1", "username": "alice"})
+
+
+@patch('lib.jwt_token.token_secret', 'test_secret_key')
+class TestVerifiedTokenCache:
+    """Test cases for the verified-token cache"""
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        token_cache.clear()
+        token_cache.hits = token_cache.misses = 0
+        yield
+        token_cache.clear()
+
+    def make_token(self, **claims):
+        return jwt.encode({"user_id": "u1", "username": "alice", **claims}, 'test_secret_key', algorithm="HS256")
+
+    def test_second_call_skips_verification(self):
+        """Test that a repeated token is served from the cache"""
+        token = self.make_token()
+
+        with patch.object(auth_middleware, 'verify_jwt_token', wraps=auth_middleware.verify_jwt_token) as mock_verify:
+            first = verify_token_cached(token)
+            second = verify_token_cached(token)
+
+        assert first == second == {"user_id": "u1", "username": "alice"}
+        assert mock_verify.call_count == 1
+        assert token_cache.stats()["hits"] == 1
+        assert token_cache.stats()["misses"] == 1
+
+    def test_cached_payload_cannot_be_mutated_by_callers(self):
+        """Test that callers get their own copy of the payload"""
+        token = self.make_token()
+
+        verify_token_cached(token)["user_id"] = "someone-else"
+
+        assert verify_token_cached(token)["user_id"] == "u1"
+
+    def test_entry_expires_with_token(self):
+        """Test that a cached token is not served past its exp claim"""
+        token = self.make_token(exp=int(time.time()) + 2)
+        verify_token_cached(token)
+
+        with patch('middlewares.auth_middleware.time.monotonic', return_value=time.monotonic() + 5):
+            with patch.object(auth_middleware, 'verify_jwt_token', side_effect=jwt.ExpiredSignatureError) as mock_verify:
+                with pytest.raises(jwt.ExpiredSignatureError):
+                    verify_token_cached(token)
+
+        mock_verify.assert_called_once_with(token)
+
+    def test_invalid_tokens_are_not_cached(self):
+        """Test that failed verifications are not cached"""
+        with pytest.raises(jwt.InvalidTokenError):
+            verify_token_cached("invalid.token.here")
+
+        assert len(token_cache) == 0
+
+    @patch.dict('os.environ', {"TOKEN_CACHE_ENABLED": "false"})
+    def test_kill_switch_disables_cache(self):
+        """Test that TOKEN_CACHE_ENABLED=false verifies every time"""
+        token = self.make_token()
+
+        with patch.object(auth_middleware, 'verify_jwt_token', wraps=auth_middleware.verify_jwt_token) as mock_verify:
+            verify_token_cached(token)
+            verify_token_cached(token)
+
+        assert mock_verify.call_count == 2
+        assert len(token_cache) == 0
+
+    def test_get_current_user_rejects_bad_token(self):
+        """Test that get_current_user maps verification errors to 401"""
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials="invalid.token.here")
+
+        with pytest.raises(HTTPException) as excinfo:
+            get_current_user(credentials)
+
+        assert excinfo.value.status_code == 401
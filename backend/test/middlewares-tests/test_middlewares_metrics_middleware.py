@@ -0,0 +1,62 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from middlewares.metrics_middleware import MetricsMiddleware, HTTP_REQUESTS, HTTP_REQUEST_DURATION, HTTP_REQUESTS_IN_FLIGHT
+
+def make_app():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"item_id": item_id, "in_flight": HTTP_REQUESTS_IN_FLIGHT.labels().value}
+
+    return app
+
+class TestMetricsMiddleware:
+    """Test cases for the request metrics middleware"""
+
+    def test_requests_are_counted_by_route_template(self):
+        """Test that requests are labelled with the route template, not the raw path"""
+        client = TestClient(make_app())
+        counter = HTTP_REQUESTS.labels("GET", "/items/{item_id}", "200")
+        before = counter.value
+
+        client.get("/items/1")
+        client.get("/items/2")
+
+        assert counter.value == before + 2
+
+    def test_status_code_is_recorded(self):
+        """Test that error responses are counted under their status code"""
+        client = TestClient(make_app())
+        counter = HTTP_REQUESTS.labels("GET", "/items/{item_id}", "422")
+        before = counter.value
+
+        client.get("/items/not-a-number")
+
+        assert counter.value == before + 1
+
+    def test_unmatched_paths_share_one_label(self):
+        """Test that unknown paths do not create a series per URL"""
+        client = TestClient(make_app())
+        counter = HTTP_REQUESTS.labels("GET", "unmatched", "404")
+        before = counter.value
+
+        client.get("/does-not-exist/1")
+        client.get("/does-not-exist/2")
+
+        assert counter.value == before + 2
+
+    def test_latency_and_in_flight(self):
+        """Test that latency is observed and the in-flight gauge returns to its previous value"""
+        client = TestClient(make_app())
+        in_flight = HTTP_REQUESTS_IN_FLIGHT.labels()
+        idle = in_flight.value
+        counts_before, _ = HTTP_REQUEST_DURATION.labels("GET", "/items/{item_id}").snapshot()
+
+        response = client.get("/items/3")
+
+        counts_after, _ = HTTP_REQUEST_DURATION.labels("GET", "/items/{item_id}").snapshot()
+        assert response.json()["in_flight"] == idle + 1
+        assert in_flight.value == idle
+        assert sum(counts_after) == sum(counts_before) + 1
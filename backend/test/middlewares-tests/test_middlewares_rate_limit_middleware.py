@@ -0,0 +1,136 @@
+import pytest
+import threading
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from lib.rate_limit import MemoryBucketStore
+from middlewares.rate_limit_middleware import RateLimitMiddleware, parse_budgets, DEFAULT_BUDGETS, RATE_LIMITED_REQUESTS
+
+def make_app(budgets: dict, store=None, trust_forwarded=False):
+    app = FastAPI()
+    app.add_middleware(RateLimitMiddleware, budgets=budgets, store=store or MemoryBucketStore(), trust_forwarded=trust_forwarded)
+
+    @app.post("/v1/auth/login")
+    async def login():
+        return {"message": "ok"}
+
+    @app.post("/v1/time/add")
+    async def add():
+        return {"message": "ok"}
+
+    @app.get("/v1/projects")
+    async def projects():
+        return {"message": "ok"}
+
+    return app
+
+def fake_verify(token: str) -> dict:
+    if token == "bad":
+        raise ValueError("Invalid token")
+    return {"user_id": token}
+
+class TestRateLimitMiddleware:
+    """Test cases for the rate limit middleware"""
+
+    def test_login_is_limited_per_ip_with_retry_after(self):
+        """Test requests beyond the burst get 429 with a Retry-After header"""
+        client = TestClient(make_app({("POST", "/v1/auth/login"): ("ip", 2, 60)}))
+        counter = RATE_LIMITED_REQUESTS.labels("/v1/auth/login")
+        before = counter.value
+
+        statuses = [client.post("/v1/auth/login").status_code for _ in range(3)]
+        response = client.post("/v1/auth/login")
+
+        assert statuses == [200, 200, 429]
+        assert response.status_code == 429
+        assert response.headers["retry-after"] == "30"
+        assert response.json()["message"] == "Too many requests"
+        assert counter.value == before + 2
+
+    @patch('middlewares.rate_limit_middleware.verify_token_cached', side_effect=fake_verify)
+    def test_write_routes_are_limited_per_user(self, mock_verify):
+        """Test each user has their own bucket on the write routes"""
+        client = TestClient(make_app({("POST", "/v1/time/add"): ("user", 1, 60)}))
+
+        assert client.post("/v1/time/add", headers={"Authorization": "Bearer alice"}).status_code == 200
+        assert client.post("/v1/time/add", headers={"Authorization": "Bearer alice"}).status_code == 429
+        assert client.post("/v1/time/add", headers={"Authorization": "Bearer bob"}).status_code == 200
+
+    @patch('middlewares.rate_limit_middleware.verify_token_cached', side_effect=fake_verify)
+    def test_invalid_token_falls_back_to_ip(self, mock_verify):
+        """Test requests without a valid token share their client IP's bucket"""
+        client = TestClient(make_app({("POST", "/v1/time/add"): ("user", 1, 60)}))
+
+        assert client.post("/v1/time/add", headers={"Authorization": "Bearer bad"}).status_code == 200
+        assert client.post("/v1/time/add").status_code == 429
+
+    def test_unbudgeted_routes_pass_through(self):
+        """Test routes without a budget are never limited"""
+        client = TestClient(make_app({("POST", "/v1/auth/login"): ("ip", 1, 60)}))
+
+        assert all(client.get("/v1/projects").status_code == 200 for _ in range(5))
+
+    def test_forwarded_for_is_used_only_when_trusted(self):
+        """Test X-Forwarded-For picks the bucket only behind a trusted proxy"""
+        budgets = {("POST", "/v1/auth/login"): ("ip", 1, 60)}
+        trusted = TestClient(make_app(budgets, trust_forwarded=True))
+        untrusted = TestClient(make_app(budgets))
+
+        assert trusted.post("/v1/auth/login", headers={"X-Forwarded-For": "10.0.0.1"}).status_code == 200
+        assert trusted.post("/v1/auth/login", headers={"X-Forwarded-For": "10.0.0.2, 10.0.0.9"}).status_code == 200
+        assert untrusted.post("/v1/auth/login", headers={"X-Forwarded-For": "10.0.0.1"}).status_code == 200
+        assert untrusted.post("/v1/auth/login", headers={"X-Forwarded-For": "10.0.0.2"}).status_code == 429
+
+    def test_store_failure_fails_open(self):
+        """Test a broken store lets requests through"""
+        class BrokenStore:
+            def take(self, *args, **kwargs):
+                raise RuntimeError("database is locked")
+
+        client = TestClient(make_app({("POST", "/v1/auth/login"): ("ip", 1, 60)}, store=BrokenStore()))
+
+        assert client.post("/v1/auth/login").status_code == 200
+        assert client.post("/v1/auth/login").status_code == 200
+
+    @pytest.mark.parametrize("blocking", [True, False])
+    def test_blocking_stores_run_off_the_event_loop(self, blocking):
+        """Test blocking stores are called from a worker thread and in-process ones inline"""
+        threads = {}
+
+        class RecordingStore(MemoryBucketStore):
+            def take(self, *args, **kwargs):
+                threads["take"] = threading.get_ident()
+                return super().take(*args, **kwargs)
+
+        store = RecordingStore()
+        store.blocking = blocking
+        app = make_app({("POST", "/v1/auth/login"): ("ip", 5, 60)}, store=store)
+
+        @app.get("/loop-thread")
+        async def loop_thread():
+            return {"thread": threading.get_ident()}
+
+        with TestClient(app) as client:
+            assert client.post("/v1/auth/login").status_code == 200
+            loop_thread_id = client.get("/loop-thread").json()["thread"]
+
+        assert (threads["take"] != loop_thread_id) is blocking
+
+
+class TestParseBudgets:
+    """Test cases for RATE_LIMIT_BUDGETS parsing"""
+
+    def test_overrides_adds_and_disables_routes(self):
+        """Test budgets can be changed, added and switched off"""
+        budgets = parse_budgets("POST /v1/time/add=60/30; post /v1/auth/logout=3/60 ;POST /v1/auth/signup=off")
+
+        assert budgets[("POST", "/v1/time/add")] == ("user", 60, 30.0)
+        assert budgets[("POST", "/v1/auth/logout")] == ("ip", 3, 60.0)
+        assert ("POST", "/v1/auth/signup") not in budgets
+        assert budgets[("POST", "/v1/auth/login")] == DEFAULT_BUDGETS[("POST", "/v1/auth/login")]
+
+    @pytest.mark.parametrize("value", ["POST /v1/time/add", "POST /v1/time/add=ten/60", "POST /v1/time/add=0/60", "=5/60"])
+    def test_invalid_budgets_raise(self, value):
+        """Test malformed budgets are rejected at startup"""
+        with pytest.raises(ValueError):
+            parse_budgets(value)
@@ -1,115 +1,172 @@
 import pytest
 from unittest.mock import patch, MagicMock
-from services.checking import check_if_username_exists, check_if_email_exists
-from fastapi.responses import JSONResponse
+from services.checking import get_user, get_week_summary_data, build_time_entry_filters, get_time_entries_page, get_range_summary, get_daily_totals
+from lib.pagination import decode_cursor
+from decimal import Decimal
+from datetime import date, datetime
+import psycopg2
 
 class TestCheckingServices:
     """Test cases for checking services"""
 
-    @patch('services.checking.connect_to_db')
-    def test_check_if_username_exists_true(self, mock_connect):
-        """Test checking if username exists when it does exist"""
+    @patch('services.checking.get_read_connection')
+    def test_get_week_summary_data_aggregates_single_query(self, mock_connect):
+        """Test that entries, project totals and total hours come from one query"""
         mock_conn = MagicMock()
         mock_cursor = MagicMock()
         mock_conn.cursor.return_value = mock_cursor
-        mock_cursor.fetchone.return_value = ("user_id", "testuser", "test@example.com")
-        mock_connect.return_value = mock_conn
-        
-        result = check_if_username_exists("testuser")
-        
-        assert result is True
-        mock_cursor.execute.assert_called_once_with("SELECT * FROM users WHERE username = %s", ("testuser",))
-
-    @patch('services.checking.connect_to_db')
-    def test_check_if_username_exists_false(self, mock_connect):
-        """Test checking if username exists when it doesn't exist"""
+        mock_cursor.description = [("id",), ("hours",), ("entry_date",), ("created_at",), ("project_name",)]
+        mock_cursor.fetchall.return_value = [
+            (3, Decimal("1.10"), date(2024, 1, 3), datetime(2024, 1, 3, 9, 0), "API Integration"),
+            (2, Decimal("2.20"), date(2024, 1, 2), datetime(2024, 1, 2, 9, 0), "Internal Tools"),
+            (1, Decimal("1.20"), date(2024, 1, 1), datetime(2024, 1, 1, 9, 0), "API Integration"),
+        ]
+        mock_connect.return_value.__enter__.return_value = mock_conn
+
+        result = get_week_summary_data("user-1", "2024-01-01", "2024-01-07")
+
+        mock_cursor.execute.assert_called_once()
+        assert mock_cursor.execute.call_args[0][1] == ("user-1", "2024-01-01", "2024-01-07")
+        assert result["total_hours"] == 4.5
+        assert result["project_totals"] == {"API Integration": 2.3, "Internal Tools": 2.2}
+        assert list(result["project_totals"]) == ["API Integration", "Internal Tools"]
+        assert result["time_entries"][0] == {
+            "id": 3, "hours": 1.1, "entry_date": "2024-01-03", "created_at": "2024-01-03T09:00:00", "project_name": "API Integration"
+        }
+
+    @patch('services.checking.get_read_connection')
+    def test_get_week_summary_data_project_filter(self, mock_connect):
+        """Test that a project id adds a project filter to the same query"""
         mock_conn = MagicMock()
         mock_cursor = MagicMock()
         mock_conn.cursor.return_value = mock_cursor
-        mock_cursor.fetchone.return_value = None
-        mock_connect.return_value = mock_conn
-        
-        result = check_if_username_exists("nonexistent")
-        
-        assert result is False
-        mock_cursor.execute.assert_called_once_with("SELECT * FROM users WHERE username = %s", ("nonexistent",))
-
-    @patch('services.checking.connect_to_db')
-    def test_check_if_username_exists_db_connection_failed(self, mock_connect):
-        """Test checking username when database connection fails"""
-        mock_connect.return_value = None
-        
-        result = check_if_username_exists("testuser")
-        
-        assert isinstance(result, JSONResponse)
-        assert result.status_code == 500
-        assert "Database connection failed" in result.body.decode()
-
-    @patch('services.checking.connect_to_db')
-    def test_check_if_email_exists_true(self, mock_connect):
-        """Test checking if email exists when it does exist"""
+        mock_cursor.fetchall.return_value = []
+        mock_connect.return_value.__enter__.return_value = mock_conn
+
+        result = get_week_summary_data("user-1", "2024-01-01", "2024-01-07", 2)
+
+        sql_query, params = mock_cursor.execute.call_args[0]
+        assert "te.project_id = %s" in sql_query
+        assert params == ("user-1", "2024-01-01", "2024-01-07", 2)
+        assert result == {"time_entries": [], "project_totals": {}, "total_hours": 0.0}
+
+    def test_build_time_entry_filters(self):
+        """Test that the shared filter builder supports both tables and an optional project"""
+        where_sql, params = build_time_entry_filters("user-1", "2024-01-01", "2024-01-31")
+        assert where_sql == "te.user_id = %s AND te.entry_date BETWEEN %s AND %s"
+        assert params == ["user-1", "2024-01-01", "2024-01-31"]
+
+        where_sql, params = build_time_entry_filters("user-1", "2024-01-01", "2024-01-31", 4, alias="dt", date_column="day")
+        assert where_sql == "dt.user_id = %s AND dt.day BETWEEN %s AND %s AND dt.project_id = %s"
+        assert params == ["user-1", "2024-01-01", "2024-01-31", 4]
+
+    @patch('services.checking.get_read_connection')
+    def test_get_time_entries_page_returns_next_cursor(self, mock_connect):
+        """Test that an extra row signals another page and yields a cursor for the last row"""
         mock_conn = MagicMock()
         mock_cursor = MagicMock()
         mock_conn.cursor.return_value = mock_cursor
-        mock_cursor.fetchone.return_value = ("user_id", "testuser", "test@example.com")
-        mock_connect.return_value = mock_conn
-        
-        result = check_if_email_exists("test@example.com")
-        
-        assert result is True
-        mock_cursor.execute.assert_called_once_with("SELECT * FROM users WHERE email = %s", ("test@example.com",))
-
-    @patch('services.checking.connect_to_db')
-    def test_check_if_email_exists_false(self, mock_connect):
-        """Test checking if email exists when it doesn't exist"""
+        mock_cursor.description = [("id",), ("entry_date",), ("hours",)]
+        mock_cursor.fetchall.return_value = [
+            (9, date(2024, 1, 3), Decimal("1.00")),
+            (8, date(2024, 1, 2), Decimal("2.00")),
+            (7, date(2024, 1, 2), Decimal("3.00")),
+        ]
+        mock_connect.return_value.__enter__.return_value = mock_conn
+
+        page = get_time_entries_page("user-1", "2024-01-01", "2024-01-31", limit=2)
+
+        assert [entry["id"] for entry in page["time_entries"]] == [9, 8]
+        assert decode_cursor(page["next_cursor"]) == ("2024-01-02", 8)
+        sql_query, params = mock_cursor.execute.call_args[0]
+        assert "ORDER BY te.entry_date DESC, te.id DESC" in sql_query
+        assert params[-1] == 3
+
+    @patch('services.checking.get_read_connection')
+    def test_get_time_entries_page_continues_after_cursor(self, mock_connect):
+        """Test that a cursor adds a keyset condition and the last page has no cursor"""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.description = [("id",), ("entry_date",)]
+        mock_cursor.fetchall.return_value = [(7, date(2024, 1, 2))]
+        mock_connect.return_value.__enter__.return_value = mock_conn
+
+        page = get_time_entries_page("user-1", "2024-01-01", "2024-01-31", limit=2, cursor=("2024-01-02", 8))
+
+        sql_query, params = mock_cursor.execute.call_args[0]
+        assert "(te.entry_date, te.id) < (%s, %s)" in sql_query
+        assert params == ("user-1", "2024-01-01", "2024-01-31", "2024-01-02", 8, 3)
+        assert page["next_cursor"] is None
+
+    @patch('services.checking.get_read_connection')
+    def test_get_time_entries_page_caps_limit(self, mock_connect):
+        """Test that page size is capped to protect memory"""
         mock_conn = MagicMock()
         mock_cursor = MagicMock()
         mock_conn.cursor.return_value = mock_cursor
-        mock_cursor.fetchone.return_value = None
-        mock_connect.return_value = mock_conn
-        
-        result = check_if_email_exists("nonexistent@example.com")
-        
-        assert result is False
-        mock_cursor.execute.assert_called_once_with("SELECT * FROM users WHERE email = %s", ("nonexistent@example.com",))
-
-    @patch('services.checking.connect_to_db')
-    def test_check_if_email_exists_db_connection_failed(self, mock_connect):
-        """Test checking email when database connection fails"""
-        mock_connect.return_value = None
-        
-        result = check_if_email_exists("test@example.com")
-        
-        assert isinstance(result, JSONResponse)
-        assert result.status_code == 500
-        assert "Database connection failed" in result.body.decode()
-
-    @patch('services.checking.connect_to_db')
-    def test_check_if_username_exists_normalized_input(self, mock_connect):
-        """Test checking username with normalized input"""
+        mock_cursor.fetchall.return_value = []
+        mock_connect.return_value.__enter__.return_value = mock_conn
+
+        get_time_entries_page("user-1", "2024-01-01", "2024-01-31", limit=100000)
+
+        assert mock_cursor.execute.call_args[0][1][-1] == 501
+
+    @patch('services.checking.get_read_connection')
+    def test_get_range_summary_reads_rollup(self, mock_connect):
+        """Test that range summaries aggregate the daily rollup"""
         mock_conn = MagicMock()
         mock_cursor = MagicMock()
         mock_conn.cursor.return_value = mock_cursor
-        mock_cursor.fetchone.return_value = None
-        mock_connect.return_value = mock_conn
-        
-        result = check_if_username_exists("TestUser")
-        
-        assert result is False
-        # Verify the exact username passed to the query
-        mock_cursor.execute.assert_called_once_with("SELECT * FROM users WHERE username = %s", ("TestUser",))
-
-    @patch('services.checking.connect_to_db')
-    def test_check_if_email_exists_normalized_input(self, mock_connect):
-        """Test checking email with normalized input"""
+        mock_cursor.fetchall.return_value = [("API Integration", Decimal("10.50"), 4), ("Internal Tools", Decimal("2.25"), 1)]
+        mock_connect.return_value.__enter__.return_value = mock_conn
+
+        summary = get_range_summary("user-1", "2024-01-01", "2024-03-31")
+
+        assert "FROM time_entry_daily_totals dt" in mock_cursor.execute.call_args[0][0]
+        assert summary == {
+            "project_totals": {"API Integration": 10.5, "Internal Tools": 2.25},
+            "total_hours": 12.75,
+            "entry_count": 5,
+        }
+
+    @patch('services.checking.get_read_connection')
+    def test_get_daily_totals_returns_columns(self, mock_connect):
+        """Test that daily totals come back as parallel lists of day offsets, projects and hours"""
         mock_conn = MagicMock()
         mock_cursor = MagicMock()
         mock_conn.cursor.return_value = mock_cursor
-        mock_cursor.fetchone.return_value = None
-        mock_connect.return_value = mock_conn
-        
-        result = check_if_email_exists("Test@Example.COM")
-        
-        assert result is False
-        # Verify the exact email passed to the query
-        mock_cursor.execute.assert_called_once_with("SELECT * FROM users WHERE email = %s", ("Test@Example.COM",))
+        mock_cursor.fetchall.return_value = [(0, "API Integration", 2.5), (7, "Internal Tools", 1.0)]
+        mock_connect.return_value.__enter__.return_value = mock_conn
+
+        totals = get_daily_totals("user-1", "2024-01-01", "2024-12-29")
+
+        sql, params = mock_cursor.execute.call_args[0]
+        assert "FROM time_entry_daily_totals dt" in sql
+        assert params == ("2024-01-01", "user-1", "2024-01-01", "2024-12-29")
+        assert totals == {"day_offsets": [0, 7], "projects": ["API Integration", "Internal Tools"], "hours": [2.5, 1.0]}
+
+    @patch('services.checking.get_read_connection')
+    def test_get_daily_totals_empty(self, mock_connect):
+        """Test that a range without entries yields empty columns"""
+        mock_conn = MagicMock()
+        mock_conn.cursor.return_value.fetchall.return_value = []
+        mock_connect.return_value.__enter__.return_value = mock_conn
+
+        assert get_daily_totals("user-1", "2024-01-01", "2024-01-07") == {"day_offsets": [], "projects": [], "hours": []}
+
+    @patch('services.checking.replicas_enabled', return_value=True)
+    @patch('services.checking.get_connection')
+    @patch('services.checking.get_read_connection')
+    def test_get_user_missing_on_replica_rechecks_primary(self, mock_read, mock_primary, mock_replicas):
+        """Test a user not yet replicated is looked up again on the primary"""
+        replica_cursor = MagicMock()
+        replica_cursor.fetchone.return_value = None
+        mock_read.return_value.__enter__.return_value.cursor.return_value = replica_cursor
+        primary_cursor = MagicMock()
+        primary_cursor.fetchone.return_value = ("user-1", "newuser")
+        primary_cursor.description = [("user_id",), ("username",)]
+        mock_primary.return_value.__enter__.return_value.cursor.return_value = primary_cursor
+
+        assert get_user("newuser") == {"user_id": "user-1", "username": "newuser"}
+        mock_primary.assert_called_once()
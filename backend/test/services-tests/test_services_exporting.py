@@ -0,0 +1,79 @@
+import pytest
+import json
+from unittest.mock import patch, MagicMock
+from decimal import Decimal
+from datetime import date, datetime
+from services.exporting import stream_time_entries_export, EXPORT_COLUMNS
+
+ROWS = [
+    (1, "u1", "alice", "API Integration", date(2024, 1, 1), Decimal("1.50"), "Standup, notes", datetime(2024, 1, 1, 9, 0)),
+    (2, "u2", "bob", "Internal Tools", date(2024, 1, 2), Decimal("2.00"), "Review", datetime(2024, 1, 2, 9, 0)),
+    (3, "u1", "alice", "API Integration", date(2024, 1, 3), Decimal("0.25"), "Deploy", datetime(2024, 1, 3, 9, 0)),
+]
+
+def mock_named_cursor(mock_connect, rows):
+    mock_conn = MagicMock()
+    mock_cursor = MagicMock()
+    mock_conn.cursor.return_value = mock_cursor
+    mock_cursor.description = [(column,) for column in EXPORT_COLUMNS]
+    batches = []
+    def fetchmany(size):
+        start = sum(len(batch) for batch in batches)
+        batch = rows[start:start + size]
+        batches.append(batch)
+        return batch
+    mock_cursor.fetchmany.side_effect = fetchmany
+    mock_connect.return_value.__enter__.return_value = mock_conn
+    return mock_conn, mock_cursor
+
+class TestExportingServices:
+    """Test cases for the streaming time entry export"""
+
+    @patch('services.exporting.get_connection')
+    def test_csv_export_streams_in_chunks(self, mock_connect):
+        """Test that CSV is produced chunk by chunk with a single header"""
+        mock_conn, mock_cursor = mock_named_cursor(mock_connect, ROWS)
+
+        chunks = list(stream_time_entries_export("2024-01-01", "2024-01-31", "csv", chunk_rows=2))
+
+        assert len(chunks) == 2
+        lines = b"".join(chunks).decode().splitlines()
+        assert lines[0] == "id,user_id,username,project_name,entry_date,hours,description,created_at"
+        assert lines[1] == '1,u1,alice,API Integration,2024-01-01,1.5,"Standup, notes",2024-01-01T09:00:00'
+        assert len(lines) == 4
+        mock_conn.cursor.assert_called_once_with(name="time_entries_export")
+        mock_cursor.close.assert_called_once()
+
+    @patch('services.exporting.get_connection')
+    def test_ndjson_export(self, mock_connect):
+        """Test that NDJSON has one JSON object per row"""
+        mock_named_cursor(mock_connect, ROWS)
+
+        body = b"".join(stream_time_entries_export("2024-01-01", "2024-01-31", "ndjson", chunk_rows=10))
+
+        records = [json.loads(line) for line in body.decode().splitlines()]
+        assert len(records) == 3
+        assert records[2] == {
+            "id": 3, "user_id": "u1", "username": "alice", "project_name": "API Integration",
+            "entry_date": "2024-01-03", "hours": 0.25, "description": "Deploy", "created_at": "2024-01-03T09:00:00"
+        }
+
+    @patch('services.exporting.get_connection')
+    def test_empty_csv_export_has_header(self, mock_connect):
+        """Test that an empty range still yields the CSV header"""
+        mock_named_cursor(mock_connect, [])
+
+        body = b"".join(stream_time_entries_export("2024-01-01", "2024-01-31", "csv"))
+
+        assert body.decode().strip() == "id,user_id,username,project_name,entry_date,hours,description,created_at"
+
+    @patch('services.exporting.get_connection')
+    def test_export_is_lazy(self, mock_connect):
+        """Test that nothing is fetched until the consumer asks for the first chunk"""
+        mock_conn, mock_cursor = mock_named_cursor(mock_connect, ROWS)
+
+        stream = stream_time_entries_export("2024-01-01", "2024-01-31", "csv", chunk_rows=1)
+        mock_cursor.fetchmany.assert_not_called()
+        next(stream)
+
+        assert mock_cursor.fetchmany.call_count == 1
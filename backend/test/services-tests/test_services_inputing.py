@@ -1,18 +1,29 @@
 import pytest
 from unittest.mock import patch, MagicMock
-from services.inputing import store_user
+from services.inputing import store_user, store_time_entry, store_time_entries, apply_daily_totals, UserAlreadyExistsError
+from decimal import Decimal
 from datetime import datetime
+import psycopg2
+from psycopg2 import errors
+
+def make_unique_violation(constraint_name):
+    """Build a UniqueViolation reporting the given constraint name"""
+    class FakeUniqueViolation(errors.UniqueViolation):
+        @property
+        def diag(self):
+            return MagicMock(constraint_name=constraint_name)
+    return FakeUniqueViolation("duplicate key value violates unique constraint")
 
 class TestInputingServices:
     """Test cases for input services"""
 
-    @patch('services.inputing.connect_to_db')
+    @patch('services.inputing.get_connection')
     def test_store_user_success(self, mock_connect):
         """Test successfully storing a user"""
         mock_conn = MagicMock()
         mock_cursor = MagicMock()
         mock_conn.cursor.return_value = mock_cursor
-        mock_connect.return_value = mock_conn
+        mock_connect.return_value.__enter__.return_value = mock_conn
         
         user_data = {
             "user_id": "123e4567-e89b-12d3-a456-426614174000",
@@ -29,10 +40,10 @@ class TestInputingServices:
         mock_cursor.execute.assert_called_once()
         mock_conn.commit.assert_called_once()
 
-    @patch('services.inputing.connect_to_db')
+    @patch('services.inputing.get_connection')
     def test_store_user_db_connection_failed(self, mock_connect):
         """Test storing user when database connection fails"""
-        mock_connect.return_value = None
+        mock_connect.side_effect = psycopg2.OperationalError("Database connection failed")
         
         user_data = {
             "user_id": "123e4567-e89b-12d3-a456-426614174000",
@@ -43,17 +54,16 @@ class TestInputingServices:
             "updated_at": datetime.now()
         }
         
-        result = store_user(user_data)
-        
-        assert result is False
+        with pytest.raises(psycopg2.OperationalError):
+            store_user(user_data)
 
-    @patch('services.inputing.connect_to_db')
+    @patch('services.inputing.get_connection')
     def test_store_user_correct_parameters(self, mock_connect):
         """Test that store_user passes correct parameters to database"""
         mock_conn = MagicMock()
         mock_cursor = MagicMock()
         mock_conn.cursor.return_value = mock_cursor
-        mock_connect.return_value = mock_conn
+        mock_connect.return_value.__enter__.return_value = mock_conn
         
         user_data = {
             "user_id": "123e4567-e89b-12d3-a456-426614174000",
@@ -80,13 +90,13 @@ class TestInputingServices:
         assert params[4] == user_data["created_at"]
         assert params[5] == user_data["updated_at"]
 
-    @patch('services.inputing.connect_to_db')
+    @patch('services.inputing.get_connection')
     def test_store_user_commits_transaction(self, mock_connect):
         """Test that store_user commits the transaction"""
         mock_conn = MagicMock()
         mock_cursor = MagicMock()
         mock_conn.cursor.return_value = mock_cursor
-        mock_connect.return_value = mock_conn
+        mock_connect.return_value.__enter__.return_value = mock_conn
         
         user_data = {
             "user_id": "123e4567-e89b-12d3-a456-426614174000",
@@ -102,13 +112,13 @@ class TestInputingServices:
         # Verify commit was called
         mock_conn.commit.assert_called_once()
 
-    @patch('services.inputing.connect_to_db')
+    @patch('services.inputing.get_connection')
     def test_store_user_with_different_user_data(self, mock_connect):
         """Test storing user with different user data"""
         mock_conn = MagicMock()
         mock_cursor = MagicMock()
         mock_conn.cursor.return_value = mock_cursor
-        mock_connect.return_value = mock_conn
+        mock_connect.return_value.__enter__.return_value = mock_conn
         
         user_data = {
             "user_id": "987e6543-e21b-43d2-b654-321987654321",
@@ -124,3 +134,154 @@ class TestInputingServices:
         assert result is True
         mock_cursor.execute.assert_called_once()
         mock_conn.commit.assert_called_once()
+
+    @pytest.mark.parametrize("constraint_name,field", [
+        ("users_username_key", "username"),
+        ("users_email_key", "email"),
+    ])
+    @patch('services.inputing.get_connection')
+    def test_store_user_duplicate_reports_field(self, mock_connect, constraint_name, field):
+        """Test that a unique violation is mapped to the conflicting field"""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.execute.side_effect = make_unique_violation(constraint_name)
+        mock_conn.cursor.return_value = mock_cursor
+        mock_connect.return_value.__enter__.return_value = mock_conn
+
+        user_data = {
+            "user_id": "123e4567-e89b-12d3-a456-426614174000",
+            "username": "testuser",
+            "email": "test@example.com",
+            "password": "hashed_password",
+            "created_at": datetime.now(),
+        }
+
+        with pytest.raises(UserAlreadyExistsError) as exc_info:
+            store_user(user_data)
+
+        assert exc_info.value.field == field
+        assert str(exc_info.value) == f"{field.capitalize()} already exists"
+        mock_conn.rollback.assert_called_once()
+        mock_conn.commit.assert_not_called()
+
+    @patch('services.inputing.get_connection')
+    def test_store_user_unknown_constraint_is_reraised(self, mock_connect):
+        """Test that a unique violation on an unmapped constraint propagates unchanged"""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.execute.side_effect = make_unique_violation("users_pkey")
+        mock_conn.cursor.return_value = mock_cursor
+        mock_connect.return_value.__enter__.return_value = mock_conn
+
+        user_data = {
+            "user_id": "123e4567-e89b-12d3-a456-426614174000",
+            "username": "testuser",
+            "email": "test@example.com",
+            "password": "hashed_password",
+            "created_at": datetime.now(),
+        }
+
+        with pytest.raises(errors.UniqueViolation):
+            store_user(user_data)
+
+    @patch('services.inputing.execute_values')
+    @patch('services.inputing.get_connection')
+    def test_store_time_entries_single_transaction(self, mock_connect, mock_execute_values):
+        """Test that a batch is written with one multi-row insert and one commit"""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+        mock_connect.return_value.__enter__.return_value = mock_conn
+
+        time_entries = [
+            {"user_id": "123e4567-e89b-12d3-a456-426614174000", "project_id": 1, "description": "Design review", "hours": 1.5, "entry_date": "2024-01-01"},
+            {"user_id": "123e4567-e89b-12d3-a456-426614174000", "project_id": 2, "description": "Bug fixes", "hours": 3.0, "entry_date": "2024-01-02"},
+        ]
+
+        result = store_time_entries(time_entries)
+
+        assert result == 2
+        assert mock_execute_values.call_count == 2
+        sql_query = mock_execute_values.call_args_list[0][0][2]
+        rows = mock_execute_values.call_args_list[0][0][3]
+        assert "INSERT INTO time_entries" in sql_query
+        assert rows == [
+            ("123e4567-e89b-12d3-a456-426614174000", 1, "Design review", 1.5, "2024-01-01"),
+            ("123e4567-e89b-12d3-a456-426614174000", 2, "Bug fixes", 3.0, "2024-01-02"),
+        ]
+        mock_conn.commit.assert_called_once()
+        rollup_sql = mock_execute_values.call_args_list[1][0][2]
+        assert "INSERT INTO time_entry_daily_totals" in rollup_sql
+
+    @patch('services.inputing.execute_values')
+    @patch('services.inputing.get_connection')
+    def test_store_time_entry_updates_rollup_in_same_transaction(self, mock_connect, mock_execute_values):
+        """Test that the daily rollup is updated before the single commit"""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+        mock_connect.return_value.__enter__.return_value = mock_conn
+
+        store_time_entry({"user_id": "u1", "project_id": 1, "description": "Standup", "hours": 0.5, "entry_date": "2024-01-01"})
+
+        mock_cursor.execute.assert_called_once()
+        rows = mock_execute_values.call_args[0][3]
+        assert rows == [("u1", 1, "2024-01-01", Decimal("0.50"), 1)]
+        mock_conn.commit.assert_called_once()
+
+    @patch('services.inputing.mark_primary_write')
+    @patch('services.inputing.execute_values')
+    @patch('services.inputing.get_connection')
+    def test_store_time_entries_keeps_writers_on_primary(self, mock_connect, mock_execute_values, mock_mark_write):
+        """Test every writing user reads from the primary after the commit"""
+        mock_connect.return_value.__enter__.return_value = MagicMock()
+
+        store_time_entries([
+            {"user_id": "u1", "project_id": 1, "description": "a", "hours": 1, "entry_date": "2024-01-01"},
+            {"user_id": "u1", "project_id": 2, "description": "b", "hours": 2, "entry_date": "2024-01-01"},
+        ])
+
+        mock_mark_write.assert_called_once_with("u1")
+
+    @patch('services.inputing.execute_values')
+    def test_apply_daily_totals_folds_same_day_entries(self, mock_execute_values):
+        """Test that entries for the same user, day and project become one upsert row"""
+        cursor = MagicMock()
+        time_entries = [
+            {"user_id": "u1", "project_id": 2, "hours": 1.005, "entry_date": "2024-01-02"},
+            {"user_id": "u1", "project_id": 2, "hours": 1.005, "entry_date": "2024-01-02"},
+            {"user_id": "u1", "project_id": 1, "hours": 2, "entry_date": "2024-01-01"},
+        ]
+
+        apply_daily_totals(cursor, time_entries)
+
+        rows = mock_execute_values.call_args[0][3]
+        assert rows == [
+            ("u1", 1, "2024-01-01", Decimal("2.00"), 1),
+            ("u1", 2, "2024-01-02", Decimal("2.02"), 2),
+        ]
+
+    @patch('services.inputing.execute_values')
+    def test_apply_daily_totals_negative_sign(self, mock_execute_values):
+        """Test that removals subtract hours and counts"""
+        cursor = MagicMock()
+
+        apply_daily_totals(cursor, [{"user_id": "u1", "project_id": 1, "hours": 1.5, "entry_date": "2024-01-01"}], sign=-1)
+
+        rows = mock_execute_values.call_args[0][3]
+        assert rows == [("u1", 1, "2024-01-01", Decimal("-1.50"), -1)]
+
+    @patch('services.inputing.execute_values')
+    def test_apply_daily_totals_folds_mixed_date_formats(self, mock_execute_values):
+        """Test that one day written with and without zero padding is a single upsert row"""
+        cursor = MagicMock()
+        time_entries = [
+            {"user_id": "u1", "project_id": 1, "hours": 1, "entry_date": "2024-1-5"},
+            {"user_id": "u1", "project_id": 1, "hours": 2, "entry_date": "2024-01-05"},
+            {"user_id": "u1", "project_id": 1, "hours": 3, "entry_date": datetime(2024, 1, 5).date()},
+        ]
+
+        apply_daily_totals(cursor, time_entries)
+
+        rows = mock_execute_values.call_args[0][3]
+        assert rows == [("u1", 1, "2024-01-05", Decimal("6.00"), 3)]
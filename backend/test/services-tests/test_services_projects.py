@@ -0,0 +1,78 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from services.projects import ProjectRegistry
+from services.checking import get_projects
+
+PROJECTS = [
+    {"id": 1, "name": "Website Redesign", "description": "UI overhaul and component updates"},
+    {"id": 2, "name": "Internal Tools", "description": "Tools for automations and reporting"},
+]
+
+class TestProjectRegistry:
+    """Test cases for the in-process project registry"""
+
+    def test_refresh_builds_lookup_maps(self):
+        """Test that refresh loads name->id and id->name maps"""
+        registry = ProjectRegistry(loader=lambda: PROJECTS)
+
+        registry.refresh()
+
+        assert registry.get_id("Website Redesign") == 1
+        assert registry.get_name(2) == "Internal Tools"
+        assert registry.get_id("Unknown") is None
+        assert registry.list_projects() == PROJECTS
+
+    def test_is_stale_before_first_load(self):
+        """Test that an empty registry reports itself as stale"""
+        registry = ProjectRegistry(loader=lambda: PROJECTS)
+
+        assert registry.is_stale() is True
+        registry.refresh()
+        assert registry.is_stale() is False
+
+    def test_ttl_expiry_marks_stale(self):
+        """Test that the registry becomes stale after its TTL"""
+        registry = ProjectRegistry(ttl=0, loader=lambda: PROJECTS)
+
+        registry.refresh()
+
+        assert registry.is_stale() is True
+
+    def test_invalidate_marks_stale_but_keeps_data(self):
+        """Test that invalidate forces a reload without dropping lookups"""
+        registry = ProjectRegistry(loader=lambda: PROJECTS)
+        registry.refresh()
+
+        registry.invalidate()
+
+        assert registry.is_stale() is True
+        assert registry.get_id("Website Redesign") == 1
+
+    def test_etag_changes_with_content(self):
+        """Test that the ETag is stable for the same data and changes with new data"""
+        loader = MagicMock(return_value=PROJECTS)
+        registry = ProjectRegistry(loader=loader)
+        registry.refresh()
+        first = registry.etag
+        registry.refresh()
+        assert registry.etag == first
+
+        loader.return_value = PROJECTS + [{"id": 3, "name": "API Integration", "description": None}]
+        registry.refresh()
+
+        assert registry.etag != first
+        assert first.startswith('"') and first.endswith('"')
+
+    @patch('services.checking.get_connection')
+    def test_get_projects_query(self, mock_connect):
+        """Test that get_projects returns rows as dictionaries"""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchall.return_value = [(1, "Website Redesign", "UI overhaul and component updates")]
+        mock_connect.return_value.__enter__.return_value = mock_conn
+
+        result = get_projects()
+
+        assert result == [PROJECTS[0]]
+        mock_cursor.execute.assert_called_once_with("SELECT id, name, description FROM projects ORDER BY name")
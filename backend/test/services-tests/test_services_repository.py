@@ -0,0 +1,36 @@
+import pytest
+import asyncio
+from unittest.mock import patch
+from services import repository
+
+class TestRepository:
+    """Test cases for the async data-access layer"""
+
+    @patch('services.checking.get_user')
+    def test_get_user_awaits_service(self, mock_get_user):
+        """Test that get_user delegates to the synchronous service"""
+        mock_get_user.return_value = {"username": "testuser"}
+
+        result = asyncio.run(repository.get_user("testuser"))
+
+        assert result == {"username": "testuser"}
+        mock_get_user.assert_called_once_with("testuser")
+
+    @patch('services.inputing.store_time_entry')
+    def test_store_time_entry_awaits_service(self, mock_store):
+        """Test that store_time_entry delegates to the synchronous service"""
+        mock_store.return_value = True
+        payload = {"user_id": "123", "project_id": 1, "description": "work", "hours": 1.5, "entry_date": "2024-01-01"}
+
+        result = asyncio.run(repository.store_time_entry(payload))
+
+        assert result is True
+        mock_store.assert_called_once_with(payload)
+
+    @patch('services.checking.get_user')
+    def test_service_errors_propagate(self, mock_get_user):
+        """Test that service exceptions are raised from the awaitable"""
+        mock_get_user.side_effect = ValueError("User not found")
+
+        with pytest.raises(ValueError, match="User not found"):
+            asyncio.run(repository.get_user("ghost"))
@@ -0,0 +1,89 @@
+import pytest
+from services.summary_cache import SummaryCache
+
+KEY = ("week", "2024-01-01", None)
+
+class TestSummaryCache:
+    """Test cases for the per-user summary cache"""
+
+    def test_cached_summary_is_returned(self):
+        """Test that a summary stored at the current version is served"""
+        cache = SummaryCache()
+        version = cache.get_version("u1")
+        cache.set("u1", KEY, {"total_hours": 3.0}, version)
+
+        assert cache.get("u1", KEY) == {"total_hours": 3.0}
+
+    def test_write_invalidates_only_that_user(self):
+        """Test that invalidating one user leaves other users cached"""
+        cache = SummaryCache()
+        cache.set("u1", KEY, {"total_hours": 3.0}, cache.get_version("u1"))
+        cache.set("u2", KEY, {"total_hours": 5.0}, cache.get_version("u2"))
+
+        cache.invalidate_user("u1")
+
+        assert cache.get("u1", KEY) is None
+        assert cache.get("u2", KEY) == {"total_hours": 5.0}
+
+    def test_summary_computed_during_write_is_stale(self):
+        """Test that a summary stored with a version read before a write is not served"""
+        cache = SummaryCache()
+        version = cache.get_version("u1")
+        cache.invalidate_user("u1")
+
+        cache.set("u1", KEY, {"total_hours": 3.0}, version)
+
+        assert cache.get("u1", KEY) is None
+
+    def test_etag_belongs_to_the_cached_entry(self):
+        """Test that lookup returns the ETag handed out when the summary was stored"""
+        cache = SummaryCache()
+        etag = cache.set("u1", KEY, {"total_hours": 3.0}, cache.get_version("u1"))
+
+        assert cache.lookup("u1", KEY) == ({"total_hours": 3.0}, etag)
+        assert cache.lookup("u2", KEY) == (None, None)
+        cache.invalidate_user("u1")
+        assert cache.lookup("u1", KEY) == (None, None)
+
+    def test_recomputed_summary_gets_a_new_etag(self):
+        """Test that an ETag from an expired entry never validates its replacement"""
+        cache = SummaryCache()
+        first = cache.set("u1", KEY, {"total_hours": 3.0}, 0)
+        second = cache.set("u1", KEY, {"total_hours": 3.0}, 0)
+
+        assert first != second
+        assert cache.lookup("u1", KEY)[1] == second
+
+    def test_worker_that_missed_a_write_stops_confirming_after_ttl(self, monkeypatch):
+        """Test two workers: the one that never saw the write only confirms its copy until the TTL"""
+        clock = [1000.0]
+        monkeypatch.setattr("lib.cache.time.monotonic", lambda: clock[0])
+        worker_a = SummaryCache(ttl=300)
+        worker_b = SummaryCache(ttl=300)
+        etag_b = worker_b.set("u1", KEY, {"total_hours": 3.0}, worker_b.get_version("u1"))
+
+        # The write lands on worker A; worker B keeps its old version
+        worker_a.invalidate_user("u1")
+        assert worker_a.lookup("u1", KEY) == (None, None)
+        assert worker_b.lookup("u1", KEY)[1] == etag_b
+
+        clock[0] += 301
+        # No live entry, so B must recompute instead of answering 304 for etag_b
+        assert worker_b.lookup("u1", KEY) == (None, None)
+        refreshed = worker_b.set("u1", KEY, {"total_hours": 5.0}, worker_b.get_version("u1"))
+        assert refreshed != etag_b
+
+    def test_etag_differs_between_processes(self):
+        """Test that two cache instances never produce the same ETag"""
+        assert SummaryCache().set("u1", KEY, {}, 0) != SummaryCache().set("u1", KEY, {}, 0)
+
+    def test_stats_expose_hits_and_evictions(self):
+        """Test that cache metrics are reported"""
+        cache = SummaryCache(max_entries=1)
+        cache.set("u1", KEY, {}, 0)
+        cache.set("u2", KEY, {}, 0)
+        cache.get("u2", KEY)
+
+        stats = cache.stats()
+        assert stats["evictions"] == 1
+        assert stats["hits"] == 1
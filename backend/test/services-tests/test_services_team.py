@@ -0,0 +1,164 @@
+import asyncio
+import pytest
+from unittest.mock import patch, MagicMock
+from datetime import date, datetime, timezone, timedelta
+from services.team import refresh_team_summary, get_team_summary, TeamSummaryRefresher, TEAM_VIEWS
+
+def make_connection(mock_connect):
+    mock_conn = MagicMock()
+    mock_cursor = MagicMock()
+    mock_conn.cursor.return_value = mock_cursor
+    mock_connect.return_value.__enter__.return_value = mock_conn
+    return mock_conn, mock_cursor
+
+class TestRefreshTeamSummary:
+    """Test cases for refreshing the team materialized views"""
+
+    @patch('services.team.get_connection')
+    def test_refreshes_views_concurrently_and_records_time(self, mock_connect):
+        """Test both views are refreshed concurrently, in order, with the refresh time recorded"""
+        mock_conn, mock_cursor = make_connection(mock_connect)
+        mock_cursor.fetchone.return_value = (True,)
+
+        assert refresh_team_summary() is True
+
+        statements = [call.args[0] for call in mock_cursor.execute.call_args_list]
+        assert statements[1] == "REFRESH MATERIALIZED VIEW CONCURRENTLY team_weekly_totals"
+        assert statements[2] == "REFRESH MATERIALIZED VIEW CONCURRENTLY team_project_weekly_totals"
+        assert "materialized_view_refreshes" in statements[3]
+        assert mock_cursor.execute.call_args_list[3].args[1] == (list(TEAM_VIEWS),)
+        mock_conn.commit.assert_called_once()
+
+    @patch('services.team.get_connection')
+    def test_skips_when_another_refresh_holds_the_lock(self, mock_connect):
+        """Test a refresh already running elsewhere is not queued behind"""
+        mock_conn, mock_cursor = make_connection(mock_connect)
+        mock_cursor.fetchone.return_value = (False,)
+
+        assert refresh_team_summary() is False
+
+        assert mock_cursor.execute.call_count == 1
+        mock_conn.rollback.assert_called_once()
+        mock_conn.commit.assert_not_called()
+
+
+class TestGetTeamSummary:
+    """Test cases for reading the team summary"""
+
+    @patch('services.team.get_connection')
+    def test_returns_columnar_rows_and_freshness(self, mock_connect):
+        """Test rows and team totals come back as parallel arrays with the refresh time"""
+        _, mock_cursor = make_connection(mock_connect)
+        refreshed_at = datetime.now(timezone.utc) - timedelta(seconds=90)
+        mock_cursor.fetchall.side_effect = [
+            [("alice",), ("bob",)],
+            [("alice", date(2024, 1, 1), "Alpha", 5.0, 2), ("bob", date(2024, 1, 1), "Beta", 3.5, 1)],
+            [(date(2024, 1, 1), "Alpha", 5.0, 2, 1), (date(2024, 1, 1), "Beta", 3.5, 1, 1)],
+        ]
+        mock_cursor.fetchone.return_value = (refreshed_at,)
+
+        result = get_team_summary("2024-01-01", "2024-01-07", limit=10)
+
+        assert result["users"] == ["alice", "bob"]
+        assert result["rows"] == {
+            "username": ["alice", "bob"],
+            "week_start": ["2024-01-01", "2024-01-01"],
+            "project_name": ["Alpha", "Beta"],
+            "total_hours": [5.0, 3.5],
+            "entry_count": [2, 1],
+        }
+        assert result["team_totals"]["user_count"] == [1, 1]
+        assert result["next_cursor"] is None
+        assert result["refreshed_at"] == refreshed_at.isoformat()
+        assert 89 <= result["staleness_seconds"] <= 100
+
+    @patch('services.team.get_connection')
+    def test_pages_users_by_username(self, mock_connect):
+        """Test one extra user is fetched to produce the next cursor, and only the page is read from the view"""
+        _, mock_cursor = make_connection(mock_connect)
+        mock_cursor.fetchall.side_effect = [[("alice",), ("bob",), ("carol",)], [], []]
+        mock_cursor.fetchone.return_value = None
+
+        result = get_team_summary("2024-01-01", "2024-01-07", limit=2, after="aaron")
+
+        assert mock_cursor.execute.call_args_list[0].args[1] == ("aaron", 3)
+        assert mock_cursor.execute.call_args_list[1].args[1] == (["alice", "bob"], "2024-01-01", "2024-01-07")
+        assert result["users"] == ["alice", "bob"]
+        assert result["next_cursor"] == "bob"
+        assert result["refreshed_at"] is None
+        assert result["staleness_seconds"] is None
+
+
+class TestTeamSummaryRefresher:
+    """Test cases for the background refresher"""
+
+    def test_write_burst_triggers_refresh(self):
+        """Test enough writes refresh before the interval, after the minimum spacing"""
+        calls = []
+
+        async def refresh():
+            calls.append(True)
+            return True
+
+        async def scenario():
+            refresher = TeamSummaryRefresher(interval=60, burst_writes=3, min_interval=0, refresh=refresh)
+            refresher.start()
+            refresher.note_writes(2)
+            await asyncio.sleep(0.05)
+            assert calls == []
+            refresher.note_writes(1)
+            await asyncio.sleep(0.05)
+            await refresher.stop()
+            return refresher
+
+        refresher = asyncio.run(scenario())
+
+        assert calls == [True]
+        assert refresher._pending_writes == 0
+
+    def test_refreshes_on_interval(self):
+        """Test the view is refreshed periodically without writes"""
+        calls = []
+
+        async def refresh():
+            calls.append(True)
+            return True
+
+        async def scenario():
+            refresher = TeamSummaryRefresher(interval=0.02, burst_writes=0, min_interval=0, refresh=refresh)
+            refresher.start()
+            await asyncio.sleep(0.1)
+            await refresher.stop()
+
+        asyncio.run(scenario())
+
+        assert len(calls) >= 2
+
+    def test_failed_refresh_keeps_running(self):
+        """Test a failing refresh is logged and retried on the next interval"""
+        calls = []
+
+        async def refresh():
+            calls.append(True)
+            raise RuntimeError("database unavailable")
+
+        async def scenario():
+            refresher = TeamSummaryRefresher(interval=0.02, burst_writes=0, min_interval=0, refresh=refresh)
+            refresher.start()
+            await asyncio.sleep(0.1)
+            await refresher.stop()
+
+        asyncio.run(scenario())
+
+        assert len(calls) >= 2
+
+    def test_disabled_with_zero_interval(self):
+        """Test a zero interval never starts the background task"""
+        async def scenario():
+            refresher = TeamSummaryRefresher(interval=0, refresh=MagicMock())
+            refresher.start()
+            refresher.note_writes(1000)
+            await refresher.stop()
+            return refresher
+
+        assert asyncio.run(scenario())._task is None
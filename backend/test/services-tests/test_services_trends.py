@@ -0,0 +1,58 @@
+import pytest
+from datetime import date
+from services.trends import build_trends
+
+def daily(rows):
+    day_offsets, projects, hours = zip(*rows) if rows else ((), (), ())
+    return {"day_offsets": list(day_offsets), "projects": list(projects), "hours": list(hours)}
+
+class TestTrends:
+    """Test cases for the vectorized trend aggregation"""
+
+    def test_weekly_buckets_and_project_rows(self):
+        """Test that days are summed into weeks with one row per project"""
+        data = daily([(0, "API", 2.0), (3, "API", 1.5), (8, "Web", 4.0), (9, "API", 1.0)])
+
+        trends = build_trends(data, date(2024, 1, 1), date(2024, 1, 21), "week", 4)
+
+        assert trends["buckets"] == ["2024-01-01", "2024-01-08", "2024-01-15"]
+        assert trends["total_hours"] == [3.5, 5.0, 0.0]
+        assert trends["projects"] == ["API", "Web"]
+        assert trends["project_hours"] == [[3.5, 1.0, 0.0], [0.0, 4.0, 0.0]]
+        assert trends["project_totals"] == [4.5, 4.0]
+        assert trends["grand_total"] == 8.5
+
+    def test_moving_average_uses_partial_windows(self):
+        """Test that the trailing average divides by the buckets available so far"""
+        data = daily([(0, "API", 2.0), (7, "API", 4.0), (14, "API", 6.0), (21, "API", 8.0)])
+
+        trends = build_trends(data, date(2024, 1, 1), date(2024, 1, 28), "week", 2)
+
+        assert trends["moving_average"] == [2.0, 3.0, 5.0, 7.0]
+
+    def test_monthly_buckets(self):
+        """Test that month buckets follow calendar months"""
+        data = daily([(0, "API", 1.0), (30, "API", 2.0), (31, "Web", 3.0), (60, "Web", 4.0)])
+
+        trends = build_trends(data, date(2024, 1, 1), date(2024, 3, 31), "month", 3)
+
+        assert trends["buckets"] == ["2024-01", "2024-02", "2024-03"]
+        assert trends["total_hours"] == [3.0, 3.0, 4.0]
+
+    def test_shares_ordered_by_total(self):
+        """Test that projects are ordered by total and shares add up to one"""
+        data = daily([(0, "A", 1.0), (1, "B", 3.0)])
+
+        trends = build_trends(data, date(2024, 1, 1), date(2024, 1, 7))
+
+        assert trends["projects"] == ["B", "A"]
+        assert trends["project_shares"] == [0.75, 0.25]
+
+    def test_no_data(self):
+        """Test that an empty range yields zero-filled buckets and no projects"""
+        trends = build_trends(daily([]), date(2024, 1, 1), date(2024, 1, 14), "week", 4)
+
+        assert trends["total_hours"] == [0.0, 0.0]
+        assert trends["moving_average"] == [0.0, 0.0]
+        assert trends["projects"] == []
+        assert trends["project_shares"] == []
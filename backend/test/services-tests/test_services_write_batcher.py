@@ -0,0 +1,115 @@
+import asyncio
+import pytest
+import psycopg2
+from services.write_batcher import TimeEntryWriteBatcher
+
+def make_entry(index: int) -> dict:
+    return {"user_id": "u1", "project_id": 1, "description": f"entry {index}", "hours": 1, "entry_date": "2024-01-01"}
+
+class RecordingStore:
+    def __init__(self, error=None, bad_description=None):
+        self.batches = []
+        self.singles = []
+        self.error = error
+        self.bad_description = bad_description
+
+    async def store_many(self, entries):
+        self.batches.append(list(entries))
+        if self.error is not None:
+            raise self.error
+        if any(entry["description"] == self.bad_description for entry in entries):
+            raise psycopg2.IntegrityError("violates foreign key constraint")
+        return len(entries)
+
+    async def store_one(self, entry):
+        self.singles.append(entry)
+        if entry["description"] == self.bad_description:
+            raise psycopg2.IntegrityError("violates foreign key constraint")
+        return True
+
+def make_batcher(store, **kwargs) -> TimeEntryWriteBatcher:
+    return TimeEntryWriteBatcher(store_many=store.store_many, store_one=store.store_one, **kwargs)
+
+class TestTimeEntryWriteBatcher:
+    """Test cases for the group-commit write batcher"""
+
+    def test_full_batch_is_written_in_one_transaction(self):
+        """Test max_batch concurrent entries share one store call and all resolve"""
+        store = RecordingStore()
+
+        async def scenario():
+            batcher = make_batcher(store, max_batch=10, max_wait_ms=10_000)
+            return await asyncio.gather(*(batcher.submit(make_entry(i)) for i in range(10)))
+
+        results = asyncio.run(scenario())
+
+        assert results == [True] * 10
+        assert len(store.batches) == 1
+        assert [entry["description"] for entry in store.batches[0]] == [f"entry {i}" for i in range(10)]
+
+    def test_partial_batch_flushes_after_max_wait(self):
+        """Test a lone entry is written once the wait window expires"""
+        store = RecordingStore()
+
+        async def scenario():
+            batcher = make_batcher(store, max_batch=100, max_wait_ms=5)
+            return await asyncio.wait_for(batcher.submit(make_entry(0)), timeout=1)
+
+        assert asyncio.run(scenario()) is True
+        assert len(store.batches) == 1
+
+    def test_entries_beyond_max_batch_start_a_new_batch(self):
+        """Test batches are capped at max_batch entries"""
+        store = RecordingStore()
+
+        async def scenario():
+            batcher = make_batcher(store, max_batch=4, max_wait_ms=5)
+            await asyncio.gather(*(batcher.submit(make_entry(i)) for i in range(10)))
+
+        asyncio.run(scenario())
+
+        assert [len(batch) for batch in store.batches] == [4, 4, 2]
+
+    def test_bad_entry_only_fails_its_own_request(self):
+        """Test an integrity error retries the batch entry by entry"""
+        store = RecordingStore(bad_description="entry 1")
+
+        async def scenario():
+            batcher = make_batcher(store, max_batch=3, max_wait_ms=10_000)
+            return await asyncio.gather(*(batcher.submit(make_entry(i)) for i in range(3)), return_exceptions=True)
+
+        results = asyncio.run(scenario())
+
+        assert results[0] is True and results[2] is True
+        assert isinstance(results[1], psycopg2.IntegrityError)
+        assert len(store.singles) == 3
+
+    def test_connection_error_fails_every_request_in_batch(self):
+        """Test nothing is acknowledged when the commit did not happen"""
+        store = RecordingStore(error=psycopg2.OperationalError("server closed the connection"))
+
+        async def scenario():
+            batcher = make_batcher(store, max_batch=2, max_wait_ms=10_000)
+            return await asyncio.gather(*(batcher.submit(make_entry(i)) for i in range(2)), return_exceptions=True)
+
+        results = asyncio.run(scenario())
+
+        assert all(isinstance(result, psycopg2.OperationalError) for result in results)
+        assert store.singles == []
+
+    def test_close_flushes_queued_entries(self):
+        """Test shutdown writes out entries still waiting for their window"""
+        store = RecordingStore()
+
+        async def scenario():
+            batcher = make_batcher(store, max_batch=100, max_wait_ms=60_000)
+            pending = asyncio.ensure_future(batcher.submit(make_entry(0)))
+            await asyncio.sleep(0)
+            await batcher.close()
+            result = await pending
+            with pytest.raises(RuntimeError):
+                await batcher.submit(make_entry(1))
+            return result
+
+        assert asyncio.run(scenario()) is True
+        assert len(store.batches) == 1
@@ -1,6 +1,8 @@
 import pytest
+import asyncio
+import threading
 import bcrypt
-from utils.password import hash_password, verify_password
+from utils.password import hash_password, verify_password, PasswordHasherPool, PasswordPoolSaturated
 
 class TestPasswordUtils:
     """Test cases for password hashing and verification utilities"""
@@ -113,3 +115,102 @@ class TestPasswordUtils:
         # Bcrypt hashes start with $2b$ or $2a$ or $2y$
         hashed_str = hashed.decode('utf-8')
         assert hashed_str.startswith('$2')
+
+
+class TestPasswordHasherPool:
+    """Test cases for the bounded password hashing pool"""
+
+    def test_run_returns_result(self):
+        """Test that work submitted to the pool returns its result"""
+        pool = PasswordHasherPool(workers=1, queue_limit=1)
+
+        result = asyncio.run(pool.run(lambda a, b: a + b, 2, 3))
+
+        assert result == 5
+        assert pool.stats()["completed"] == 1
+        pool.shutdown()
+
+    def test_verify_runs_on_pool(self):
+        """Test that bcrypt verification works through the pool"""
+        pool = PasswordHasherPool(workers=1, queue_limit=1)
+        hashed = bcrypt.hashpw(b"TestPassword123", bcrypt.gensalt(rounds=4)).decode('utf-8')
+
+        assert asyncio.run(pool.run(verify_password, "TestPassword123", hashed)) is True
+        assert asyncio.run(pool.run(verify_password, "WrongPassword123", hashed)) is False
+        pool.shutdown()
+
+    def test_rejects_when_saturated(self):
+        """Test that work beyond workers + queue_limit is rejected with a retry hint"""
+        pool = PasswordHasherPool(workers=1, queue_limit=1)
+        release = threading.Event()
+
+        async def main():
+            blocked = [asyncio.ensure_future(pool.run(release.wait)) for _ in range(2)]
+            await asyncio.sleep(0.05)
+            with pytest.raises(PasswordPoolSaturated) as excinfo:
+                await pool.run(release.wait)
+            stats = pool.stats()
+            release.set()
+            await asyncio.gather(*blocked)
+            return excinfo.value, stats
+
+        error, stats = asyncio.run(main())
+
+        assert error.retry_after >= 1
+        assert stats["rejected"] == 1
+        assert stats["in_flight"] == 1
+        assert stats["queue_depth"] == 1
+        pool.shutdown()
+
+    def test_stats_track_latency(self):
+        """Test that latency statistics are recorded"""
+        pool = PasswordHasherPool(workers=2, queue_limit=0)
+
+        asyncio.run(pool.run(lambda: None))
+
+        stats = pool.stats()
+        assert stats["workers"] == 2
+        assert stats["latency_max_seconds"] >= stats["latency_avg_seconds"] >= 0
+        pool.shutdown()
+
+    def test_cancelled_caller_keeps_running_job_counted(self):
+        """Test a job whose caller went away still counts against admission until it finishes"""
+        pool = PasswordHasherPool(workers=1, queue_limit=0)
+        release = threading.Event()
+
+        async def main():
+            caller = asyncio.ensure_future(pool.run(release.wait))
+            await asyncio.sleep(0.05)
+            caller.cancel()
+            await asyncio.sleep(0.01)
+            # The bcrypt thread is still busy, so a new request must be rejected
+            with pytest.raises(PasswordPoolSaturated):
+                await pool.run(release.wait)
+            release.set()
+            await asyncio.sleep(0.05)
+            return await pool.run(lambda: "admitted")
+
+        assert asyncio.run(main()) == "admitted"
+        assert pool.stats()["queue_depth"] == 0
+        pool.shutdown()
+
+    def test_cancelled_queued_job_is_released(self):
+        """Test a job cancelled before it started frees its slot without running"""
+        pool = PasswordHasherPool(workers=1, queue_limit=1)
+        release = threading.Event()
+        ran = []
+
+        async def main():
+            running = asyncio.ensure_future(pool.run(release.wait))
+            queued = asyncio.ensure_future(pool.run(lambda: ran.append(True)))
+            await asyncio.sleep(0.05)
+            queued.cancel()
+            await asyncio.sleep(0.01)
+            depth = pool.stats()["queue_depth"]
+            release.set()
+            await running
+            return depth
+
+        assert asyncio.run(main()) == 0
+        assert ran == []
+        pool.shutdown()
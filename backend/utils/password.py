@@ -1,7 +1,131 @@
 import bcrypt
+import asyncio
+import math
+import threading
+import time
+import os
+from concurrent.futures import ThreadPoolExecutor
 
 def hash_password(password: str) -> str:
     return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
 
 def verify_password(password: str, hashed_password: str) -> bool:
-    return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
\ No newline at end of file
+    return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+
+class PasswordPoolSaturated(Exception):
+    """Raised when too many password operations are already queued."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Server is busy, please retry shortly")
+        self.retry_after = retry_after
+
+
+class PasswordHasherPool:
+    """Runs bcrypt work on a dedicated thread pool with admission control.
+
+    bcrypt releases the GIL while hashing, so worker threads run in parallel
+    without blocking the event loop. At most ``workers`` operations run at once
+    and up to ``queue_limit`` more may wait; anything beyond that is rejected
+    immediately instead of piling up latency.
+    """
+
+    def __init__(self, workers: int, queue_limit: int):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.max_pending = workers + queue_limit
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+
+    async def run(self, func, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise PasswordPoolSaturated(self._retry_after())
+            self._pending += 1
+        try:
+            job = self._executor.submit(self._timed, func, args)
+        except RuntimeError:
+            self._release()
+            raise
+        # Count the job as pending until it finishes (or is cancelled before it started),
+        # not until the caller stops waiting: a disconnected client's hash still runs
+        job.add_done_callback(self._release)
+        return await asyncio.wrap_future(job)
+
+    def _release(self, job=None):
+        with self._lock:
+            self._pending -= 1
+
+    def _timed(self, func, args):
+        with self._lock:
+            self._running += 1
+        started = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+                self._latency_total += elapsed
+                self._latency_max = max(self._latency_max, elapsed)
+
+    def _retry_after(self) -> int:
+        # Caller holds self._lock. Estimate how long the current backlog takes to drain.
+        average = self._latency_total / self._completed if self._completed else 0.25
+        return max(1, math.ceil(average * self._pending / self.workers))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_limit": self.queue_limit,
+                "in_flight": self._running,
+                "queue_depth": self._pending - self._running,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "latency_avg_seconds": round(self._latency_total / self._completed, 6) if self._completed else 0.0,
+                "latency_max_seconds": round(self._latency_max, 6),
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_password_pool() -> PasswordHasherPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                workers = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 1))
+                _pool = PasswordHasherPool(
+                    workers=workers,
+                    queue_limit=int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", workers * 4)),
+                )
+    return _pool
+
+def shutdown_password_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+
+async def hash_password_async(password: str) -> str:
+    return await get_password_pool().run(hash_password, password)
+
+async def verify_password_async(password: str, hashed_password: str) -> bool:
+    return await get_password_pool().run(verify_password, password, hashed_password)
+
+def get_password_pool_stats() -> dict:
+    return get_password_pool().stats()